@@ -0,0 +1,108 @@
+"""Measure how long importing the AI Toolset integration takes.
+
+Runs ``python -X importtime`` in fresh interpreters and compares importing
+the integration on its own (what Home Assistant does at startup) with
+importing every tool module as well (what the integration used to do).
+
+Usage, from the repository root with Home Assistant installed:
+
+    python benchmarks/import_time.py [--repeat 5] [--top 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "custom_components.ai_toolset"
+TOOL_MODULES = [
+    "web_search",
+    "url_fetch",
+    "create_automation",
+    "code_executor",
+    "calendar",
+    "music",
+    "waze_travel_time",
+]
+
+SCENARIOS = {
+    "integration": f"import {PACKAGE}",
+    "integration + all tools": "; ".join(
+        [f"import {PACKAGE}"]
+        + [f"import {PACKAGE}.tools.{module}" for module in TOOL_MODULES]
+    ),
+}
+
+# Imported by Home Assistant before any integration, so not counted
+BASELINE = "import homeassistant.core, homeassistant.helpers.llm"
+
+
+def _import_times(statement: str) -> list[tuple[str, int]]:
+    """Return each imported module with its cumulative time in microseconds.
+
+    Module names keep the indentation -X importtime uses for nested imports.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{BASELINE}; {statement}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: list[tuple[str, int]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times.append((name[1:], int(cumulative)))
+    return times
+
+
+def _statement_time(statement: str, baseline: set[str]) -> tuple[int, dict[str, int]]:
+    """Return the import time of a statement beyond the baseline.
+
+    Also returns the time of each module it imported.
+    """
+    new = [
+        (name, time)
+        for name, time in _import_times(statement)
+        if name.strip() not in baseline
+    ]
+    # Top-level entries already include the time of their nested imports
+    total = sum(time for name, time in new if not name.startswith(" "))
+    return total, {name.strip(): time for name, time in new}
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run is not an outlier
+    for statement in SCENARIOS.values():
+        _import_times(statement)
+    baseline = {name.strip() for name, _ in _import_times("pass")}
+
+    for label, statement in SCENARIOS.items():
+        totals = []
+        modules: dict[str, int] = {}
+        for _ in range(args.repeat):
+            total, modules = _statement_time(statement, baseline)
+            totals.append(total)
+
+        print(f"{label}: median {statistics.median(totals) / 1000:.1f} ms")
+        print(f"  new modules imported: {len(modules)}")
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+        for name, time in slowest[: args.top]:
+            print(f"  {time / 1000:8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
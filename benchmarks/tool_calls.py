@@ -0,0 +1,661 @@
+"""Measure the throughput and latency of every AI Toolset tool.
+
+Each tool is called against local stand-ins for its upstreams: an aiohttp
+server that answers like the Google, Kagi and Bing search APIs and serves a
+corpus of HTML pages, and fake calendar, media player and Waze services
+registered on a test Home Assistant instance. Every scenario is run at
+several concurrency levels, and the results are written as JSON. Passing the
+results of an earlier run with --compare reports regressions and exits with
+status 1.
+
+Usage, from the repository root with the test requirements installed:
+
+    python benchmarks/tool_calls.py [--calls 200] [--concurrency 1 8 32]
+        [--upstream-latency 20] [--output results.json] [--compare old.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import AsyncResolver, web
+from aiohttp.test_utils import TestServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.const import __version__ as HA_VERSION  # noqa: E402
+from homeassistant.core import (  # noqa: E402
+    HomeAssistant,
+    ServiceCall,
+    SupportsResponse,
+)
+from homeassistant.helpers import llm  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    async_test_home_assistant,
+)
+
+from custom_components.ai_toolset.const import (  # noqa: E402
+    CONF_BING_API_KEY,
+    CONF_BING_DAILY_QUOTA,
+    CONF_ENABLE_CODE_EXECUTOR,
+    CONF_GOOGLE_API_KEY,
+    CONF_GOOGLE_CX,
+    CONF_GOOGLE_DAILY_QUOTA,
+    CONF_KAGI_API_KEY,
+    CONF_KAGI_DAILY_QUOTA,
+    SEARCH_ENGINES,
+)
+from custom_components.ai_toolset.quota import SearchQuota  # noqa: E402
+from custom_components.ai_toolset.tools import (  # noqa: E402
+    AutomationIndex,
+    CalendarAddEventTool,
+    CalendarGetEventsTool,
+    CalendarUpdateEventTool,
+    CodeExecutorTool,
+    CreateAutomationTool,
+    GetTravelDistanceTool,
+    GetTravelInfoTool,
+    GetTravelTimeTool,
+    MusicFindTool,
+    MusicPlayTool,
+    SearchAndReadTool,
+    URLFetchTool,
+    WazeRouteCache,
+    WebSearchTool,
+    web_search,
+)
+from custom_components.ai_toolset.tools.waze_travel_time import (  # noqa: E402
+    route_options_from_config,
+)
+
+MANIFEST = ROOT / "custom_components" / "ai_toolset" / "manifest.json"
+
+# Paragraphs per page of the HTML corpus
+CORPUS = {"small": 10, "medium": 100, "large": 1000}
+WORDS = (
+    "home assistant automation sensor light motion energy solar battery "
+    "weather calendar music traffic commute kitchen garden thermostat "
+    "network device update release integration dashboard"
+).split()
+
+CALENDAR_ENTITY = "calendar.benchmark"
+MEDIA_PLAYER_ENTITY = "media_player.benchmark"
+
+LLM_CONTEXT = llm.LLMContext(
+    platform="benchmark",
+    context=None,
+    language="en",
+    assistant="conversation",
+    device_id=None,
+)
+
+# Unique per call across all runs, so uncached scenarios never repeat a route
+SEQUENCE = itertools.count()
+
+
+@dataclass
+class Scenario:
+    """A tool called with arguments built from a call sequence number."""
+
+    name: str
+    tool: llm.Tool
+    args: Callable[[int], dict[str, Any]]
+
+
+def build_page(title: str, paragraphs: int, seed: int) -> str:
+    """Return a deterministic HTML page with boilerplate around the text."""
+    rng = random.Random(seed)
+    body = "\n".join(
+        f"<p>{' '.join(rng.choices(WORDS, k=60))}.</p>" for _ in range(paragraphs)
+    )
+    return (
+        "<html><head>"
+        f"<title>{title}</title>"
+        f'<meta name="description" content="Benchmark page {title}">'
+        "<style>body { font-family: sans-serif; }</style>"
+        "<script>window.analytics = [];</script>"
+        "</head><body>"
+        "<header><nav><a href='/'>Home</a> <a href='/about'>About</a></nav></header>"
+        f"<article><h1>{title}</h1>{body}</article>"
+        "<footer>Copyright</footer>"
+        "</body></html>"
+    )
+
+
+def _search_items(request: web.Request, query: str, count: int) -> list[dict[str, str]]:
+    """Return fake search results for a query, linking to the corpus pages.
+
+    The query is added to the links so each search reads pages that are not
+    in the page cache of the URL fetch tool.
+    """
+    names = list(CORPUS)
+    return [
+        {
+            "title": f"{query} result {index}",
+            "url": str(
+                request.url.origin()
+                .with_path(f"/pages/{names[index % len(names)]}")
+                .with_query(q=query)
+            ),
+            "snippet": f"A page about {query}, result number {index}.",
+        }
+        for index in range(count)
+    ]
+
+
+def create_upstream_app(latency: float) -> web.Application:
+    """Return an app emulating the search APIs and serving the HTML corpus."""
+    pages = {
+        name: build_page(name, paragraphs, seed)
+        for seed, (name, paragraphs) in enumerate(CORPUS.items())
+    }
+
+    @web.middleware
+    async def _delay(request: web.Request, handler: Any) -> web.StreamResponse:
+        if latency:
+            await asyncio.sleep(latency)
+        return await handler(request)
+
+    async def _google(request: web.Request) -> web.Response:
+        items = _search_items(
+            request, request.query["q"], int(request.query.get("num", 10))
+        )
+        return web.json_response(
+            {
+                "items": [
+                    {
+                        "title": item["title"],
+                        "link": item["url"],
+                        "snippet": item["snippet"],
+                        "image": {"thumbnailLink": f"{item['url']}/thumb.jpg"},
+                    }
+                    for item in items
+                ]
+            }
+        )
+
+    async def _kagi(request: web.Request) -> web.Response:
+        items = _search_items(
+            request, request.query["q"], int(request.query.get("limit", 10))
+        )
+        return web.json_response({"data": items})
+
+    async def _bing_web(request: web.Request) -> web.Response:
+        items = _search_items(
+            request, request.query["q"], int(request.query.get("count", 10))
+        )
+        return web.json_response(
+            {
+                "webPages": {
+                    "value": [
+                        {"name": item["title"], "url": item["url"], **item}
+                        for item in items
+                    ]
+                }
+            }
+        )
+
+    async def _bing_images(request: web.Request) -> web.Response:
+        items = _search_items(
+            request, request.query["q"], int(request.query.get("count", 10))
+        )
+        return web.json_response(
+            {
+                "value": [
+                    {
+                        "name": item["title"],
+                        "contentUrl": f"{item['url']}/image.jpg",
+                        "thumbnailUrl": f"{item['url']}/thumb.jpg",
+                    }
+                    for item in items
+                ]
+            }
+        )
+
+    async def _page(request: web.Request) -> web.Response:
+        return web.Response(
+            text=pages[request.match_info["name"]], content_type="text/html"
+        )
+
+    app = web.Application(middlewares=[_delay])
+    app.router.add_get("/google/customsearch/v1", _google)
+    app.router.add_get("/kagi/api/v0/search", _kagi)
+    app.router.add_get("/bing/v7.0/search", _bing_web)
+    app.router.add_get("/bing/v7.0/images/search", _bing_images)
+    app.router.add_get("/pages/{name}", _page)
+    return app
+
+
+def register_fake_services(hass: HomeAssistant, latency: float) -> None:
+    """Register the calendar, media player and Waze services the tools call."""
+    events = [
+        {
+            "start": f"2026-01-0{day}T09:00:00+00:00",
+            "end": f"2026-01-0{day}T10:00:00+00:00",
+            "summary": f"Meeting {day}",
+        }
+        for day in range(1, 8)
+    ]
+    media_tree = {
+        "title": "Media",
+        "media_content_type": "",
+        "media_content_id": "media-source://media_source",
+        "children": [
+            {
+                "title": f"{word.title()} Mix {index}",
+                "media_content_type": "music",
+                "media_content_id": f"media-source://music/{word}/{index}",
+                "can_play": True,
+            }
+            for index, word in enumerate(WORDS)
+        ],
+    }
+
+    async def _respond(response: dict[str, Any]) -> dict[str, Any]:
+        if latency:
+            await asyncio.sleep(latency)
+        return response
+
+    async def _get_events(call: ServiceCall) -> dict[str, Any]:
+        return await _respond({call.data["entity_id"]: {"events": events}})
+
+    async def _browse_media(call: ServiceCall) -> dict[str, Any]:
+        return await _respond(media_tree)
+
+    async def _get_travel_time(call: ServiceCall) -> dict[str, Any]:
+        return await _respond(
+            {"routes": [{"duration": 23.5, "distance": 14.2, "name": "I-90"}]}
+        )
+
+    async def _no_response(call: ServiceCall) -> None:
+        await _respond({})
+
+    hass.services.async_register(
+        "calendar", "get_events", _get_events, supports_response=SupportsResponse.ONLY
+    )
+    hass.services.async_register("calendar", "create_event", _no_response)
+    hass.services.async_register("calendar", "update_event", _no_response)
+    hass.services.async_register(
+        "media_player",
+        "browse_media",
+        _browse_media,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register("media_player", "play_media", _no_response)
+    hass.services.async_register(
+        "waze_travel_time",
+        "get_travel_time",
+        _get_travel_time,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.states.async_set(CALENDAR_ENTITY, "off")
+    hass.states.async_set(MEDIA_PLAYER_ENTITY, "idle")
+    hass.states.async_set("binary_sensor.motion", "on")
+    hass.config.components.add("media_source")
+
+
+def _coordinates(number: int) -> str:
+    """Return distinct coordinates for a call sequence number."""
+    return f"{40 + (number % 10000) * 1e-4:.4f},{-74 - (number // 10000) * 1e-4:.4f}"
+
+
+def build_scenarios(hass: HomeAssistant, base_url: str) -> list[Scenario]:
+    """Return the benchmark scenarios, covering every tool."""
+    config = {
+        CONF_GOOGLE_API_KEY: "benchmark",
+        CONF_GOOGLE_CX: "benchmark",
+        CONF_KAGI_API_KEY: "benchmark",
+        CONF_BING_API_KEY: "benchmark",
+        CONF_ENABLE_CODE_EXECUTOR: True,
+        # Measure the searches, not the quotas and rate limits
+        CONF_GOOGLE_DAILY_QUOTA: 0,
+        CONF_KAGI_DAILY_QUOTA: 0,
+        CONF_BING_DAILY_QUOTA: 0,
+    }
+    search = WebSearchTool(
+        hass,
+        config,
+        SearchQuota(hass, rate_limits=dict.fromkeys(SEARCH_ENGINES, 1e9)),
+    )
+    url_fetch = URLFetchTool()
+    route_cache = WazeRouteCache(default_options=route_options_from_config({}))
+
+    scenarios = [
+        Scenario(
+            f"web_search {engine}",
+            search,
+            lambda n, engine=engine: {"query": f"query {n}", "engine": engine},
+        )
+        for engine in ("google", "kagi", "bing")
+    ]
+    scenarios.append(
+        Scenario(
+            "web_search bing images",
+            search,
+            lambda n: {"query": f"query {n}", "engine": "bing", "search_type": "image"},
+        )
+    )
+    scenarios.extend(
+        Scenario(
+            f"url_fetch {name} page",
+            url_fetch,
+            # A new URL per call, so the page cache does not answer it
+            lambda n, name=name: {"url": f"{base_url}/pages/{name}?n={n}"},
+        )
+        for name in CORPUS
+    )
+    scenarios.extend(
+        [
+            Scenario(
+                "search_and_read",
+                SearchAndReadTool(search, url_fetch),
+                lambda n: {"query": f"query {n}", "engine": "google"},
+            ),
+            Scenario(
+                "url_fetch batch",
+                url_fetch,
+                lambda n: {
+                    "urls": [f"{base_url}/pages/{name}?n={n}" for name in CORPUS]
+                },
+            ),
+            Scenario(
+                "create_automation dry run",
+                CreateAutomationTool(AutomationIndex()),
+                lambda n: {
+                    "automation_id": f"benchmark_{n}",
+                    "alias": "Benchmark",
+                    "trigger": [
+                        {
+                            "platform": "state",
+                            "entity_id": "binary_sensor.motion",
+                            "to": "on",
+                        }
+                    ],
+                    "condition": ["{{ is_state('binary_sensor.motion', 'on') }}"],
+                    "action": [
+                        {
+                            "service": "light.turn_on",
+                            "target": {"entity_id": "light.hallway"},
+                        }
+                    ],
+                    "dry_run": True,
+                },
+            ),
+            Scenario(
+                "code_executor",
+                CodeExecutorTool(hass, config),
+                lambda n: {"code": f"print(sum(range({n % 1000})))"},
+            ),
+            Scenario(
+                "calendar_get_events",
+                CalendarGetEventsTool(),
+                lambda n: {"entity_id": CALENDAR_ENTITY},
+            ),
+            Scenario(
+                "calendar_add_event",
+                CalendarAddEventTool(),
+                lambda n: {
+                    "entity_id": CALENDAR_ENTITY,
+                    "summary": f"Event {n}",
+                    "start_date_time": "2026-01-01T09:00:00+00:00",
+                    "end_date_time": "2026-01-01T10:00:00+00:00",
+                },
+            ),
+            Scenario(
+                "calendar_update_event",
+                CalendarUpdateEventTool(),
+                lambda n: {
+                    "entity_id": CALENDAR_ENTITY,
+                    "uid": f"event-{n}",
+                    "summary": f"Event {n}",
+                },
+            ),
+            Scenario("music_find", MusicFindTool(), lambda n: {"query": "mix"}),
+            Scenario(
+                "music_play",
+                MusicPlayTool(),
+                lambda n: {
+                    "entity_id": MEDIA_PLAYER_ENTITY,
+                    "media_content_id": f"media-source://music/{n}",
+                },
+            ),
+            Scenario(
+                "get_travel_time uncached",
+                GetTravelTimeTool(route_cache),
+                lambda n: {"origin": _coordinates(n), "destination": "40.7,-73.9"},
+            ),
+            Scenario(
+                "get_travel_time cached",
+                GetTravelTimeTool(route_cache),
+                lambda n: {"origin": "40.6,-73.8", "destination": "40.7,-73.9"},
+            ),
+            Scenario(
+                "get_travel_distance uncached",
+                GetTravelDistanceTool(route_cache),
+                lambda n: {"origin": _coordinates(n), "destination": "40.8,-73.9"},
+            ),
+            Scenario(
+                "get_travel_info 3x3 uncached",
+                GetTravelInfoTool(route_cache),
+                lambda n: {
+                    "origins": [_coordinates(n * 3 + index) for index in range(3)],
+                    "destinations": ["40.7,-73.9", "40.8,-73.9", "40.9,-73.9"],
+                },
+            ),
+        ]
+    )
+    return scenarios
+
+
+def _is_error(result: Any) -> bool:
+    """Return if a tool result reports a failure."""
+    return isinstance(result, dict) and (
+        result.get("success") is False or "error" in result
+    )
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Return a percentile of sorted values using the nearest-rank method."""
+    return ordered[max(math.ceil(percent / 100 * len(ordered)), 1) - 1]
+
+
+async def run_scenario(
+    hass: HomeAssistant, scenario: Scenario, calls: int, concurrency: int
+) -> dict[str, Any]:
+    """Make calls to a tool from concurrent workers and return the results."""
+    latencies: list[float] = []
+    errors: list[str] = []
+    remaining = iter(range(calls))
+
+    async def _worker() -> None:
+        for _ in remaining:
+            tool_input = llm.ToolInput(
+                tool_name=scenario.tool.name, tool_args=scenario.args(next(SEQUENCE))
+            )
+            start = time.perf_counter()
+            try:
+                result = await scenario.tool.async_call(hass, tool_input, LLM_CONTEXT)
+            except Exception as err:
+                result = {"error": repr(err)}
+            latencies.append((time.perf_counter() - start) * 1000)
+            if _is_error(result):
+                errors.append(str(result.get("error")))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "scenario": scenario.name,
+        "tool": scenario.tool.name,
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_per_s": round(calls / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered), 3),
+            "p50": round(_percentile(ordered, 50), 3),
+            "p95": round(_percentile(ordered, 95), 3),
+            "p99": round(_percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3),
+        },
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario at every concurrency level."""
+    latency = args.upstream_latency / 1000
+    results = []
+    # Resolve names without zeroconf, as the tests do
+    resolver = AsyncResolver()
+    resolver.real_close = resolver.close
+    async with (
+        async_test_home_assistant() as hass,
+        TestServer(create_upstream_app(latency)) as server,
+    ):
+        register_fake_services(hass, latency)
+        base_url = str(server.make_url("")).rstrip("/")
+        with (
+            patch(
+                "homeassistant.helpers.aiohttp_client._async_make_resolver",
+                return_value=resolver,
+            ),
+            patch.object(
+                web_search, "GOOGLE_SEARCH_URL", f"{base_url}/google/customsearch/v1"
+            ),
+            patch.object(
+                web_search, "KAGI_SEARCH_URL", f"{base_url}/kagi/api/v0/search"
+            ),
+            patch.object(
+                web_search, "BING_WEB_SEARCH_URL", f"{base_url}/bing/v7.0/search"
+            ),
+            patch.object(
+                web_search,
+                "BING_IMAGE_SEARCH_URL",
+                f"{base_url}/bing/v7.0/images/search",
+            ),
+        ):
+            for scenario in build_scenarios(hass, base_url):
+                if args.filter and args.filter not in scenario.name:
+                    continue
+                # Warm up connections, caches and lazily built state
+                await run_scenario(hass, scenario, min(args.calls, 10), 1)
+                for concurrency in args.concurrency:
+                    result = await run_scenario(hass, scenario, args.calls, concurrency)
+                    results.append(result)
+                    _print_result(result)
+        await hass.async_stop(force=True)
+
+    return {
+        "integration_version": json.loads(MANIFEST.read_text())["version"],
+        "homeassistant_version": HA_VERSION,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "started": datetime.now(UTC).isoformat(),
+        "settings": {
+            "calls": args.calls,
+            "concurrency": args.concurrency,
+            "upstream_latency_ms": args.upstream_latency,
+        },
+        "results": results,
+    }
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    """Print one result as a table row."""
+    latency = result["latency_ms"]
+    print(
+        f"{result['scenario']:<32} c={result['concurrency']:<3} "
+        f"{result['throughput_per_s']:>9.1f}/s  "
+        f"p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+        f"p99 {latency['p99']:>8.2f} ms  errors {result['errors']}"
+    )
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Return the scenarios that got slower than the baseline by the threshold.
+
+    A scenario regresses when its p95 latency grows, or its throughput
+    drops, by more than the threshold fraction.
+    """
+    previous = {
+        (result["scenario"], result["concurrency"]): result
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in results["results"]:
+        if (old := previous.get((result["scenario"], result["concurrency"]))) is None:
+            continue
+        label = f"{result['scenario']} at concurrency {result['concurrency']}"
+        old_p95, new_p95 = old["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        if new_p95 > old_p95 * (1 + threshold):
+            regressions.append(f"{label}: p95 {old_p95:.2f} -> {new_p95:.2f} ms")
+        old_rate, new_rate = old["throughput_per_s"], result["throughput_per_s"]
+        if new_rate < old_rate * (1 - threshold):
+            regressions.append(
+                f"{label}: throughput {old_rate:.1f} -> {new_rate:.1f}/s"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks, write the results and compare with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--upstream-latency",
+        type=float,
+        default=20,
+        help="delay added by the fake upstreams and services, in milliseconds",
+    )
+    parser.add_argument("--filter", help="only run scenarios containing this text")
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, help="results of an earlier run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="fraction a metric may get worse before it is reported",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args))
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare is None:
+        return
+    regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+    if not regressions:
+        print(f"No regressions against {args.compare}")
+        return
+    print(f"Regressions against {args.compare}:")
+    for regression in regressions:
+        print(f"  {regression}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,30 +2,77 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
 
-from .const import DOMAIN
-from .tools import (
-    CalendarAddEventTool,
-    CalendarGetEventsTool,
-    CalendarUpdateEventTool,
-    CodeExecutorTool,
-    CreateAutomationTool,
-    GetTravelDistanceTool,
-    GetTravelTimeTool,
-    MusicFindTool,
-    MusicPlayTool,
-    URLFetchTool,
-    WebSearchTool,
+from .const import (
+    CONF_COMMUTE_REFRESH_INTERVAL,
+    CONF_COMMUTE_ROUTES,
+    CONF_ENABLED_TOOLS,
+    CONF_LOOP_WATCHDOG,
+    CONF_PAGE_INDEX,
+    CONF_TOOL_PROFILES,
+    CONF_TRACE_EXPORT,
+    CONF_TRACING,
+    DEFAULT_COMMUTE_REFRESH_INTERVAL,
+    DEFAULT_LOOP_WATCHDOG,
+    DEFAULT_PAGE_INDEX,
+    DEFAULT_TRACE_EXPORT,
+    DEFAULT_TRACING,
+    DOMAIN,
+    PAGE_INDEX_FILE,
+    TOOL_CODE_EXECUTOR,
+    TOOL_CREATE_AUTOMATION,
+    TOOL_GET_TRAVEL_DISTANCE,
+    TOOL_GET_TRAVEL_INFO,
+    TOOL_GET_TRAVEL_TIME,
+    TOOL_NAMES,
+    TOOL_SEARCH_AND_READ,
+    TOOL_SEARCH_FETCHED_PAGES,
+    TOOL_URL_FETCH,
+    TOOL_WEB_SEARCH,
+    TRACE_EXPORT_FILE,
 )
+from .coordinator import WazeCommuteCoordinator, parse_commute_routes
+from .instrumentation import InstrumentedTool, MetricsRegistry
+from .profiles import (
+    ToolProfile,
+    build_api_prompt,
+    match_tool_profile,
+    parse_tool_profiles,
+)
+from .scheduler import async_get_scheduler
+from .tools import import_tool_classes
+from .tracing import Tracer
+from .watchdog import LoopWatchdog
+
+if TYPE_CHECKING:
+    from .tools.automation_index import AutomationIndex
+    from .tools.page_index import PageIndex
+    from .tools.waze_travel_time import WazeRouteCache
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = [Platform.SENSOR]
+
+
+@dataclass
+class AIToolsetData:
+    """Runtime data for an AI Toolset config entry."""
+
+    api: AIToolsetAPI
+    commute_coordinator: WazeCommuteCoordinator | None = None
+
 
 async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
     """Set up the AI Toolset component."""
@@ -40,16 +87,54 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Register LLM tools
     api = AIToolsetAPI(hass, entry)
-    llm.async_register_api(hass, api)
+    entry.async_on_unload(llm.async_register_api(hass, api))
+
+    # Keep frequent routes warm so commute questions are answered from cache
+    commute_coordinator = None
+    if routes := parse_commute_routes(api.config.get(CONF_COMMUTE_ROUTES)):
+        commute_coordinator = WazeCommuteCoordinator(
+            hass,
+            entry,
+            await api.async_get_route_cache(),
+            routes,
+            timedelta(
+                minutes=api.config.get(
+                    CONF_COMMUTE_REFRESH_INTERVAL, DEFAULT_COMMUTE_REFRESH_INTERVAL
+                )
+            ),
+        )
+        # Refresh in the background so Waze lookups do not delay startup
+        entry.async_create_background_task(
+            hass,
+            commute_coordinator.async_refresh(),
+            f"{DOMAIN} commute routes first refresh",
+        )
+
+    # Debug aid: report tool calls that stall the event loop
+    if api.config.get(CONF_LOOP_WATCHDOG, DEFAULT_LOOP_WATCHDOG):
+        api.watchdog = LoopWatchdog(hass, api.metrics)
+        api.watchdog.async_start()
+        entry.async_on_unload(api.watchdog.async_stop)
 
-    _LOGGER.info("AI Toolset integration loaded with %d tools", len(api.tools))
+    entry.runtime_data = AIToolsetData(api=api, commute_coordinator=commute_coordinator)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    _LOGGER.info("AI Toolset integration loaded with %d tools", len(api.enabled_tools))
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    hass.data[DOMAIN].pop(entry.entry_id, None)
-    return True
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    return unload_ok
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
 
 
 class AIToolsetAPI(llm.API):
@@ -60,21 +145,41 @@ class AIToolsetAPI(llm.API):
         super().__init__(hass=hass, id=DOMAIN, name="AI Toolset")
         self.entry = entry
 
-        # Initialize all tools
-        config = entry.data
-        self.tools = [
-            WebSearchTool(hass, config),
-            URLFetchTool(),
-            CreateAutomationTool(),
-            CodeExecutorTool(hass, config),
-            CalendarGetEventsTool(),
-            CalendarAddEventTool(),
-            CalendarUpdateEventTool(),
-            MusicFindTool(),
-            MusicPlayTool(),
-            GetTravelTimeTool(),
-            GetTravelDistanceTool(),
+        # Options override the values entered during setup
+        self.config = config = {**entry.data, **entry.options}
+        enabled = config.get(CONF_ENABLED_TOOLS, TOOL_NAMES)
+        self.page_index_enabled = config.get(CONF_PAGE_INDEX, DEFAULT_PAGE_INDEX)
+        self.enabled_tools = [
+            name
+            for name in TOOL_NAMES
+            if name in enabled
+            # There is nothing to search without the index
+            and (name != TOOL_SEARCH_FETCHED_PAGES or self.page_index_enabled)
         ]
+        self.profiles = parse_tool_profiles(config.get(CONF_TOOL_PROFILES))
+
+        # Tools and the services they share are created on first use
+        self.tools: list[llm.Tool] | None = None
+        self.route_cache: WazeRouteCache | None = None
+        self.automation_index: AutomationIndex | None = None
+        self.page_index: PageIndex | None = None
+        self._tools_lock = asyncio.Lock()
+        self.metrics = MetricsRegistry()
+        self.watchdog: LoopWatchdog | None = None
+        self.tracer: Tracer | None = None
+        if config.get(CONF_TRACING, DEFAULT_TRACING):
+            self.tracer = Tracer(
+                hass,
+                export_path=(
+                    hass.config.path(TRACE_EXPORT_FILE)
+                    if config.get(CONF_TRACE_EXPORT, DEFAULT_TRACE_EXPORT)
+                    else None
+                ),
+            )
+
+        # Tools and prompt per profile, None for contexts without a profile.
+        # Options changes reload the entry, which creates a new API.
+        self._profile_tools: dict[ToolProfile | None, tuple[list[llm.Tool], str]] = {}
 
     async def async_get_api_instance(
         self, llm_context: llm.LLMContext
@@ -85,19 +190,131 @@ class AIToolsetAPI(llm.API):
             llm_context: The LLM context containing platform, language, etc.
 
         Returns:
-            An APIInstance with tools and configuration for this context.
+            An APIInstance with the tools of the profile matching the context,
+            or all enabled tools if no profile matches.
         """
-        # Get the tools for this API
-        tools = await self.async_get_tools()
+        tools, api_prompt = await self._async_get_profile_tools(llm_context)
 
-        # Create and return the API instance
+        # The instance carries the context of this request, so only the tools
+        # and prompt are reused between requests
         return llm.APIInstance(
             api=self,
-            api_prompt="You have access to AI Toolset tools for web search, URL fetching, automation creation, code execution, calendar management, music playback, and Waze travel time/distance.",
+            api_prompt=api_prompt,
             llm_context=llm_context,
             tools=tools,
         )
 
+    async def _async_get_profile_tools(
+        self, llm_context: llm.LLMContext
+    ) -> tuple[list[llm.Tool], str]:
+        """Return the tools and API prompt for the profile of a context."""
+        profile = match_tool_profile(self.profiles, llm_context)
+        if (cached := self._profile_tools.get(profile)) is not None:
+            return cached
+
+        # Only offer the tools that make sense for this context
+        tools = await self.async_get_tools()
+        if profile is not None:
+            _LOGGER.debug(
+                "Using tool profile %s for %s", profile.name, llm_context.platform
+            )
+            tools = [tool for tool in tools if tool.name in profile.tools]
+
+        cached = self._profile_tools[profile] = (
+            tools,
+            build_api_prompt([tool.name for tool in tools]),
+        )
+        return cached
+
     async def async_get_tools(self) -> list[llm.Tool]:
         """Get list of LLM tools."""
+        if self.tools is None:
+            async with self._tools_lock:
+                if self.tools is None:
+                    self.tools = await self._async_create_tools()
         return self.tools
+
+    async def async_get_route_cache(self) -> WazeRouteCache:
+        """Return the route cache shared by the Waze tools and sensors."""
+        if self.route_cache is None:
+            waze = await self.hass.async_add_import_executor_job(
+                import_module, f"{__name__}.tools.waze_travel_time"
+            )
+            if self.route_cache is None:
+                self.route_cache = waze.WazeRouteCache(
+                    default_options=waze.route_options_from_config(self.config)
+                )
+        return self.route_cache
+
+    async def async_get_automation_index(self) -> AutomationIndex:
+        """Return the index of existing automations."""
+        if self.automation_index is None:
+            index_module = await self.hass.async_add_import_executor_job(
+                import_module, f"{__name__}.tools.automation_index"
+            )
+            if self.automation_index is None:
+                self.automation_index = index_module.AutomationIndex()
+                self.entry.async_on_unload(
+                    self.automation_index.async_listen(self.hass)
+                )
+        return self.automation_index
+
+    async def async_get_page_index(self) -> PageIndex | None:
+        """Return the index of fetched pages, None when it is disabled."""
+        if not self.page_index_enabled:
+            return None
+        if self.page_index is None:
+            index_module = await self.hass.async_add_import_executor_job(
+                import_module, f"{__name__}.tools.page_index"
+            )
+            if self.page_index is None:
+                page_index = index_module.PageIndex(
+                    self.hass.config.path(PAGE_INDEX_FILE)
+                )
+                self.page_index = page_index
+                self.entry.async_on_unload(partial(page_index.async_close, self.hass))
+        return self.page_index
+
+    async def _async_create_tools(self) -> list[llm.Tool]:
+        """Import and create the enabled tools."""
+        names = list(self.enabled_tools)
+        if TOOL_SEARCH_AND_READ in names:
+            # Search and read uses the web search and URL fetch tools, even
+            # when they are not offered on their own
+            names.extend(
+                name for name in (TOOL_WEB_SEARCH, TOOL_URL_FETCH) if name not in names
+            )
+        tool_classes = await self.hass.async_add_import_executor_job(
+            import_tool_classes, names
+        )
+
+        tools: dict[str, llm.Tool] = {}
+        for name, tool_class in tool_classes.items():
+            if name in (TOOL_WEB_SEARCH, TOOL_CODE_EXECUTOR):
+                tools[name] = tool_class(self.hass, self.config)
+            elif name == TOOL_SEARCH_AND_READ:
+                # Created last, from the other tools
+                continue
+            elif name in (TOOL_URL_FETCH, TOOL_SEARCH_FETCHED_PAGES):
+                tools[name] = tool_class(await self.async_get_page_index())
+            elif name == TOOL_CREATE_AUTOMATION:
+                tools[name] = tool_class(await self.async_get_automation_index())
+            elif name in (
+                TOOL_GET_TRAVEL_TIME,
+                TOOL_GET_TRAVEL_DISTANCE,
+                TOOL_GET_TRAVEL_INFO,
+            ):
+                tools[name] = tool_class(await self.async_get_route_cache())
+            else:
+                tools[name] = tool_class()
+        if TOOL_SEARCH_AND_READ in tool_classes:
+            tools[TOOL_SEARCH_AND_READ] = tool_classes[TOOL_SEARCH_AND_READ](
+                tools[TOOL_WEB_SEARCH], tools[TOOL_URL_FETCH]
+            )
+
+        _LOGGER.debug("Loaded AI Toolset tools: %s", ", ".join(self.enabled_tools))
+        scheduler = async_get_scheduler(self.hass)
+        return [
+            InstrumentedTool(tools[name], self.metrics, self.tracer, scheduler)
+            for name in self.enabled_tools
+        ]
@@ -0,0 +1,59 @@
+"""Coalescing of concurrent identical requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .tracing import span
+
+
+class RequestCoalescer[T]:
+    """Share one in-flight request between concurrent identical calls.
+
+    The first call for a key starts the request in a task, and calls with the
+    same key made before it finishes wait for that task instead of sending
+    their own request. Each caller waits on the task through a shield, so a
+    cancelled caller does not cancel the request for the others.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize the coalescer."""
+        self.name = name
+        self.coalesced = 0
+        self._pending: dict[Hashable, asyncio.Task[T]] = {}
+
+    async def async_request(
+        self,
+        hass: HomeAssistant,
+        key: Hashable,
+        request: Callable[[], Coroutine[Any, Any, T]],
+    ) -> T:
+        """Return the result of the request for a key, joining one in flight."""
+        coalesced = False
+        # A finished task may not have been discarded yet
+        if (task := self._pending.get(key)) is None or task.done():
+            task = hass.async_create_task(request())
+            self._pending[key] = task
+
+            def _async_discard(done: asyncio.Task[T]) -> None:
+                if self._pending.get(key) is done:
+                    del self._pending[key]
+
+            task.add_done_callback(_async_discard)
+        else:
+            self.coalesced += 1
+            coalesced = True
+
+        with span(
+            "coalesce.wait", **{"coalesce.name": self.name, "coalesced": coalesced}
+        ):
+            return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests in flight."""
+        return len(self._pending)
@@ -7,24 +7,55 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.helpers import selector
 
 from .const import (
     CONF_BING_API_KEY,
+    CONF_BING_DAILY_QUOTA,
+    CONF_COMMUTE_REFRESH_INTERVAL,
+    CONF_COMMUTE_ROUTES,
     CONF_DEFAULT_SEARCH_ENGINE,
     CONF_ENABLE_CODE_EXECUTOR,
+    CONF_ENABLED_TOOLS,
     CONF_GOOGLE_API_KEY,
     CONF_GOOGLE_CX,
+    CONF_GOOGLE_DAILY_QUOTA,
     CONF_KAGI_API_KEY,
+    CONF_KAGI_DAILY_QUOTA,
+    CONF_LOOP_WATCHDOG,
     CONF_MAX_RESULTS,
+    CONF_PAGE_INDEX,
+    CONF_TOOL_PROFILES,
+    CONF_TRACE_EXPORT,
+    CONF_TRACING,
+    CONF_WAZE_AVOID_TOLLS,
+    CONF_WAZE_REGION,
+    CONF_WAZE_UNITS,
+    CONF_WAZE_VEHICLE_TYPE,
+    DEFAULT_COMMUTE_REFRESH_INTERVAL,
+    DEFAULT_DAILY_QUOTAS,
     DEFAULT_ENABLE_CODE_EXECUTOR,
+    DEFAULT_LOOP_WATCHDOG,
     DEFAULT_MAX_RESULTS,
+    DEFAULT_PAGE_INDEX,
     DEFAULT_SEARCH_ENGINE,
+    DEFAULT_TRACE_EXPORT,
+    DEFAULT_TRACING,
+    DEFAULT_WAZE_AVOID_TOLLS,
+    DEFAULT_WAZE_REGION,
+    DEFAULT_WAZE_UNITS,
+    DEFAULT_WAZE_VEHICLE_TYPE,
     DOMAIN,
     SEARCH_ENGINE_BING,
     SEARCH_ENGINE_GOOGLE,
     SEARCH_ENGINE_KAGI,
+    TOOL_NAMES,
+    WAZE_REGIONS,
+    WAZE_UNITS,
+    WAZE_VEHICLE_TYPES,
 )
+from .coordinator import parse_commute_routes
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +69,14 @@ class AIToolsetConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self._search_engine: str | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AIToolsetOptionsFlow:
+        """Get the options flow for this handler."""
+        return AIToolsetOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -225,3 +264,161 @@ class AIToolsetConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="bing", data_schema=data_schema, errors=errors
         )
+
+
+class AIToolsetOptionsFlow(config_entries.OptionsFlow):
+    """Handle AI Toolset options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the AI Toolset options."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            routes = user_input.get(CONF_COMMUTE_ROUTES, [])
+            if len(parse_commute_routes(routes)) != len(routes):
+                errors[CONF_COMMUTE_ROUTES] = "invalid_commute_route"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_ENABLED_TOOLS, default=TOOL_NAMES
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=TOOL_NAMES,
+                        multiple=True,
+                        mode=selector.SelectSelectorMode.LIST,
+                        translation_key=CONF_ENABLED_TOOLS,
+                    )
+                ),
+                vol.Optional(CONF_TOOL_PROFILES, default=[]): selector.ObjectSelector(
+                    selector.ObjectSelectorConfig(
+                        multiple=True,
+                        label_field="name",
+                        fields={
+                            "name": {
+                                "label": "Name",
+                                "required": True,
+                                "selector": {"text": {}},
+                            },
+                            "tools": {
+                                "label": "Tools",
+                                "required": True,
+                                "selector": {
+                                    "select": {
+                                        "options": TOOL_NAMES,
+                                        "multiple": True,
+                                        "translation_key": CONF_ENABLED_TOOLS,
+                                    }
+                                },
+                            },
+                            "platform": {
+                                "label": "Conversation agent integrations",
+                                "selector": {"text": {"multiple": True}},
+                            },
+                            "device_id": {
+                                "label": "Devices",
+                                "selector": {"device": {"multiple": True}},
+                            },
+                            "assistant": {
+                                "label": "Assistants",
+                                "selector": {"text": {"multiple": True}},
+                            },
+                        },
+                    )
+                ),
+                vol.Optional(
+                    CONF_GOOGLE_DAILY_QUOTA,
+                    default=DEFAULT_DAILY_QUOTAS[SEARCH_ENGINE_GOOGLE],
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0, mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    CONF_KAGI_DAILY_QUOTA,
+                    default=DEFAULT_DAILY_QUOTAS[SEARCH_ENGINE_KAGI],
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0, mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    CONF_BING_DAILY_QUOTA,
+                    default=DEFAULT_DAILY_QUOTAS[SEARCH_ENGINE_BING],
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0, mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    CONF_WAZE_REGION, default=DEFAULT_WAZE_REGION
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=WAZE_REGIONS,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                        translation_key=CONF_WAZE_REGION,
+                    )
+                ),
+                vol.Optional(
+                    CONF_WAZE_UNITS, default=DEFAULT_WAZE_UNITS
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=WAZE_UNITS,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                        translation_key=CONF_WAZE_UNITS,
+                    )
+                ),
+                vol.Optional(
+                    CONF_WAZE_VEHICLE_TYPE, default=DEFAULT_WAZE_VEHICLE_TYPE
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=WAZE_VEHICLE_TYPES,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                        translation_key=CONF_WAZE_VEHICLE_TYPE,
+                    )
+                ),
+                vol.Optional(
+                    CONF_WAZE_AVOID_TOLLS, default=DEFAULT_WAZE_AVOID_TOLLS
+                ): selector.BooleanSelector(),
+                vol.Optional(CONF_COMMUTE_ROUTES, default=[]): selector.TextSelector(
+                    selector.TextSelectorConfig(
+                        type=selector.TextSelectorType.TEXT, multiple=True
+                    )
+                ),
+                vol.Optional(
+                    CONF_COMMUTE_REFRESH_INTERVAL,
+                    default=DEFAULT_COMMUTE_REFRESH_INTERVAL,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=120,
+                        unit_of_measurement="min",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_TRACING, default=DEFAULT_TRACING
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_TRACE_EXPORT, default=DEFAULT_TRACE_EXPORT
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_LOOP_WATCHDOG, default=DEFAULT_LOOP_WATCHDOG
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_PAGE_INDEX, default=DEFAULT_PAGE_INDEX
+                ): selector.BooleanSelector(),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                data_schema, user_input or self.config_entry.options
+            ),
+            errors=errors,
+        )
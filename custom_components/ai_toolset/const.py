@@ -7,6 +7,33 @@ TOOL_WEB_SEARCH = "web_search"
 TOOL_URL_FETCH = "url_fetch"
 TOOL_CREATE_AUTOMATION = "create_automation"
 TOOL_CODE_EXECUTOR = "code_executor"
+TOOL_CALENDAR_GET_EVENTS = "calendar_get_events"
+TOOL_CALENDAR_ADD_EVENT = "calendar_add_event"
+TOOL_CALENDAR_UPDATE_EVENT = "calendar_update_event"
+TOOL_MUSIC_FIND = "music_find"
+TOOL_MUSIC_PLAY = "music_play"
+TOOL_GET_TRAVEL_TIME = "get_travel_time"
+TOOL_GET_TRAVEL_DISTANCE = "get_travel_distance"
+TOOL_GET_TRAVEL_INFO = "get_travel_info"
+TOOL_SEARCH_AND_READ = "search_and_read"
+TOOL_SEARCH_FETCHED_PAGES = "search_fetched_pages"
+
+TOOL_NAMES = [
+    TOOL_WEB_SEARCH,
+    TOOL_URL_FETCH,
+    TOOL_CREATE_AUTOMATION,
+    TOOL_CODE_EXECUTOR,
+    TOOL_CALENDAR_GET_EVENTS,
+    TOOL_CALENDAR_ADD_EVENT,
+    TOOL_CALENDAR_UPDATE_EVENT,
+    TOOL_MUSIC_FIND,
+    TOOL_MUSIC_PLAY,
+    TOOL_GET_TRAVEL_TIME,
+    TOOL_GET_TRAVEL_DISTANCE,
+    TOOL_GET_TRAVEL_INFO,
+    TOOL_SEARCH_AND_READ,
+    TOOL_SEARCH_FETCHED_PAGES,
+]
 
 # Configuration keys
 CONF_GOOGLE_API_KEY = "google_api_key"
@@ -16,6 +43,14 @@ CONF_BING_API_KEY = "bing_api_key"
 CONF_DEFAULT_SEARCH_ENGINE = "default_search_engine"
 CONF_MAX_RESULTS = "max_results"
 CONF_ENABLE_CODE_EXECUTOR = "enable_code_executor"
+CONF_WAZE_REGION = "waze_region"
+CONF_WAZE_UNITS = "waze_units"
+CONF_WAZE_VEHICLE_TYPE = "waze_vehicle_type"
+CONF_WAZE_AVOID_TOLLS = "waze_avoid_tolls"
+CONF_COMMUTE_ROUTES = "commute_routes"
+CONF_COMMUTE_REFRESH_INTERVAL = "commute_refresh_interval"
+CONF_ENABLED_TOOLS = "enabled_tools"
+CONF_TOOL_PROFILES = "tool_profiles"
 
 # Defaults
 DEFAULT_MAX_RESULTS = 5
@@ -32,3 +67,134 @@ SEARCH_ENGINES = [
     SEARCH_ENGINE_KAGI,
     SEARCH_ENGINE_BING,
 ]
+
+# Engines in the order they are used when none is requested
+SEARCH_ENGINE_API_KEYS = {
+    SEARCH_ENGINE_GOOGLE: CONF_GOOGLE_API_KEY,
+    SEARCH_ENGINE_KAGI: CONF_KAGI_API_KEY,
+    SEARCH_ENGINE_BING: CONF_BING_API_KEY,
+}
+
+# Search quotas, 0 for no daily limit
+CONF_GOOGLE_DAILY_QUOTA = "google_daily_quota"
+CONF_KAGI_DAILY_QUOTA = "kagi_daily_quota"
+CONF_BING_DAILY_QUOTA = "bing_daily_quota"
+SEARCH_DAILY_QUOTA_KEYS = {
+    SEARCH_ENGINE_GOOGLE: CONF_GOOGLE_DAILY_QUOTA,
+    SEARCH_ENGINE_KAGI: CONF_KAGI_DAILY_QUOTA,
+    SEARCH_ENGINE_BING: CONF_BING_DAILY_QUOTA,
+}
+# Google Custom Search is free for 100 queries a day, Kagi and Bing bill per query
+DEFAULT_DAILY_QUOTAS = {
+    SEARCH_ENGINE_GOOGLE: 100,
+    SEARCH_ENGINE_KAGI: 0,
+    SEARCH_ENGINE_BING: 0,
+}
+# Requests per second, bursts of up to SEARCH_RATE_BURST requests are allowed
+SEARCH_RATE_LIMITS = {
+    SEARCH_ENGINE_GOOGLE: 1.0,
+    SEARCH_ENGINE_KAGI: 1.0,
+    SEARCH_ENGINE_BING: 3.0,
+}
+SEARCH_RATE_BURST = 5
+MAX_SEARCH_RATE_WAIT = 5  # seconds a search may wait for the rate limit
+# Below this fraction of the daily quota, cached results are served first
+SEARCH_QUOTA_LOW_FRACTION = 0.1
+SEARCH_CACHE_MAX_AGE = 6 * 60 * 60  # seconds, for results served on a low quota
+MAX_SEARCH_CACHE_ENTRIES = 200
+MAX_SEARCH_RESPONSE_BYTES = 1024 * 1024
+SEARCH_QUOTA_STORAGE_KEY = f"{DOMAIN}.search_quota"
+SEARCH_QUOTA_STORAGE_VERSION = 1
+SEARCH_QUOTA_SAVE_DELAY = 10  # seconds
+
+# Waze travel time
+WAZE_DOMAIN = "waze_travel_time"
+WAZE_SERVICE_GET_TRAVEL_TIME = "get_travel_time"
+DEFAULT_WAZE_REGION = "us"
+DEFAULT_WAZE_UNITS = "imperial"
+DEFAULT_WAZE_VEHICLE_TYPE = "car"
+DEFAULT_WAZE_AVOID_TOLLS = False
+DEFAULT_COMMUTE_REFRESH_INTERVAL = 10  # minutes
+COMMUTE_REFRESH_JITTER = 60  # seconds
+COMMUTE_REFRESH_SPACING = 2  # seconds between routes in a refresh
+COMMUTE_ROUTE_SEPARATOR = "->"
+DEFAULT_ROUTE_CACHE_TTL = 120  # seconds
+MAX_TRAVEL_MATRIX_ROUTES = 25
+MAX_WAZE_CONCURRENCY = 3  # Waze service calls at once, across all travel tools
+GEOCODE_STORAGE_KEY = f"{DOMAIN}.geocode_cache"
+GEOCODE_STORAGE_VERSION = 1
+GEOCODE_SAVE_DELAY = 30  # seconds
+MAX_GEOCODE_CACHE_ENTRIES = 500
+
+WAZE_REGIONS = ["us", "na", "eu", "il", "au"]
+WAZE_UNITS = ["imperial", "metric"]
+WAZE_VEHICLE_TYPES = ["car", "taxi", "motorcycle"]
+
+# URL fetching
+MAX_URL_FETCH_BATCH = 10
+MAX_URL_FETCH_CONCURRENCY = 5
+MAX_URL_FETCH_PER_HOST = 2
+MAX_PAGE_BYTES = 5 * 1024 * 1024  # bytes of a page body read, the rest is dropped
+MAX_PDF_BYTES = 20 * 1024 * 1024  # PDFs cannot be read without their end
+MAX_DOCUMENT_TEXT_LENGTH = 200000  # characters extracted from a document
+CHARSET_SNIFF_BYTES = 4096  # bytes searched for a <meta charset> declaration
+MAX_PAGE_CACHE_ENTRIES = 20  # extracted pages kept to read further chunks
+PAGE_CACHE_MAX_AGE = 600  # seconds
+
+# Search and read
+DEFAULT_SEARCH_AND_READ_PAGES = 3
+MAX_SEARCH_AND_READ_PAGES = 5
+DEFAULT_PASSAGES_PER_PAGE = 3
+SEARCH_AND_READ_DEADLINE = 15  # seconds to fetch the pages of the results
+PASSAGE_LENGTH = 500  # characters, passages are split at line ends
+RANKED_TEXT_LENGTH = 100000  # characters of page text ranked against a query
+
+# Index of fetched pages
+CONF_PAGE_INDEX = "page_index"
+DEFAULT_PAGE_INDEX = False
+PAGE_INDEX_FILE = "ai_toolset_pages.db"  # in the configuration directory
+PAGE_INDEX_MAX_PAGES = 1000
+PAGE_INDEX_MAX_AGE = 30 * 24 * 60 * 60  # seconds a page is kept after its fetch
+DEFAULT_PAGE_SEARCH_RESULTS = 5
+MAX_PAGE_SEARCH_RESULTS = 20
+
+# Automations
+AUTOMATION_DOMAIN = "automation"
+MAX_DRY_RUN_HISTORY_HOURS = 168
+MAX_DRY_RUN_FIRE_TIMES = 50
+
+# Metrics
+METRICS_LATENCY_SAMPLES = 500  # most recent calls used for percentiles
+BYTES_PER_TOKEN = 4  # rough average for English text and JSON
+
+# Tracing
+CONF_TRACING = "tracing"
+CONF_TRACE_EXPORT = "trace_export"
+DEFAULT_TRACING = False
+DEFAULT_TRACE_EXPORT = False
+TRACE_BUFFER_SIZE = 50  # most recent traces shown in diagnostics
+MAX_SPANS_PER_TRACE = 200
+TRACE_EXPORT_FILE = "ai_toolset_traces.jsonl"  # in the configuration directory
+TRACE_EXPORT_MAX_BYTES = 5 * 1024 * 1024  # rotated to a single .1 backup
+
+# Scheduling of tool calls
+MAX_CONCURRENT_TOOL_CALLS = 6
+MAX_QUEUED_TOOL_CALLS = 32
+MAX_TOOL_CALL_QUEUE_WAIT = 30  # seconds before a queued call is rejected
+# Tools that use a lot of CPU, network or Home Assistant resources per call
+TOOL_CONCURRENCY_LIMITS = {
+    TOOL_CODE_EXECUTOR: 1,
+    TOOL_CREATE_AUTOMATION: 1,
+    TOOL_GET_TRAVEL_INFO: 2,
+    TOOL_SEARCH_AND_READ: 2,
+    TOOL_URL_FETCH: 4,
+    TOOL_WEB_SEARCH: 4,
+}
+
+# Event loop watchdog
+CONF_LOOP_WATCHDOG = "loop_watchdog"
+DEFAULT_LOOP_WATCHDOG = False
+LOOP_WATCHDOG_INTERVAL = 0.05  # seconds between heartbeats
+LOOP_BLOCK_THRESHOLD = 0.1  # seconds the loop may stall before it is reported
+LOOP_BLOCK_HISTORY = 20  # most recent blocks shown in diagnostics
+LOOP_BLOCK_STACK_LIMIT = 20  # innermost frames kept of a blocking stack
@@ -0,0 +1,113 @@
+"""Background refresh of frequent Waze routes for AI Toolset."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    COMMUTE_REFRESH_JITTER,
+    COMMUTE_REFRESH_SPACING,
+    COMMUTE_ROUTE_SEPARATOR,
+    DOMAIN,
+)
+
+if TYPE_CHECKING:
+    from .tools.waze_travel_time import WazeRouteCache
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CommuteRoute:
+    """A frequently requested route."""
+
+    origin: str
+    destination: str
+
+    @property
+    def route_id(self) -> str:
+        """Return a stable identifier for the route."""
+        return f"{self.origin}{COMMUTE_ROUTE_SEPARATOR}{self.destination}"
+
+
+def parse_commute_routes(routes: list[str] | None) -> list[CommuteRoute]:
+    """Parse configured routes written as "origin -> destination"."""
+    parsed = []
+    for route in routes or []:
+        origin, separator, destination = route.partition(COMMUTE_ROUTE_SEPARATOR)
+        if not separator or not origin.strip() or not destination.strip():
+            _LOGGER.warning("Ignoring invalid commute route: %s", route)
+            continue
+        parsed.append(CommuteRoute(origin.strip(), destination.strip()))
+    return parsed
+
+
+class WazeCommuteCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Keep frequent routes warm in the shared route cache.
+
+    Routes are refreshed one at a time with a pause in between, and each
+    refresh interval is jittered so several installs (or several entries)
+    do not poll Waze in lockstep.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        route_cache: WazeRouteCache,
+        routes: list[CommuteRoute],
+        refresh_interval: timedelta,
+    ) -> None:
+        """Initialize the commute coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} commute routes",
+            update_interval=refresh_interval,
+        )
+        self.route_cache = route_cache
+        self.routes = routes
+        self.refresh_interval = refresh_interval
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Refresh every configured route."""
+        # Keep routes cached until shortly after the next refresh is due
+        jitter = random.uniform(0, COMMUTE_REFRESH_JITTER)
+        self.update_interval = self.refresh_interval + timedelta(seconds=jitter)
+        ttl = self.update_interval.total_seconds() + COMMUTE_REFRESH_JITTER
+
+        data: dict[str, dict[str, Any]] = {}
+        for index, route in enumerate(self.routes):
+            if index:
+                await asyncio.sleep(COMMUTE_REFRESH_SPACING)
+            try:
+                result = await self.route_cache.async_get_route(
+                    self.hass, route.origin, route.destination, refresh=True, ttl=ttl
+                )
+            except Exception as err:
+                _LOGGER.debug("Error refreshing commute route %s: %s", route, err)
+                result = None
+            if result is None:
+                # Keep the last known value rather than dropping the route
+                if self.data and route.route_id in self.data:
+                    data[route.route_id] = self.data[route.route_id]
+                continue
+            data[route.route_id] = {
+                "origin": route.origin,
+                "destination": route.destination,
+                **result,
+            }
+
+        if self.routes and not data:
+            raise UpdateFailed("Unable to refresh any commute route from Waze")
+        return data
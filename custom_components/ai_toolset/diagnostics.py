@@ -0,0 +1,39 @@
+"""Diagnostics support for AI Toolset."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_BING_API_KEY,
+    CONF_GOOGLE_API_KEY,
+    CONF_GOOGLE_CX,
+    CONF_KAGI_API_KEY,
+)
+from .quota import async_get_search_quota
+from .scheduler import async_get_scheduler
+
+TO_REDACT = {CONF_BING_API_KEY, CONF_GOOGLE_API_KEY, CONF_GOOGLE_CX, CONF_KAGI_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    api = entry.runtime_data.api
+    return {
+        "config": async_redact_data(api.config, TO_REDACT),
+        "enabled_tools": api.enabled_tools,
+        "tools_loaded": api.tools is not None,
+        "tool_metrics": api.metrics.as_dict(),
+        "tracing": api.tracer is not None,
+        "traces": api.tracer.as_dict() if api.tracer is not None else [],
+        "scheduler": async_get_scheduler(hass).as_dict(),
+        "search_quota": async_get_search_quota(hass).as_dict(),
+        "loop_watchdog": api.watchdog is not None,
+        "loop_blocks": api.watchdog.as_dict() if api.watchdog is not None else [],
+    }
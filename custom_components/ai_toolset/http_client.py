@@ -0,0 +1,68 @@
+"""Shared HTTP client session for AI Toolset tools."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.util.hass_dict import HassKey
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN
+from .instrumentation import record_transfer
+from .tracing import create_trace_config
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+DATA_CLIENT_SESSION: HassKey[aiohttp.ClientSession] = HassKey(
+    f"{DOMAIN}_client_session"
+)
+
+
+@callback
+def async_get_clientsession(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the client session shared by the tools.
+
+    Connections are pooled across tool calls, and requests made during a
+    traced tool call are recorded in its trace. The session is closed when
+    Home Assistant stops.
+
+    aiohttp asks for brotli and zstd compressed responses when their
+    decoders are installed, and decompresses bodies as they are read.
+    """
+    if (session := hass.data.get(DATA_CLIENT_SESSION)) is None:
+        session = hass.data[DATA_CLIENT_SESSION] = async_create_clientsession(
+            hass, trace_configs=[create_trace_config()]
+        )
+    return session
+
+
+async def async_read_body(
+    response: aiohttp.ClientResponse, limit: int
+) -> tuple[bytes, bool]:
+    """Read a response body of up to limit bytes.
+
+    The limit applies to the decompressed body. Returns the body and whether
+    it was cut at the limit, in which case the rest is not downloaded.
+    """
+    body = bytearray()
+    truncated = False
+    async for chunk in response.content.iter_chunked(_READ_CHUNK_SIZE):
+        body += chunk
+        if len(body) > limit:
+            truncated = True
+            break
+    record_transfer(response.content.total_raw_bytes, response.content.total_bytes)
+    if truncated:
+        return bytes(body[:limit]), True
+    return bytes(body), False
+
+
+async def async_read_json(response: aiohttp.ClientResponse, limit: int) -> Any:
+    """Read and parse a JSON response body of up to limit bytes."""
+    body, truncated = await async_read_body(response, limit)
+    if truncated:
+        raise ValueError(f"Response body is larger than {limit} bytes")
+    return json_loads(body)
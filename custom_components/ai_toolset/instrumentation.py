@@ -0,0 +1,323 @@
+"""Per-tool call metrics for AI Toolset."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import llm
+from homeassistant.helpers.json import json_bytes
+
+from .const import BYTES_PER_TOKEN, METRICS_LATENCY_SAMPLES
+from .scheduler import ToolScheduler, ToolSchedulerFull, conversation_key
+from .tracing import Tracer
+
+
+@dataclass
+class CallStats:
+    """Cache and network activity during a single tool call."""
+
+    cache_lookups: int = 0
+    cache_hits: int = 0
+    received_bytes: int = 0
+    decompressed_bytes: int = 0
+
+
+_current_call: ContextVar[CallStats | None] = ContextVar(
+    "ai_toolset_current_call", default=None
+)
+_current_tool: ContextVar[str | None] = ContextVar(
+    "ai_toolset_current_tool", default=None
+)
+
+
+def task_tool_name(task: asyncio.Task[Any]) -> str | None:
+    """Return the name of the tool call a task runs for, if any.
+
+    Tasks inherit the context they are created in, so the tasks a tool call
+    hands work to, such as coalesced requests, count as part of the call.
+    """
+    return task.get_context().get(_current_tool)
+
+
+def record_cache_lookup(hit: bool) -> None:
+    """Record a cache lookup made on behalf of the current tool call.
+
+    Lookups made outside of a tool call, such as background refreshes, are
+    not counted.
+    """
+    if (stats := _current_call.get()) is None:
+        return
+    stats.cache_lookups += 1
+    if hit:
+        stats.cache_hits += 1
+
+
+def record_transfer(received: int, decompressed: int) -> None:
+    """Record a response body downloaded for the current tool call.
+
+    received is the size of the body on the wire, before it is decompressed.
+    """
+    if (stats := _current_call.get()) is None:
+        return
+    stats.received_bytes += received
+    stats.decompressed_bytes += decompressed
+
+
+def _percentile(ordered: list[float], percent: float) -> float | None:
+    """Return a percentile of sorted values using the nearest-rank method."""
+    if not ordered:
+        return None
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class ToolMetrics:
+    """Aggregated metrics of one tool.
+
+    Latency percentiles are computed over the most recent calls, so they
+    follow changes in upstream performance.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.calls = 0
+        self.errors = 0
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.response_bytes = 0
+        self.received_bytes = 0
+        self.decompressed_bytes = 0
+        self.loop_blocks = 0
+        self.max_loop_block = 0.0
+        self.latencies: deque[float] = deque(maxlen=METRICS_LATENCY_SAMPLES)
+
+    def record(
+        self, duration: float, error: bool, response_bytes: int, stats: CallStats
+    ) -> None:
+        """Record a finished call."""
+        self.calls += 1
+        self.errors += error
+        self.cache_lookups += stats.cache_lookups
+        self.cache_hits += stats.cache_hits
+        self.response_bytes += response_bytes
+        self.received_bytes += stats.received_bytes
+        self.decompressed_bytes += stats.decompressed_bytes
+        self.latencies.append(duration * 1000)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot of the metrics."""
+        ordered = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else None,
+            "latency_p50_ms": _round(_percentile(ordered, 50)),
+            "latency_p95_ms": _round(_percentile(ordered, 95)),
+            "latency_p99_ms": _round(_percentile(ordered, 99)),
+            "cache_lookups": self.cache_lookups,
+            "cache_hit_rate": (
+                round(self.cache_hits / self.cache_lookups, 4)
+                if self.cache_lookups
+                else None
+            ),
+            "response_bytes": self.response_bytes,
+            "average_response_bytes": (
+                round(self.response_bytes / self.calls) if self.calls else None
+            ),
+            # Rough estimate, tokenizers differ between models
+            "response_tokens": self.response_bytes // BYTES_PER_TOKEN,
+            # Downloads, compressed and after decompression
+            "received_bytes": self.received_bytes,
+            "decompressed_bytes": self.decompressed_bytes,
+            "compression_ratio": (
+                round(self.decompressed_bytes / self.received_bytes, 2)
+                if self.received_bytes
+                else None
+            ),
+            "loop_blocks": self.loop_blocks,
+            "max_loop_block_ms": (
+                round(self.max_loop_block * 1000, 1) if self.loop_blocks else None
+            ),
+        }
+
+
+def _round(value: float | None) -> float | None:
+    """Round a latency for display."""
+    return None if value is None else round(value, 1)
+
+
+class MetricsRegistry:
+    """Metrics of every tool of an API, with update listeners."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.tools: dict[str, ToolMetrics] = {}
+        self._listeners: dict[str, list[Callable[[], None]]] = {}
+
+    def get(self, tool_name: str) -> ToolMetrics:
+        """Return the metrics of a tool."""
+        if (metrics := self.tools.get(tool_name)) is None:
+            metrics = self.tools[tool_name] = ToolMetrics()
+        return metrics
+
+    @callback
+    def async_add_listener(
+        self, tool_name: str, update_callback: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for new calls of a tool."""
+        listeners = self._listeners.setdefault(tool_name, [])
+        listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            listeners.remove(update_callback)
+
+        return _async_remove
+
+    @callback
+    def async_record(
+        self,
+        tool_name: str,
+        duration: float,
+        error: bool,
+        response_bytes: int,
+        stats: CallStats,
+    ) -> None:
+        """Record a finished call and notify listeners."""
+        self.get(tool_name).record(duration, error, response_bytes, stats)
+        self._async_notify(tool_name)
+
+    @callback
+    def async_record_loop_block(self, tool_name: str, duration: float) -> None:
+        """Record that a call of a tool blocked the event loop."""
+        metrics = self.get(tool_name)
+        metrics.loop_blocks += 1
+        metrics.max_loop_block = max(metrics.max_loop_block, duration)
+        self._async_notify(tool_name)
+
+    @callback
+    def _async_notify(self, tool_name: str) -> None:
+        """Notify the listeners of a tool."""
+        for update_callback in list(self._listeners.get(tool_name, [])):
+            update_callback()
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return a snapshot of the metrics of every tool."""
+        return {name: metrics.as_dict() for name, metrics in self.tools.items()}
+
+
+def _is_error(result: Any) -> bool:
+    """Return if a tool result reports a failure."""
+    return isinstance(result, dict) and (
+        result.get("success") is False or "error" in result
+    )
+
+
+def _response_size(result: Any) -> int:
+    """Return the size of a tool result as sent to the LLM."""
+    try:
+        return len(json_bytes(result))
+    except TypeError:
+        return 0
+
+
+class InstrumentedTool(llm.Tool):
+    """Record metrics, and optionally a trace, around the calls of a tool."""
+
+    def __init__(
+        self,
+        tool: llm.Tool,
+        metrics: MetricsRegistry,
+        tracer: Tracer | None = None,
+        scheduler: ToolScheduler | None = None,
+    ) -> None:
+        """Wrap a tool."""
+        self.tool = tool
+        self.name = tool.name
+        self.description = tool.description
+        self.parameters = tool.parameters
+        self._metrics = metrics
+        self._tracer = tracer
+        self._scheduler = scheduler
+
+    async def async_call(
+        self,
+        hass: HomeAssistant,
+        tool_input: llm.ToolInput,
+        llm_context: llm.LLMContext,
+    ) -> Any:
+        """Call the wrapped tool and record its metrics."""
+        stats = CallStats()
+        token = _current_call.set(stats)
+        tool_token = _current_tool.set(self.name)
+        start = time.perf_counter()
+        try:
+            with (
+                self._tracer.trace(
+                    f"tool {self.name}",
+                    **{
+                        "tool.name": self.name,
+                        "llm.platform": llm_context.platform,
+                    },
+                )
+                if self._tracer is not None
+                else nullcontext()
+            ) as root:
+                result = await self._async_call_scheduled(hass, tool_input, llm_context)
+                if root is not None and _is_error(result):
+                    root.error = str(result.get("error", "Tool reported a failure"))
+        except Exception:
+            self._metrics.async_record(
+                self.name, time.perf_counter() - start, True, 0, stats
+            )
+            raise
+        finally:
+            _current_call.reset(token)
+            _current_tool.reset(tool_token)
+
+        self._metrics.async_record(
+            self.name,
+            time.perf_counter() - start,
+            _is_error(result),
+            _response_size(result),
+            stats,
+        )
+        return result
+
+    async def _async_call_scheduled(
+        self,
+        hass: HomeAssistant,
+        tool_input: llm.ToolInput,
+        llm_context: llm.LLMContext,
+    ) -> Any:
+        """Call the wrapped tool once the scheduler has a slot for it."""
+        if self._scheduler is None:
+            return await self.tool.async_call(hass, tool_input, llm_context)
+        try:
+            async with self._scheduler.async_slot(
+                self.name, conversation_key(llm_context)
+            ):
+                return await self.tool.async_call(hass, tool_input, llm_context)
+        except ToolSchedulerFull as err:
+            return {
+                "success": False,
+                "error": "Too many tool calls in progress",
+                "retry_after": err.retry_after,
+                "message": f"Home Assistant is busy, try again in "
+                f"{err.retry_after} seconds.",
+            }
+
+    def __getattr__(self, name: str) -> Any:
+        """Expose the attributes of the wrapped tool."""
+        if name == "tool":
+            raise AttributeError(name)
+        return getattr(self.tool, name)
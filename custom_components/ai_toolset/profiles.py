@@ -0,0 +1,124 @@
+"""Context-specific tool profiles for AI Toolset."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.helpers import llm
+
+from .const import (
+    TOOL_CALENDAR_ADD_EVENT,
+    TOOL_CALENDAR_GET_EVENTS,
+    TOOL_CALENDAR_UPDATE_EVENT,
+    TOOL_CODE_EXECUTOR,
+    TOOL_CREATE_AUTOMATION,
+    TOOL_GET_TRAVEL_DISTANCE,
+    TOOL_GET_TRAVEL_INFO,
+    TOOL_GET_TRAVEL_TIME,
+    TOOL_MUSIC_FIND,
+    TOOL_MUSIC_PLAY,
+    TOOL_NAMES,
+    TOOL_SEARCH_AND_READ,
+    TOOL_SEARCH_FETCHED_PAGES,
+    TOOL_URL_FETCH,
+    TOOL_WEB_SEARCH,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# What each tool lets the assistant do, as listed in the API prompt
+TOOL_CAPABILITIES = {
+    TOOL_WEB_SEARCH: "web search",
+    TOOL_URL_FETCH: "URL fetching",
+    TOOL_CREATE_AUTOMATION: "automation creation",
+    TOOL_CODE_EXECUTOR: "code execution",
+    TOOL_CALENDAR_GET_EVENTS: "calendar management",
+    TOOL_CALENDAR_ADD_EVENT: "calendar management",
+    TOOL_CALENDAR_UPDATE_EVENT: "calendar management",
+    TOOL_MUSIC_FIND: "music playback",
+    TOOL_MUSIC_PLAY: "music playback",
+    TOOL_GET_TRAVEL_TIME: "Waze travel time/distance",
+    TOOL_GET_TRAVEL_DISTANCE: "Waze travel time/distance",
+    TOOL_GET_TRAVEL_INFO: "Waze travel time/distance",
+    TOOL_SEARCH_AND_READ: "web search",
+    TOOL_SEARCH_FETCHED_PAGES: "search of fetched pages",
+}
+
+
+def _as_set(value: Any) -> frozenset[str]:
+    """Return a profile criterion that may be a string or a list as a set."""
+    if not value:
+        return frozenset()
+    if isinstance(value, str):
+        return frozenset({value})
+    return frozenset(value)
+
+
+@dataclass(frozen=True)
+class ToolProfile:
+    """A set of tools offered in matching conversation contexts.
+
+    Empty criteria match any context.
+    """
+
+    name: str
+    tools: frozenset[str]
+    platforms: frozenset[str] = frozenset()
+    device_ids: frozenset[str] = frozenset()
+    assistants: frozenset[str] = frozenset()
+
+    def matches(self, llm_context: llm.LLMContext) -> bool:
+        """Return if the profile applies to an LLM context."""
+        return (
+            (not self.platforms or llm_context.platform in self.platforms)
+            and (not self.device_ids or llm_context.device_id in self.device_ids)
+            and (not self.assistants or llm_context.assistant in self.assistants)
+        )
+
+
+def parse_tool_profiles(profiles: list[dict[str, Any]] | None) -> list[ToolProfile]:
+    """Parse configured tool profiles, in the order they are matched."""
+    parsed = []
+    for profile in profiles or []:
+        if not isinstance(profile, dict) or not profile.get("name"):
+            _LOGGER.warning("Ignoring tool profile without a name: %s", profile)
+            continue
+        tools = _as_set(profile.get("tools"))
+        if unknown := tools - set(TOOL_NAMES):
+            _LOGGER.warning(
+                "Ignoring tool profile %s with unknown tools: %s",
+                profile["name"],
+                ", ".join(sorted(unknown)),
+            )
+            continue
+        parsed.append(
+            ToolProfile(
+                name=profile["name"],
+                tools=tools,
+                platforms=_as_set(profile.get("platform")),
+                device_ids=_as_set(profile.get("device_id")),
+                assistants=_as_set(profile.get("assistant")),
+            )
+        )
+    return parsed
+
+
+def match_tool_profile(
+    profiles: list[ToolProfile], llm_context: llm.LLMContext
+) -> ToolProfile | None:
+    """Return the first profile that applies to an LLM context."""
+    return next((profile for profile in profiles if profile.matches(llm_context)), None)
+
+
+def build_api_prompt(tool_names: list[str]) -> str:
+    """Return the API prompt describing the given tools."""
+    capabilities = list(dict.fromkeys(TOOL_CAPABILITIES[name] for name in tool_names))
+    if not capabilities:
+        return "No AI Toolset tools are available in this conversation."
+    if len(capabilities) <= 2:
+        listed = " and ".join(capabilities)
+    else:
+        listed = f"{', '.join(capabilities[:-1])}, and {capabilities[-1]}"
+    return f"You have access to AI Toolset tools for {listed}."
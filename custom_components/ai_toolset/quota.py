@@ -0,0 +1,184 @@
+"""Daily quotas and rate limits of the search engines."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DEFAULT_DAILY_QUOTAS,
+    DOMAIN,
+    SEARCH_DAILY_QUOTA_KEYS,
+    SEARCH_ENGINE_API_KEYS,
+    SEARCH_QUOTA_SAVE_DELAY,
+    SEARCH_QUOTA_STORAGE_KEY,
+    SEARCH_QUOTA_STORAGE_VERSION,
+    SEARCH_RATE_BURST,
+    SEARCH_RATE_LIMITS,
+)
+
+DATA_SEARCH_QUOTA: HassKey[SearchQuota] = HassKey(f"{DOMAIN}_search_quota")
+
+
+def configured_engines(config: dict[str, Any]) -> list[str]:
+    """Return the search engines with an API key, in order of preference."""
+    return [
+        engine
+        for engine, conf_key in SEARCH_ENGINE_API_KEYS.items()
+        if conf_key in config
+    ]
+
+
+def daily_quota(config: dict[str, Any], engine: str) -> int:
+    """Return the daily quota of a search engine, 0 for no limit."""
+    return int(
+        config.get(SEARCH_DAILY_QUOTA_KEYS[engine], DEFAULT_DAILY_QUOTAS[engine])
+    )
+
+
+class TokenBucket:
+    """Rate limit that allows short bursts.
+
+    The bucket holds up to capacity tokens and is refilled at rate tokens per
+    second. Each request takes a token.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self) -> float:
+        """Return the seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def reserve(self) -> float:
+        """Take the next token and return the seconds to wait for it."""
+        delay = self.delay()
+        self._tokens -= 1
+        return delay
+
+
+class SearchQuota:
+    """Searches made today and the rate limit of each search engine.
+
+    The counts are shared by all AI Toolset entries, as entries may use the
+    same API key. They are persisted so a restart does not reset them, and
+    start over at midnight local time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rate_limits: dict[str, float] | None = None,
+    ) -> None:
+        """Initialize the quota tracker."""
+        self.hass = hass
+        self._buckets = {
+            engine: TokenBucket(rate, SEARCH_RATE_BURST)
+            for engine, rate in (rate_limits or SEARCH_RATE_LIMITS).items()
+        }
+        self._day = dt_util.now().date().isoformat()
+        self._used: dict[str, int] = {}
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SEARCH_QUOTA_STORAGE_VERSION, SEARCH_QUOTA_STORAGE_KEY
+        )
+        self._load_task: asyncio.Task[None] | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    async def async_load(self) -> None:
+        """Load the persisted counts on first use."""
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load_store())
+        await asyncio.shield(self._load_task)
+
+    async def _async_load_store(self) -> None:
+        """Read the counts of today from storage."""
+        if (stored := await self._store.async_load()) and stored["day"] == self._day:
+            for engine, used in stored["used"].items():
+                self._used[engine] = self._used.get(engine, 0) + used
+
+    def _roll_over(self) -> None:
+        """Start the counts over on a new day."""
+        if (today := dt_util.now().date().isoformat()) != self._day:
+            self._day = today
+            self._used = {}
+
+    def used(self, engine: str) -> int:
+        """Return the number of searches made with an engine today."""
+        self._roll_over()
+        return self._used.get(engine, 0)
+
+    def remaining(self, engine: str, daily_quota: int) -> int | None:
+        """Return the searches left today, None without a daily quota."""
+        if not daily_quota:
+            return None
+        return max(0, daily_quota - self.used(engine))
+
+    def bucket(self, engine: str) -> TokenBucket:
+        """Return the rate limit of an engine."""
+        if (bucket := self._buckets.get(engine)) is None:
+            bucket = self._buckets[engine] = TokenBucket(1.0, SEARCH_RATE_BURST)
+        return bucket
+
+    @callback
+    def async_record(self, engine: str) -> None:
+        """Count a search sent to an engine and notify listeners."""
+        self._roll_over()
+        self._used[engine] = self._used.get(engine, 0) + 1
+        self._store.async_delay_save(
+            lambda: {"day": self._day, "used": dict(self._used)},
+            SEARCH_QUOTA_SAVE_DELAY,
+        )
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Listen for searches."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counts of today."""
+        self._roll_over()
+        return {"day": self._day, "used": dict(self._used)}
+
+
+@callback
+def async_get_search_quota(hass: HomeAssistant) -> SearchQuota:
+    """Return the quota tracker shared by all AI Toolset entries."""
+    if (quota := hass.data.get(DATA_SEARCH_QUOTA)) is None:
+        quota = hass.data[DATA_SEARCH_QUOTA] = SearchQuota(hass)
+    return quota
@@ -0,0 +1,227 @@
+"""Concurrency limits and fair scheduling of AI Toolset tool calls."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import llm
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    MAX_CONCURRENT_TOOL_CALLS,
+    MAX_QUEUED_TOOL_CALLS,
+    MAX_TOOL_CALL_QUEUE_WAIT,
+    TOOL_CONCURRENCY_LIMITS,
+)
+from .tracing import span
+
+DATA_SCHEDULER: HassKey[ToolScheduler] = HassKey(f"{DOMAIN}_scheduler")
+
+# Weight of the latest call in the average call duration
+_DURATION_SMOOTHING = 0.2
+
+
+class ToolSchedulerFull(Exception):
+    """Raised when a tool call cannot be queued or waited too long."""
+
+    def __init__(self, retry_after: int) -> None:
+        """Initialize the error with the seconds to wait before retrying."""
+        super().__init__(f"Too many tool calls, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True)
+class _Waiter:
+    """A queued tool call."""
+
+    tool_name: str
+    future: asyncio.Future[None]
+
+
+def conversation_key(llm_context: llm.LLMContext) -> str:
+    """Return the key tool calls are shared fairly between.
+
+    Calls made while answering the same request share its context.
+    """
+    if llm_context.context is not None:
+        return llm_context.context.id
+    return f"{llm_context.platform}/{llm_context.device_id}"
+
+
+class ToolScheduler:
+    """Limit how many tool calls run at once.
+
+    Calls run while there are free slots overall and for their tool. Other
+    calls wait in a queue per conversation, and free slots are handed to the
+    conversations in turn, so one busy conversation cannot starve the others.
+    When the queue is full, or a call waits too long, it is rejected with a
+    hint of when to retry.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_TOOL_CALLS,
+        max_queued: int = MAX_QUEUED_TOOL_CALLS,
+        max_wait: float = MAX_TOOL_CALL_QUEUE_WAIT,
+        tool_limits: dict[str, int] | None = None,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.tool_limits = (
+            TOOL_CONCURRENCY_LIMITS if tool_limits is None else tool_limits
+        )
+        self.rejected = 0
+        self._running: dict[str, int] = {}
+        self._total_running = 0
+        # Conversation -> queued calls, in the order conversations get a turn
+        self._queues: dict[str, deque[_Waiter]] = {}
+        self._queued = 0
+        self._average_duration = 1.0
+
+    @asynccontextmanager
+    async def async_slot(
+        self, tool_name: str, conversation: str
+    ) -> AsyncIterator[None]:
+        """Hold a slot to run a tool call, waiting for one if needed."""
+        await self._async_acquire(tool_name, conversation)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._async_release(tool_name, time.monotonic() - start)
+
+    def retry_after(self) -> int:
+        """Return the seconds a rejected call should wait before retrying."""
+        return max(
+            1,
+            math.ceil(
+                (self._queued + 1) / self.max_concurrent * self._average_duration
+            ),
+        )
+
+    def _has_capacity(self, tool_name: str) -> bool:
+        """Return if a call of a tool can start now."""
+        return self._total_running < self.max_concurrent and self._running.get(
+            tool_name, 0
+        ) < self.tool_limits.get(tool_name, self.max_concurrent)
+
+    def _can_start(self, waiter: _Waiter) -> bool:
+        """Return if a queued call can start now.
+
+        Cancelled calls stay queued until their task resumes and removes them.
+        """
+        return not waiter.future.done() and self._has_capacity(waiter.tool_name)
+
+    async def _async_acquire(self, tool_name: str, conversation: str) -> None:
+        """Wait for a slot for a tool call."""
+        # Queued calls are started as soon as they can run, so a call that
+        # can run now does not take a slot any of them could use
+        if self._has_capacity(tool_name):
+            self._start(tool_name)
+            return
+
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            raise ToolSchedulerFull(self.retry_after())
+
+        waiter = _Waiter(tool_name, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(conversation, deque()).append(waiter)
+        self._queued += 1
+        try:
+            with span("scheduler.wait", **{"scheduler.queued": self._queued}):
+                async with asyncio.timeout(self.max_wait):
+                    await waiter.future
+        except BaseException as err:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Given a slot just before being cancelled
+                self._async_release(tool_name, None)
+            else:
+                self._remove(conversation, waiter)
+            if isinstance(err, TimeoutError):
+                self.rejected += 1
+                raise ToolSchedulerFull(self.retry_after()) from None
+            raise
+
+    def _remove(self, conversation: str, waiter: _Waiter) -> None:
+        """Remove a call that stopped waiting from the queue."""
+        queue = self._queues[conversation]
+        queue.remove(waiter)
+        self._queued -= 1
+        if not queue:
+            del self._queues[conversation]
+
+    @callback
+    def _async_release(self, tool_name: str, duration: float | None) -> None:
+        """Free the slot of a finished call and start queued calls."""
+        self._running[tool_name] -= 1
+        self._total_running -= 1
+        if duration is not None:
+            self._average_duration += _DURATION_SMOOTHING * (
+                duration - self._average_duration
+            )
+        self._async_dispatch()
+
+    @callback
+    def _async_dispatch(self) -> None:
+        """Start queued calls while there are free slots.
+
+        Each start moves its conversation to the back of the rotation. Calls
+        of a tool at its limit are skipped, so they do not hold up calls of
+        other tools queued behind them.
+        """
+        while self._queued and self._total_running < self.max_concurrent:
+            found = next(
+                (
+                    (conversation, waiter)
+                    for conversation, queue in self._queues.items()
+                    for waiter in queue
+                    if self._can_start(waiter)
+                ),
+                None,
+            )
+            if found is None:
+                return
+
+            conversation, waiter = found
+            self._remove(conversation, waiter)
+            if queue := self._queues.pop(conversation, None):
+                self._queues[conversation] = queue
+            self._start(waiter.tool_name)
+            waiter.future.set_result(None)
+
+    def _start(self, tool_name: str) -> None:
+        """Take a slot for a call of a tool."""
+        self._running[tool_name] = self._running.get(tool_name, 0) + 1
+        self._total_running += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the scheduler."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": {
+                tool_name: count for tool_name, count in self._running.items() if count
+            },
+            "queued": self._queued,
+            "conversations_waiting": len(self._queues),
+            "rejected": self.rejected,
+            "average_call_duration_s": round(self._average_duration, 3),
+        }
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> ToolScheduler:
+    """Return the scheduler shared by all AI Toolset entries."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = ToolScheduler()
+    return scheduler
@@ -0,0 +1,205 @@
+"""Sensor platform for AI Toolset."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import SEARCH_RATE_LIMITS, TOOL_SEARCH_AND_READ, TOOL_WEB_SEARCH
+from .coordinator import CommuteRoute, WazeCommuteCoordinator
+from .instrumentation import MetricsRegistry
+from .quota import SearchQuota, async_get_search_quota, configured_engines, daily_quota
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up AI Toolset sensors from a config entry."""
+    api = entry.runtime_data.api
+    async_add_entities(
+        ToolLatencySensor(api.metrics, entry, tool_name)
+        for tool_name in api.enabled_tools
+    )
+
+    if {TOOL_WEB_SEARCH, TOOL_SEARCH_AND_READ}.intersection(api.enabled_tools):
+        quota = async_get_search_quota(hass)
+        await quota.async_load()
+        async_add_entities(
+            SearchQuotaSensor(quota, entry, engine, daily_quota(api.config, engine))
+            for engine in configured_engines(api.config)
+        )
+
+    coordinator = entry.runtime_data.commute_coordinator
+    if coordinator is None:
+        return
+
+    async_add_entities(
+        WazeCommuteSensor(coordinator, entry, route) for route in coordinator.routes
+    )
+
+
+class WazeCommuteSensor(CoordinatorEntity[WazeCommuteCoordinator], SensorEntity):
+    """Pre-computed travel time for a frequent route."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:car-clock"
+
+    def __init__(
+        self,
+        coordinator: WazeCommuteCoordinator,
+        entry: ConfigEntry,
+        route: CommuteRoute,
+    ) -> None:
+        """Initialize the commute sensor."""
+        super().__init__(coordinator)
+        self.route = route
+        self._attr_name = f"Commute {route.origin} to {route.destination}"
+        # Hash the raw route, "Home -> Work" and "home -> work!" slugify alike
+        route_hash = hashlib.sha256(route.route_id.encode()).hexdigest()[:16]
+        self._attr_unique_id = f"{entry.entry_id}_commute_{route_hash}"
+
+    @property
+    def _route_data(self) -> dict[str, Any] | None:
+        """Return the latest data for this route."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self.route.route_id)
+
+    @property
+    def available(self) -> bool:
+        """Return if the route has been refreshed."""
+        return super().available and self._route_data is not None
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the travel time in minutes."""
+        if (data := self._route_data) is None:
+            return None
+        return data["duration"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the route details."""
+        if (data := self._route_data) is None:
+            return None
+        return {
+            "origin": data["origin"],
+            "destination": data["destination"],
+            "distance": data["distance"],
+            "units": data["units"],
+        }
+
+
+class ToolLatencySensor(SensorEntity):
+    """95th percentile latency of a tool, with its other call metrics."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-cog-outline"
+    _attr_should_poll = False
+    # The metrics are cumulative, so their history is of little use
+    _unrecorded_attributes = frozenset(
+        {
+            "calls",
+            "errors",
+            "error_rate",
+            "latency_p50_ms",
+            "latency_p99_ms",
+            "cache_lookups",
+            "cache_hit_rate",
+            "response_bytes",
+            "average_response_bytes",
+            "response_tokens",
+            "received_bytes",
+            "decompressed_bytes",
+            "compression_ratio",
+            "loop_blocks",
+            "max_loop_block_ms",
+        }
+    )
+
+    def __init__(
+        self, metrics: MetricsRegistry, entry: ConfigEntry, tool_name: str
+    ) -> None:
+        """Initialize the tool latency sensor."""
+        self._metrics = metrics
+        self.tool_name = tool_name
+        self._attr_name = f"{tool_name} latency"
+        self._attr_unique_id = f"{entry.entry_id}_{tool_name}_latency"
+
+    async def async_added_to_hass(self) -> None:
+        """Update the state after every call of the tool."""
+        self.async_on_remove(
+            self._metrics.async_add_listener(self.tool_name, self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the 95th percentile latency in milliseconds."""
+        return self._metrics.get(self.tool_name).as_dict()["latency_p95_ms"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the other metrics of the tool."""
+        metrics = self._metrics.get(self.tool_name).as_dict()
+        del metrics["latency_p95_ms"]
+        return metrics
+
+
+class SearchQuotaSensor(SensorEntity):
+    """Searches left today with a search engine."""
+
+    _attr_native_unit_of_measurement = "searches"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:counter"
+    # Polled as well, so the count starts over at midnight without a search
+
+    def __init__(
+        self,
+        quota: SearchQuota,
+        entry: ConfigEntry,
+        engine: str,
+        daily_quota: int,
+    ) -> None:
+        """Initialize the search quota sensor."""
+        self._quota = quota
+        self.engine = engine
+        self.daily_quota = daily_quota
+        self._attr_name = f"{engine} search quota"
+        self._attr_unique_id = f"{entry.entry_id}_{engine}_search_quota"
+
+    async def async_added_to_hass(self) -> None:
+        """Update the state after every search."""
+        self.async_on_remove(self._quota.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the searches left today, unknown without a daily quota."""
+        return self._quota.remaining(self.engine, self.daily_quota)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the usage and limits of the engine."""
+        return {
+            "used_today": self._quota.used(self.engine),
+            "daily_quota": self.daily_quota or None,
+            "rate_limit_per_second": SEARCH_RATE_LIMITS.get(self.engine),
+        }
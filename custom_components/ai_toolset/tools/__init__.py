@@ -1,16 +1,83 @@
-"""Tools package for AI Toolset."""
+"""Tools package for AI Toolset.
 
-from .calendar import (
-    CalendarAddEventTool,
-    CalendarGetEventsTool,
-    CalendarUpdateEventTool,
+Tool modules are imported on first use rather than with the integration,
+since several of them pull in heavy dependencies.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from ..const import (
+    TOOL_CALENDAR_ADD_EVENT,
+    TOOL_CALENDAR_GET_EVENTS,
+    TOOL_CALENDAR_UPDATE_EVENT,
+    TOOL_CODE_EXECUTOR,
+    TOOL_CREATE_AUTOMATION,
+    TOOL_GET_TRAVEL_DISTANCE,
+    TOOL_GET_TRAVEL_INFO,
+    TOOL_GET_TRAVEL_TIME,
+    TOOL_MUSIC_FIND,
+    TOOL_MUSIC_PLAY,
+    TOOL_SEARCH_AND_READ,
+    TOOL_SEARCH_FETCHED_PAGES,
+    TOOL_URL_FETCH,
+    TOOL_WEB_SEARCH,
 )
-from .code_executor import CodeExecutorTool
-from .create_automation import CreateAutomationTool
-from .music import MusicFindTool, MusicPlayTool
-from .url_fetch import URLFetchTool
-from .waze_travel_time import GetTravelDistanceTool, GetTravelTimeTool
-from .web_search import WebSearchTool
+
+if TYPE_CHECKING:
+    from homeassistant.helpers import llm
+
+# Tool name -> (module, class name)
+TOOL_CLASSES: dict[str, tuple[str, str]] = {
+    TOOL_WEB_SEARCH: ("web_search", "WebSearchTool"),
+    TOOL_URL_FETCH: ("url_fetch", "URLFetchTool"),
+    TOOL_CREATE_AUTOMATION: ("create_automation", "CreateAutomationTool"),
+    TOOL_CODE_EXECUTOR: ("code_executor", "CodeExecutorTool"),
+    TOOL_CALENDAR_GET_EVENTS: ("calendar", "CalendarGetEventsTool"),
+    TOOL_CALENDAR_ADD_EVENT: ("calendar", "CalendarAddEventTool"),
+    TOOL_CALENDAR_UPDATE_EVENT: ("calendar", "CalendarUpdateEventTool"),
+    TOOL_MUSIC_FIND: ("music", "MusicFindTool"),
+    TOOL_MUSIC_PLAY: ("music", "MusicPlayTool"),
+    TOOL_GET_TRAVEL_TIME: ("waze_travel_time", "GetTravelTimeTool"),
+    TOOL_GET_TRAVEL_DISTANCE: ("waze_travel_time", "GetTravelDistanceTool"),
+    TOOL_GET_TRAVEL_INFO: ("waze_travel_time", "GetTravelInfoTool"),
+    TOOL_SEARCH_AND_READ: ("search_and_read", "SearchAndReadTool"),
+    TOOL_SEARCH_FETCHED_PAGES: ("fetched_pages", "SearchFetchedPagesTool"),
+}
+
+# Shared services used by the tools
+_SERVICE_CLASSES: dict[str, str] = {
+    "WazeRouteCache": "waze_travel_time",
+    "AutomationIndex": "automation_index",
+    "PageIndex": "page_index",
+}
+
+_EXPORTS: dict[str, str] = {
+    **{class_name: module for module, class_name in TOOL_CLASSES.values()},
+    **_SERVICE_CLASSES,
+}
+
+
+def import_tool_classes(names: list[str]) -> dict[str, type[llm.Tool]]:
+    """Import the modules of the given tools and return their classes.
+
+    This does blocking I/O, so call it from the import executor.
+    """
+    classes: dict[str, type[llm.Tool]] = {}
+    for name in names:
+        module, class_name = TOOL_CLASSES[name]
+        classes[name] = getattr(import_module(f".{module}", __name__), class_name)
+    return classes
+
+
+def __getattr__(name: str) -> Any:
+    """Import tool and service classes when they are first accessed."""
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{module}", __name__), name)
+
 
 __all__ = [
     "WebSearchTool",
@@ -24,4 +91,12 @@ __all__ = [
     "MusicPlayTool",
     "GetTravelTimeTool",
     "GetTravelDistanceTool",
+    "GetTravelInfoTool",
+    "SearchAndReadTool",
+    "SearchFetchedPagesTool",
+    "WazeRouteCache",
+    "AutomationIndex",
+    "PageIndex",
+    "TOOL_CLASSES",
+    "import_tool_classes",
 ]
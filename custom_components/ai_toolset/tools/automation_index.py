@@ -0,0 +1,254 @@
+"""Index of existing automations for duplicate detection in AI Toolset."""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Any
+
+from homeassistant.components.automation import (
+    DATA_COMPONENT,
+    EVENT_AUTOMATION_RELOADED,
+)
+from homeassistant.const import CONF_ID
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# Trigger options that do not change when a trigger fires
+IGNORED_TRIGGER_KEYS = {"id", "alias", "enabled", "variables"}
+# Action options that do not change what an action does, or that name its
+# targets, which are compared separately
+IGNORED_ACTION_KEYS = {"alias", "enabled", "action", "service", "entity_id", "target"}
+
+TriggerKey = tuple[str | None, str | None]
+ActionKey = tuple[str | None, str | None]
+Signature = tuple[frozenset[Any], frozenset[ActionKey], frozenset[Any]]
+IndexEntry = tuple[Signature, list[TriggerKey], list[ActionKey]]
+
+
+def _as_list(value: Any) -> list[Any]:
+    """Return a config value that may be a single item or a list as a list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable copy of a config value."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _trigger_configs(config: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the triggers of an automation config."""
+    return [
+        trigger
+        for trigger in _as_list(config.get("triggers", config.get("trigger")))
+        if isinstance(trigger, dict)
+    ]
+
+
+def _action_configs(config: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the top-level actions of an automation config."""
+    return [
+        action
+        for action in _as_list(config.get("actions", config.get("action")))
+        if isinstance(action, dict)
+    ]
+
+
+def _trigger_keys(trigger: dict[str, Any]) -> list[TriggerKey]:
+    """Return the platform and entity pairs a trigger listens to."""
+    platform = trigger.get("trigger", trigger.get("platform"))
+    entity_ids = _as_list(trigger.get("entity_id"))
+    return [(platform, entity_id) for entity_id in entity_ids] or [(platform, None)]
+
+
+def _trigger_signature(trigger: dict[str, Any]) -> Any:
+    """Return a normalized, hashable form of a trigger."""
+    normalized = {
+        key: value
+        for key, value in trigger.items()
+        if key not in IGNORED_TRIGGER_KEYS and key not in ("trigger", "platform")
+    }
+    normalized["trigger"] = trigger.get("trigger", trigger.get("platform"))
+    if "entity_id" in normalized:
+        normalized["entity_id"] = sorted(_as_list(normalized["entity_id"]))
+    return _freeze(normalized)
+
+
+def _action_service(action: dict[str, Any]) -> str | None:
+    """Return the service an action calls, or the type of a non-service step."""
+    service = action.get("action", action.get("service"))
+    if service is None:
+        # Delays, conditions and other non-service steps
+        service = next(iter(action), None)
+    return service
+
+
+def _action_keys(action: dict[str, Any]) -> list[ActionKey]:
+    """Return the service and target entity pairs of an action."""
+    service = _action_service(action)
+    entity_ids = _as_list(action.get("entity_id"))
+    # Targets and data can also be templates, which name no entities here
+    for key in ("target", "data"):
+        if isinstance(options := action.get(key), dict):
+            entity_ids.extend(_as_list(options.get("entity_id")))
+    return [(service, entity_id) for entity_id in entity_ids] or [(service, None)]
+
+
+def _action_signature(action: dict[str, Any]) -> Any:
+    """Return a normalized, hashable form of an action without its targets."""
+    normalized = {
+        key: value for key, value in action.items() if key not in IGNORED_ACTION_KEYS
+    }
+    if isinstance(data := normalized.get("data"), dict):
+        normalized["data"] = {
+            key: value for key, value in data.items() if key != "entity_id"
+        }
+    normalized["action"] = _action_service(action)
+    return _freeze(normalized)
+
+
+class AutomationIndex:
+    """Index existing automations by trigger and action target.
+
+    Automations are keyed by their normalized triggers and actions, so
+    duplicates of a new automation are found with a dictionary lookup
+    instead of comparing it against every automation. The index is synced
+    on each automation reload, and only automations whose configuration
+    changed are re-indexed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the automation index."""
+        self._configs: dict[str, dict[str, Any]] = {}
+        self._entries: dict[str, IndexEntry] = {}
+        self._by_signature: dict[Signature, set[str]] = defaultdict(set)
+        self._by_trigger: dict[TriggerKey, set[str]] = defaultdict(set)
+        self._by_target: dict[ActionKey, set[str]] = defaultdict(set)
+        self._listening = False
+        self._synced = False
+
+    @callback
+    def async_listen(self, hass: HomeAssistant) -> CALLBACK_TYPE:
+        """Keep the index in sync with automation reloads."""
+
+        @callback
+        def _async_reloaded(event: Event) -> None:
+            self.async_sync(hass)
+
+        unsub = hass.bus.async_listen(EVENT_AUTOMATION_RELOADED, _async_reloaded)
+        self._listening = True
+
+        @callback
+        def _async_unsub() -> None:
+            self._listening = False
+            unsub()
+
+        return _async_unsub
+
+    @callback
+    def async_sync(self, hass: HomeAssistant) -> None:
+        """Re-index automations that were added, changed or removed."""
+        if (component := hass.data.get(DATA_COMPONENT)) is None:
+            return
+
+        seen: set[str] = set()
+        for entity in component.entities:
+            if (config := getattr(entity, "raw_config", None)) is None:
+                continue
+            automation_id = entity.unique_id or entity.entity_id
+            seen.add(automation_id)
+            # Unchanged automations keep the same config object across reloads
+            if self._configs.get(automation_id) is not config:
+                self._remove(automation_id)
+                self._add(automation_id, config)
+
+        for automation_id in set(self._configs) - seen:
+            self._remove(automation_id)
+        self._synced = True
+
+    @callback
+    def async_find(
+        self, hass: HomeAssistant, config: dict[str, Any]
+    ) -> tuple[list[str], list[str]]:
+        """Return automations that duplicate or overlap an automation config.
+
+        Duplicates have the same triggers, and the same actions with the
+        same targets. Overlapping automations share at least one trigger
+        entity and one action target.
+        """
+        if not self._synced or not self._listening:
+            self.async_sync(hass)
+
+        try:
+            signature, trigger_keys, action_keys = self._index_entry(config)
+        except Exception as err:
+            _LOGGER.debug("Cannot compare automation with others: %s", err)
+            return [], []
+        own_id = config.get(CONF_ID)
+        duplicates = self._by_signature.get(signature, set()) - {own_id}
+
+        by_trigger: set[str] = set()
+        for key in trigger_keys:
+            by_trigger |= self._by_trigger.get(key, set())
+        by_target: set[str] = set()
+        for key in action_keys:
+            by_target |= self._by_target.get(key, set())
+        overlapping = (by_trigger & by_target) - duplicates - {own_id}
+
+        return sorted(duplicates), sorted(overlapping)
+
+    @staticmethod
+    def _index_entry(config: dict[str, Any]) -> IndexEntry:
+        """Return the signature and index keys of an automation config."""
+        triggers = _trigger_configs(config)
+        actions = _action_configs(config)
+        trigger_keys = [key for trigger in triggers for key in _trigger_keys(trigger)]
+        action_keys = [key for action in actions for key in _action_keys(action)]
+        signature = (
+            frozenset(_trigger_signature(trigger) for trigger in triggers),
+            frozenset(action_keys),
+            frozenset(_action_signature(action) for action in actions),
+        )
+        return signature, trigger_keys, action_keys
+
+    def _add(self, automation_id: str, config: dict[str, Any]) -> None:
+        """Add an automation to the index."""
+        try:
+            entry = self._index_entry(config)
+        except Exception as err:
+            # A malformed automation must not break indexing the others
+            _LOGGER.debug("Not indexing automation %s: %s", automation_id, err)
+            return
+        signature, trigger_keys, action_keys = entry
+        self._configs[automation_id] = config
+        self._entries[automation_id] = entry
+        self._by_signature[signature].add(automation_id)
+        for key in trigger_keys:
+            self._by_trigger[key].add(automation_id)
+        for key in action_keys:
+            self._by_target[key].add(automation_id)
+
+    def _remove(self, automation_id: str) -> None:
+        """Remove an automation from the index."""
+        self._configs.pop(automation_id, None)
+        if (entry := self._entries.pop(automation_id, None)) is None:
+            return
+        signature, trigger_keys, action_keys = entry
+        for index, keys in (
+            (self._by_signature, [signature]),
+            (self._by_trigger, trigger_keys),
+            (self._by_target, action_keys),
+        ):
+            for key in keys:
+                index[key].discard(automation_id)
+                if not index[key]:
+                    del index[key]
@@ -0,0 +1,412 @@
+"""Dry-run simulation of automations for AI Toolset."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError, TemplateError
+from homeassistant.helpers import condition as condition_helper
+from homeassistant.helpers.template import Template, result_as_boolean
+from homeassistant.util import dt as dt_util
+
+from ..const import MAX_DRY_RUN_FIRE_TIMES
+
+# Trigger and condition types that can be replayed against recorder history
+REPLAYABLE_TRIGGERS = {"state", "numeric_state"}
+REPLAYABLE_CONDITIONS = {"state", "numeric_state"}
+
+
+def _as_list(value: Any) -> list[Any]:
+    """Return a config value that may be a single item or a list as a list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _trigger_platform(trigger: dict[str, Any]) -> str | None:
+    """Return the platform of a trigger config."""
+    return trigger.get("trigger", trigger.get("platform"))
+
+
+def _triggers(config: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the trigger configs of an automation."""
+    return _as_list(config.get("triggers", config.get("trigger")))
+
+
+def _conditions(config: dict[str, Any]) -> list[Any]:
+    """Return the condition configs of an automation."""
+    return _as_list(config.get("conditions", config.get("condition")))
+
+
+def _numeric_value(state: State | None, attribute: str | None = None) -> float | None:
+    """Return the numeric value of a state, if it has one."""
+    if state is None:
+        return None
+    value = state.attributes.get(attribute) if attribute else state.state
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _in_range(value: float | None, above: Any, below: Any) -> bool:
+    """Return if a value is within the numeric state range."""
+    if value is None:
+        return False
+    if above is not None and not value > float(above):
+        return False
+    if below is not None and not value < float(below):
+        return False
+    return True
+
+
+def _has_numeric_thresholds(config: dict[str, Any]) -> bool:
+    """Return if the above and below thresholds are numbers, when set.
+
+    Thresholds that refer to other entities need their history too.
+    """
+    return all(
+        isinstance(config.get(key), (int, float, type(None)))
+        for key in ("above", "below")
+    )
+
+
+def _all_pass(results: list[bool | None]) -> bool | None:
+    """Return if all results pass, or None when unknown results decide it."""
+    if False in results:
+        return False
+    if None in results:
+        return None
+    return True
+
+
+def _is_replayable_trigger(trigger: dict[str, Any]) -> bool:
+    """Return if a trigger can be replayed without rendering templates."""
+    platform = _trigger_platform(trigger)
+    if platform not in REPLAYABLE_TRIGGERS:
+        return False
+    if {"value_template", "attribute", "for"} & trigger.keys():
+        return False
+    return _has_numeric_thresholds(trigger)
+
+
+def _is_replayable_condition(condition: Any) -> bool:
+    """Return if a condition can be evaluated against a state snapshot."""
+    if not isinstance(condition, dict):
+        return False
+    if condition.get("condition") not in REPLAYABLE_CONDITIONS:
+        return False
+    if "value_template" in condition or "attribute" in condition:
+        return False
+    return _has_numeric_thresholds(condition)
+
+
+def _trigger_fires(trigger: dict[str, Any], old: State | None, new: State) -> bool:
+    """Return if a replayable trigger fires for a state change."""
+    if _trigger_platform(trigger) == "numeric_state":
+        above, below = trigger.get("above"), trigger.get("below")
+        return _in_range(_numeric_value(new), above, below) and not _in_range(
+            _numeric_value(old), above, below
+        )
+
+    # State trigger
+    if old is not None and old.state == new.state:
+        return False
+    if "to" in trigger and trigger["to"] is not None:
+        if new.state not in _as_list(trigger["to"]):
+            return False
+    if "from" in trigger and trigger["from"] is not None:
+        if old is None or old.state not in _as_list(trigger["from"]):
+            return False
+    return True
+
+
+def _condition_passes(condition: dict[str, Any], snapshot: dict[str, State]) -> bool:
+    """Return if a replayable condition passes for a state snapshot."""
+    entity_ids = _as_list(condition.get("entity_id"))
+    check = any if condition.get("match") == "any" else all
+
+    if condition["condition"] == "numeric_state":
+        return check(
+            _in_range(
+                _numeric_value(snapshot.get(entity_id)),
+                condition.get("above"),
+                condition.get("below"),
+            )
+            for entity_id in entity_ids
+        )
+
+    expected = [str(state) for state in _as_list(condition.get("state"))]
+    return check(
+        (state := snapshot.get(entity_id)) is not None and state.state in expected
+        for entity_id in entity_ids
+    )
+
+
+def _replay_history(
+    triggers: list[dict[str, Any]],
+    conditions: list[dict[str, Any]],
+    history: dict[str, list[State]],
+) -> list[datetime]:
+    """Return when the automation would have fired over the recorded history.
+
+    Runs in the executor since long windows can contain many state changes.
+    """
+    trigger_entities = {
+        entity_id
+        for trigger in triggers
+        for entity_id in _as_list(trigger.get("entity_id"))
+    }
+
+    changes = sorted(
+        (state for states in history.values() for state in states),
+        key=lambda state: state.last_changed,
+    )
+
+    snapshot: dict[str, State] = {}
+    fired: list[datetime] = []
+    for state in changes:
+        old = snapshot.get(state.entity_id)
+        snapshot[state.entity_id] = state
+        if old is None or state.entity_id not in trigger_entities:
+            # The first state is the one at the start of the window
+            continue
+        if not any(
+            state.entity_id in _as_list(trigger.get("entity_id"))
+            and _trigger_fires(trigger, old, state)
+            for trigger in triggers
+        ):
+            continue
+        if all(_condition_passes(condition, snapshot) for condition in conditions):
+            fired.append(state.last_changed)
+            if len(fired) >= MAX_DRY_RUN_FIRE_TIMES:
+                break
+
+    return fired
+
+
+class AutomationSimulator:
+    """Evaluate an automation without registering it.
+
+    Compiled templates and condition checkers are kept between runs, so
+    repeated dry runs of the same automation do not recompile them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the simulator."""
+        self._templates: dict[str, Template] = {}
+        self._checkers: dict[
+            str, tuple[HomeAssistant, condition_helper.ConditionCheckerType]
+        ] = {}
+
+    def _template(self, hass: HomeAssistant, template: str) -> Template:
+        """Return a compiled template, reusing earlier compilations."""
+        if (
+            compiled := self._templates.get(template)
+        ) is None or compiled.hass is not hass:
+            compiled = self._templates[template] = Template(template, hass)
+            compiled.ensure_valid()
+        return compiled
+
+    async def _async_checker(
+        self, hass: HomeAssistant, condition: dict[str, Any]
+    ) -> condition_helper.ConditionCheckerType:
+        """Return a compiled condition checker, reusing earlier compilations."""
+        key = json.dumps(condition, sort_keys=True, default=str)
+        if (cached := self._checkers.get(key)) is None or cached[0] is not hass:
+            validated = await condition_helper.async_validate_condition_config(
+                hass, condition
+            )
+            checker = await condition_helper.async_from_config(hass, validated)
+            cached = self._checkers[key] = (hass, checker)
+        return cached[1]
+
+    async def async_simulate(
+        self,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        history_hours: float | None = None,
+    ) -> dict[str, Any]:
+        """Evaluate the triggers and conditions of an automation."""
+        triggers = _triggers(config)
+        conditions = _conditions(config)
+        notes: list[str] = []
+
+        trigger_results = []
+        for index, trigger in enumerate(triggers):
+            try:
+                matches_now = self._trigger_matches_now(hass, trigger)
+            except TemplateError as err:
+                notes.append(f"Trigger {index} could not be rendered: {err}")
+                matches_now = None
+            trigger_results.append(
+                {
+                    "index": index,
+                    "platform": _trigger_platform(trigger),
+                    "matches_now": matches_now,
+                }
+            )
+
+        condition_results = []
+        for index, condition in enumerate(conditions):
+            try:
+                passes_now = await self._async_condition_passes_now(hass, condition)
+            except HomeAssistantError as err:
+                notes.append(f"Condition {index} could not be evaluated: {err}")
+                passes_now = None
+            condition_results.append(
+                {
+                    "index": index,
+                    "condition": (
+                        condition.get("condition")
+                        if isinstance(condition, dict)
+                        else "template"
+                    ),
+                    "passes_now": passes_now,
+                }
+            )
+
+        result: dict[str, Any] = {
+            "triggers": trigger_results,
+            "conditions": condition_results,
+            "conditions_pass_now": _all_pass(
+                [item["passes_now"] for item in condition_results]
+            ),
+        }
+        if notes:
+            result["notes"] = notes
+
+        if history_hours:
+            result["history"] = await self._async_replay(
+                hass, triggers, conditions, history_hours
+            )
+
+        return result
+
+    def _trigger_matches_now(
+        self, hass: HomeAssistant, trigger: dict[str, Any]
+    ) -> bool | None:
+        """Return if the current states match what a trigger waits for.
+
+        None is returned for triggers that do not depend on current states,
+        such as time or event triggers. Templates that fail to render raise
+        TemplateError.
+        """
+        platform = _trigger_platform(trigger)
+        if platform == "template":
+            return result_as_boolean(
+                self._template(hass, trigger["value_template"]).async_render(
+                    parse_result=False
+                )
+            )
+        if platform not in REPLAYABLE_TRIGGERS:
+            return None
+
+        states = [
+            hass.states.get(entity_id)
+            for entity_id in _as_list(trigger.get("entity_id"))
+        ]
+        if platform == "numeric_state":
+            # Unlike a history replay, an attribute is read from the current state
+            if "value_template" in trigger or not _has_numeric_thresholds(trigger):
+                return None
+            return any(
+                _in_range(
+                    _numeric_value(state, trigger.get("attribute")),
+                    trigger.get("above"),
+                    trigger.get("below"),
+                )
+                for state in states
+            )
+
+        if trigger.get("to") is None:
+            return None
+        return any(
+            state is not None and state.state in _as_list(trigger["to"])
+            for state in states
+        )
+
+    async def _async_condition_passes_now(
+        self, hass: HomeAssistant, condition: Any
+    ) -> bool:
+        """Evaluate a condition against the current states.
+
+        Conditions that cannot be evaluated raise HomeAssistantError.
+        """
+        if isinstance(condition, str):
+            # Template shorthand
+            return result_as_boolean(
+                self._template(hass, condition).async_render(parse_result=False)
+            )
+
+        checker = await self._async_checker(hass, condition)
+        return bool(checker(hass, {}))
+
+    async def _async_replay(
+        self,
+        hass: HomeAssistant,
+        triggers: list[dict[str, Any]],
+        conditions: list[Any],
+        history_hours: float,
+    ) -> dict[str, Any]:
+        """Replay recorder history to find when the automation would have fired."""
+        end = dt_util.utcnow()
+        start = end - timedelta(hours=history_hours)
+        replay: dict[str, Any] = {"start": start.isoformat(), "end": end.isoformat()}
+
+        if "recorder" not in hass.config.components:
+            replay["error"] = "Recorder is not loaded"
+            return replay
+
+        replayable_triggers = [t for t in triggers if _is_replayable_trigger(t)]
+        replayable_conditions = [c for c in conditions if _is_replayable_condition(c)]
+        unsupported = [
+            f"trigger {index} ({_trigger_platform(trigger)})"
+            for index, trigger in enumerate(triggers)
+            if trigger not in replayable_triggers
+        ] + [
+            f"condition {index}"
+            for index, condition in enumerate(conditions)
+            if condition not in replayable_conditions
+        ]
+        if unsupported:
+            # Skipped triggers hide fires and skipped conditions add fires
+            replay["unsupported"] = unsupported
+            replay["partial"] = True
+        if not replayable_triggers:
+            replay["would_have_fired"] = None
+            return replay
+
+        entity_ids = sorted(
+            {
+                entity_id
+                for item in (*replayable_triggers, *replayable_conditions)
+                for entity_id in _as_list(item.get("entity_id"))
+            }
+        )
+
+        # Imported lazily since the recorder is optional
+        from homeassistant.components.recorder import get_instance, history
+
+        states = await get_instance(hass).async_add_executor_job(
+            lambda: history.get_significant_states(
+                hass,
+                start,
+                end,
+                entity_ids,
+                significant_changes_only=False,
+            )
+        )
+        fired = await hass.async_add_executor_job(
+            _replay_history, replayable_triggers, replayable_conditions, states
+        )
+        replay["would_have_fired"] = [time.isoformat() for time in fired]
+        replay["fire_count"] = len(fired)
+        return replay
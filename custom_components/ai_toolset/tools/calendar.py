@@ -11,13 +11,19 @@ from homeassistant.helpers import llm
 from homeassistant.util import dt as dt_util
 from voluptuous import Optional, Required, Schema
 
+from ..const import (
+    TOOL_CALENDAR_ADD_EVENT,
+    TOOL_CALENDAR_GET_EVENTS,
+    TOOL_CALENDAR_UPDATE_EVENT,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class CalendarGetEventsTool(llm.Tool):
     """Tool for retrieving calendar events."""
 
-    name = "calendar_get_events"
+    name = TOOL_CALENDAR_GET_EVENTS
     description = (
         "Get events from a Home Assistant calendar. "
         "Returns upcoming events for the specified calendar entity. "
@@ -118,7 +124,7 @@ class CalendarGetEventsTool(llm.Tool):
 class CalendarAddEventTool(llm.Tool):
     """Tool for adding calendar events."""
 
-    name = "calendar_add_event"
+    name = TOOL_CALENDAR_ADD_EVENT
     description = (
         "Add a new event to a Home Assistant calendar. "
         "Creates a calendar event with title, start time, end time, and optional description. "
@@ -212,7 +218,7 @@ class CalendarAddEventTool(llm.Tool):
 class CalendarUpdateEventTool(llm.Tool):
     """Tool for updating calendar events."""
 
-    name = "calendar_update_event"
+    name = TOOL_CALENDAR_UPDATE_EVENT
     description = (
         "Update an existing event in a Home Assistant calendar. "
         "Modify the title, start time, end time, description, or location of a calendar event. "
@@ -12,7 +12,11 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
 from voluptuous import Optional, Required, Schema
 
-from ..const import CONF_ENABLE_CODE_EXECUTOR, DEFAULT_ENABLE_CODE_EXECUTOR
+from ..const import (
+    CONF_ENABLE_CODE_EXECUTOR,
+    DEFAULT_ENABLE_CODE_EXECUTOR,
+    TOOL_CODE_EXECUTOR,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,7 +24,7 @@ _LOGGER = logging.getLogger(__name__)
 class CodeExecutorTool(llm.Tool):
     """Tool for executing Python code in a sandboxed environment."""
 
-    name = "code_executor"
+    name = TOOL_CODE_EXECUTOR
     description = (
         "Execute Python code in a sandboxed environment. "
         "Use this for calculations, data processing, or testing code snippets. "
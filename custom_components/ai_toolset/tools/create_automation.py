@@ -2,40 +2,94 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 from typing import Any
 
-from homeassistant.components import automation
+from homeassistant.components.automation.config import async_validate_config_item
+from homeassistant.config import AUTOMATION_CONFIG_PATH
+from homeassistant.const import CONF_ID, SERVICE_RELOAD
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import llm
-from voluptuous import Required, Schema
+from homeassistant.util.file import write_utf8_file_atomic
+from homeassistant.util.yaml import dump, load_yaml
+from voluptuous import Schema
+
+from ..const import AUTOMATION_DOMAIN, MAX_DRY_RUN_HISTORY_HOURS, TOOL_CREATE_AUTOMATION
+from ..tracing import span
+from .automation_index import AutomationIndex
+from .automation_simulator import AutomationSimulator
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _read_automations(path: str) -> list[dict[str, Any]]:
+    """Read the automations file."""
+    if not os.path.isfile(path):
+        return []
+
+    automations = load_yaml(path)
+    if not automations:
+        return []
+    if not isinstance(automations, list):
+        raise HomeAssistantError(
+            f"{AUTOMATION_CONFIG_PATH} does not contain a list of automations"
+        )
+    return automations
+
+
+def _write_automations(path: str, automations: list[dict[str, Any]]) -> None:
+    """Write the automations file atomically."""
+    # Dump before touching the file so a serialization error cannot truncate it
+    contents = dump(automations)
+    write_utf8_file_atomic(path, contents)
+
+
 class CreateAutomationTool(llm.Tool):
     """Tool for creating Home Assistant automations."""
 
-    name = "create_automation"
+    name = TOOL_CREATE_AUTOMATION
     description = (
         "Create a new Home Assistant automation. "
         "Provide the automation configuration in YAML format including "
-        "triggers, conditions, and actions. "
+        "automation_id, alias, triggers, conditions, and actions. "
+        "To create several related automations at once, pass them as a list in "
+        "'automations' instead, each with the same fields. "
+        "Automations are saved to automations.yaml and loaded immediately. "
+        "An automation with the same triggers and actions as an existing one is "
+        "rejected as a duplicate unless 'allow_duplicate' is set. "
+        "Set 'dry_run' to check the automation against current states without "
+        "creating it, and 'history_hours' to also replay that many hours of "
+        "recorded history and report when it would have fired. A replay that "
+        "had to skip triggers or conditions is marked partial. "
         "Returns the automation ID if successful."
     )
     parameters = Schema(
         {
-            Required("automation_id"): str,
-            Required("alias"): str,
-            Required("trigger"): list,
-            Required("action"): list,
+            "automation_id": str,
+            "alias": str,
+            "trigger": list,
+            "action": list,
             "condition": list,
             "mode": cv.string,
             "description": str,
+            "automations": [dict],
+            "dry_run": bool,
+            "history_hours": int,
+            "allow_duplicate": bool,
         }
     )
 
+    def __init__(self, automation_index: AutomationIndex | None = None) -> None:
+        """Initialize the create automation tool."""
+        self._automation_index = automation_index or AutomationIndex()
+        # Serializes read-modify-write cycles of automations.yaml
+        self._lock = asyncio.Lock()
+        self._simulator = AutomationSimulator()
+
     async def async_call(
         self,
         hass: HomeAssistant,
@@ -43,55 +97,61 @@ class CreateAutomationTool(llm.Tool):
         llm_context: llm.LLMContext,
     ) -> dict[str, Any]:
         """Create automation."""
-        automation_id = tool_input.tool_args["automation_id"]
-        alias = tool_input.tool_args["alias"]
-        trigger = tool_input.tool_args["trigger"]
-        action = tool_input.tool_args["action"]
-        condition = tool_input.tool_args.get("condition")
-        mode = tool_input.tool_args.get("mode", "single")
-        description = tool_input.tool_args.get("description", "")
+        if tool_input.tool_args.get("dry_run"):
+            return await self._async_dry_run(hass, tool_input.tool_args)
+
+        if "automations" in tool_input.tool_args:
+            return await self._async_create_batch(
+                hass,
+                tool_input.tool_args["automations"],
+                tool_input.tool_args.get("allow_duplicate", False),
+            )
 
         try:
-            # Build automation config
-            config = {
-                "id": automation_id,
-                "alias": alias,
-                "trigger": trigger,
-                "action": action,
-                "mode": mode,
+            config = self._build_config(tool_input.tool_args)
+        except KeyError as err:
+            return {
+                "success": False,
+                "error": f"Missing required field {err}",
+                "message": "Failed to create automation. Check the configuration.",
             }
 
-            if condition:
-                config["condition"] = condition
-
-            if description:
-                config["description"] = description
-
+        try:
             # Validate the automation configuration
-            await automation.async_validate_config_item(hass, config)
+            with span("validate", **{"automation.count": 1}):
+                await async_validate_config_item(hass, config[CONF_ID], config)
 
-            # Create the automation
-            component = hass.data.get("automation")
-            if component is None:
+            if AUTOMATION_DOMAIN not in hass.config.components:
                 return {"error": "Automation component not loaded"}
 
-            # Store the automation configuration
-            # Note: This is a simplified approach. In production, you'd want to
-            # persist this to automations.yaml or use the automation editor service
-            await hass.services.async_call(
-                "automation",
-                "reload",
-                blocking=True,
-            )
+            duplicates, overlapping = self._automation_index.async_find(hass, config)
+            if duplicates and not tool_input.tool_args.get("allow_duplicate"):
+                return {
+                    "success": False,
+                    "error": "Duplicate automation",
+                    "duplicate_of": duplicates,
+                    "message": "An automation with the same triggers and actions "
+                    "already exists. Set 'allow_duplicate' to create it anyway.",
+                }
 
-            return {
+            # Persist the automation and load only this automation
+            _, errors = await self._async_save_automations(hass, [config])
+            if errors:
+                raise HomeAssistantError(errors[0])
+            await self._async_reload(hass, [config[CONF_ID]])
+
+            result: dict[str, Any] = {
                 "success": True,
-                "automation_id": automation_id,
-                "alias": alias,
-                "message": f"Automation '{alias}' created successfully. "
-                "Note: This automation is not persisted to storage. "
-                "Use the Home Assistant UI to save it permanently.",
+                "automation_id": config[CONF_ID],
+                "alias": config["alias"],
+                "message": f"Automation '{config['alias']}' created successfully "
+                f"and saved to {AUTOMATION_CONFIG_PATH}.",
             }
+            if duplicates:
+                result["duplicate_of"] = duplicates
+            if overlapping:
+                result["overlapping_automations"] = overlapping
+            return result
 
         except Exception as err:
             _LOGGER.exception("Error creating automation")
@@ -100,3 +160,239 @@ class CreateAutomationTool(llm.Tool):
                 "error": str(err),
                 "message": "Failed to create automation. Check the configuration.",
             }
+
+    async def _async_create_batch(
+        self,
+        hass: HomeAssistant,
+        items: list[dict[str, Any]],
+        allow_duplicate: bool,
+    ) -> dict[str, Any]:
+        """Create several automations with a single write."""
+        if AUTOMATION_DOMAIN not in hass.config.components:
+            return {"success": False, "error": "Automation component not loaded"}
+
+        with span("validate", **{"automation.count": len(items)}):
+            valid, errors = await self._async_validate_batch(
+                hass, items, allow_duplicate
+            )
+
+        created: list[dict[str, Any]] = []
+        if valid:
+            try:
+                saved, save_errors = await self._async_save_automations(
+                    hass, [config for _, config in valid]
+                )
+                await self._async_reload(hass, [config[CONF_ID] for config in saved])
+            except Exception as err:
+                _LOGGER.exception("Error creating automations")
+                return {"success": False, "error": str(err), "errors": errors}
+
+            for position, (index, config) in enumerate(valid):
+                if (error := save_errors.get(position)) is not None:
+                    errors.append(
+                        {
+                            "index": index,
+                            "automation_id": config[CONF_ID],
+                            "error": error,
+                        }
+                    )
+                else:
+                    created.append(
+                        {"automation_id": config[CONF_ID], "alias": config["alias"]}
+                    )
+
+        errors.sort(key=lambda error: error["index"])
+        return {
+            "success": bool(created),
+            "created": created,
+            "errors": errors,
+            "message": f"Created {len(created)} of {len(items)} automations",
+        }
+
+    async def _async_validate_batch(
+        self,
+        hass: HomeAssistant,
+        items: list[dict[str, Any]],
+        allow_duplicate: bool,
+    ) -> tuple[list[tuple[int, dict[str, Any]]], list[dict[str, Any]]]:
+        """Build and validate batch items, keeping the ones that can be created.
+
+        Returns the valid configs with their index in the batch, and an
+        error for each item that was left out.
+        """
+        errors: list[dict[str, Any]] = []
+        configs: list[tuple[int, dict[str, Any]]] = []
+        for index, item in enumerate(items):
+            try:
+                configs.append((index, self._build_config(item)))
+            except KeyError as err:
+                errors.append(
+                    {
+                        "index": index,
+                        "automation_id": item.get("automation_id"),
+                        "error": f"Missing required field {err}",
+                    }
+                )
+
+        # Validate every automation concurrently, keeping the valid ones
+        results = await asyncio.gather(
+            *(
+                async_validate_config_item(hass, config[CONF_ID], config)
+                for _, config in configs
+            ),
+            return_exceptions=True,
+        )
+        valid: list[tuple[int, dict[str, Any]]] = []
+        for (index, config), result in zip(configs, results, strict=True):
+            if isinstance(result, Exception):
+                errors.append(
+                    {
+                        "index": index,
+                        "automation_id": config[CONF_ID],
+                        "error": str(result),
+                    }
+                )
+                continue
+            duplicates, _ = self._automation_index.async_find(hass, config)
+            if duplicates and not (
+                allow_duplicate or items[index].get("allow_duplicate")
+            ):
+                errors.append(
+                    {
+                        "index": index,
+                        "automation_id": config[CONF_ID],
+                        "error": "Duplicate automation",
+                        "duplicate_of": duplicates,
+                    }
+                )
+                continue
+            valid.append((index, config))
+
+        return valid, errors
+
+    async def _async_dry_run(
+        self, hass: HomeAssistant, args: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Validate and simulate automations without creating them."""
+        history_hours = args.get("history_hours")
+        if history_hours is not None:
+            history_hours = max(0, min(history_hours, MAX_DRY_RUN_HISTORY_HOURS))
+        items = args["automations"] if "automations" in args else [args]
+
+        results: list[dict[str, Any]] = []
+        for item in items:
+            result: dict[str, Any] = {"automation_id": item.get("automation_id")}
+            try:
+                config = self._build_config(item)
+                await async_validate_config_item(hass, config[CONF_ID], config)
+                result.update(
+                    await self._simulator.async_simulate(hass, config, history_hours)
+                )
+                result["valid"] = True
+                duplicates, overlapping = self._automation_index.async_find(
+                    hass, config
+                )
+                if duplicates:
+                    result["duplicate_of"] = duplicates
+                if overlapping:
+                    result["overlapping_automations"] = overlapping
+            except KeyError as err:
+                result.update(valid=False, error=f"Missing required field {err}")
+            except Exception as err:
+                _LOGGER.debug("Dry run of automation failed: %s", err)
+                result.update(valid=False, error=str(err))
+            results.append(result)
+
+        if "automations" not in args:
+            return {
+                "success": results[0]["valid"],
+                "dry_run": True,
+                **results[0],
+                "message": "Dry run only, the automation was not created.",
+            }
+        return {
+            "success": all(result["valid"] for result in results),
+            "dry_run": True,
+            "automations": results,
+            "message": "Dry run only, no automations were created.",
+        }
+
+    @staticmethod
+    def _build_config(args: dict[str, Any]) -> dict[str, Any]:
+        """Build an automation config from tool arguments.
+
+        Keys are ordered the way the automation editor writes them.
+        """
+        config: dict[str, Any] = {
+            CONF_ID: args["automation_id"],
+            "alias": args["alias"],
+        }
+
+        if description := args.get("description"):
+            config["description"] = description
+
+        config["trigger"] = args["trigger"]
+
+        if condition := args.get("condition"):
+            config["condition"] = condition
+
+        config["action"] = args["action"]
+        config["mode"] = args.get("mode", "single")
+        return config
+
+    async def _async_save_automations(
+        self, hass: HomeAssistant, configs: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], dict[int, str]]:
+        """Append automations to the automations file in one write.
+
+        Returns the saved automations and, by position in configs, an error
+        for each one that was not saved because its ID is already in use.
+        """
+        path = hass.config.path(AUTOMATION_CONFIG_PATH)
+        saved: list[dict[str, Any]] = []
+        errors: dict[int, str] = {}
+
+        async with self._lock:
+            automations = await hass.async_add_executor_job(_read_automations, path)
+            existing_ids = {automation.get(CONF_ID) for automation in automations}
+            for position, config in enumerate(configs):
+                if config[CONF_ID] in existing_ids:
+                    errors[position] = (
+                        f"An automation with ID '{config[CONF_ID]}' already exists"
+                    )
+                    continue
+                existing_ids.add(config[CONF_ID])
+                saved.append(config)
+
+            if saved:
+                await hass.async_add_executor_job(
+                    _write_automations, path, [*automations, *saved]
+                )
+
+        return saved, errors
+
+    @staticmethod
+    async def _async_reload(hass: HomeAssistant, automation_ids: list[str]) -> None:
+        """Load only the new automations.
+
+        Each automation is reloaded by its ID, so automations that already
+        existed keep running. The reloads run at the same time.
+        """
+        if not automation_ids:
+            return
+        with span(
+            "service_call",
+            service=f"{AUTOMATION_DOMAIN}.{SERVICE_RELOAD}",
+            **{"automation.count": len(automation_ids)},
+        ):
+            await asyncio.gather(
+                *(
+                    hass.services.async_call(
+                        AUTOMATION_DOMAIN,
+                        SERVICE_RELOAD,
+                        {CONF_ID: automation_id},
+                        blocking=True,
+                    )
+                    for automation_id in automation_ids
+                )
+            )
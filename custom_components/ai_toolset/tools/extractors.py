@@ -0,0 +1,288 @@
+"""Extraction of the text of fetched documents for AI Toolset."""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+import re
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from ..const import CHARSET_SNIFF_BYTES
+
+DOCUMENT_HTML = "html"
+DOCUMENT_PDF = "pdf"
+DOCUMENT_FEED = "feed"
+DOCUMENT_XML = "xml"
+DOCUMENT_CSV = "csv"
+DOCUMENT_JSON = "json"
+DOCUMENT_TEXT = "text"
+
+_TEXT_TYPES = {
+    "application/javascript",
+    "application/toml",
+    "application/x-yaml",
+    "application/yaml",
+}
+_FEED_ITEMS = {"item", "entry"}
+_FEED_SUMMARIES = ("encoded", "content", "summary", "description")
+_FEED_DATES = ("pubDate", "published", "updated", "date")
+_FEED_CHUNK_SIZE = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_CHARSET_PARAMETER = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_DECLARED_CHARSET = re.compile(
+    rb"<(?:meta|\?xml)\s[^>]*?(?:charset|encoding)\s*=\s*[\"']?\s*([\w.:-]+)",
+    re.IGNORECASE,
+)
+# Browsers decode pages declared as ASCII or Latin-1 as Windows-1252
+_BROWSER_ENCODINGS = {"ascii": "cp1252", "iso8859-1": "cp1252"}
+
+
+def _lookup_encoding(name: bytes | str) -> str | None:
+    """Return the Python codec name of a declared charset, if it is known."""
+    if isinstance(name, bytes):
+        name = name.decode("ascii")
+    try:
+        encoding = codecs.lookup(name).name
+    except LookupError:
+        return None
+    return _BROWSER_ENCODINGS.get(encoding, encoding)
+
+
+def _sniff_encoding(content_type: str, body: bytes) -> str | None:
+    """Return the encoding of a body without decoding it.
+
+    As in browsers, a byte order mark comes first, then the charset of the
+    Content-Type header, then a <meta charset> or XML declaration at the
+    start of the body.
+    """
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return encoding
+    if (match := _CHARSET_PARAMETER.search(content_type)) and (
+        encoding := _lookup_encoding(match[1])
+    ):
+        return encoding
+    if match := _DECLARED_CHARSET.search(body, 0, CHARSET_SNIFF_BYTES):
+        return _lookup_encoding(match[1])
+    return None
+
+
+def decode_body(content_type: str, body: bytes) -> str:
+    """Decode a body in a single pass, without guessing from the whole body."""
+    if (encoding := _sniff_encoding(content_type, body)) is not None:
+        return body.decode(encoding, errors="replace")
+    try:
+        # Most pages that do not declare a charset are UTF-8
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return body.decode("cp1252", errors="replace")
+
+
+def document_kind(content_type: str) -> str | None:
+    """Return the kind of document a content type holds.
+
+    None is returned for content without text, such as images.
+    """
+    mime_type = content_type.split(";", 1)[0].strip().lower()
+    if mime_type in ("text/html", "application/xhtml+xml"):
+        return DOCUMENT_HTML
+    if mime_type == "application/pdf":
+        return DOCUMENT_PDF
+    if mime_type.endswith(("/rss+xml", "/atom+xml")):
+        return DOCUMENT_FEED
+    if mime_type.endswith(("/xml", "+xml")):
+        return DOCUMENT_XML
+    if mime_type in ("text/csv", "text/tab-separated-values"):
+        return DOCUMENT_CSV
+    if mime_type == "application/json" or mime_type.endswith("+json"):
+        return DOCUMENT_JSON
+    # Servers that send no content type mostly serve text
+    if not mime_type or mime_type.startswith("text/") or mime_type in _TEXT_TYPES:
+        return DOCUMENT_TEXT
+    return None
+
+
+def extract_document(
+    kind: str, content_type: str, body: bytes, max_length: int
+) -> dict[str, Any]:
+    """Return the title and text of a document other than an HTML page.
+
+    Extraction stops once max_length characters of text are found, and
+    truncated tells whether it stopped early. This does blocking work, so
+    call it from the executor.
+    """
+    return _EXTRACTORS[kind](content_type, body, max_length)
+
+
+def _join_until(
+    parts: Iterable[str], max_length: int, separator: str
+) -> dict[str, Any]:
+    """Join parts of a document until the text reaches max_length.
+
+    The parts after that are not consumed, so their extraction is skipped.
+    """
+    joined: list[str] = []
+    size = 0
+    for part in parts:
+        if part:
+            joined.append(part)
+            size += len(part) + len(separator)
+        if size >= max_length:
+            return {"text": separator.join(joined)[:max_length], "truncated": True}
+    return {"text": separator.join(joined), "truncated": False}
+
+
+def _extract_text(content_type: str, body: bytes, max_length: int) -> dict[str, Any]:
+    """Return plain text as it is."""
+    text = decode_body(content_type, body)
+    return {"title": "", "text": text[:max_length], "truncated": len(text) > max_length}
+
+
+def _extract_json(content_type: str, body: bytes, max_length: int) -> dict[str, Any]:
+    """Return JSON indented, one value per line, for easier reading."""
+    try:
+        data = json.loads(decode_body(content_type, body))
+    except ValueError:
+        # Cut or invalid JSON is still readable as text
+        return _extract_text(content_type, body, max_length)
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    return {"title": "", **_join_until(encoder.iterencode(data), max_length, "")}
+
+
+def _extract_csv(content_type: str, body: bytes, max_length: int) -> dict[str, Any]:
+    """Return each record of a table as a line of column: value pairs."""
+    text = decode_body(content_type, body)
+    if "tab-separated" in content_type:
+        delimiter = "\t"
+    else:
+        try:
+            delimiter = (
+                csv.Sniffer().sniff(text[:CHARSET_SNIFF_BYTES], ",;\t|").delimiter
+            )
+        except csv.Error:
+            delimiter = ","
+    rows = csv.reader(io.StringIO(text), delimiter=delimiter)
+    if (header := next(rows, None)) is None:
+        return {"title": "", "text": "", "truncated": False}
+
+    records = (
+        "; ".join(
+            f"{name}: {value}"
+            for name, value in zip(header, row, strict=False)
+            if value
+        )
+        for row in rows
+    )
+    return {"title": "", **_join_until(records, max_length, "\n")}
+
+
+def _local_name(element: etree._Element) -> str:
+    """Return the tag of an element without its namespace."""
+    if not isinstance(element.tag, str):
+        # Comments and processing instructions
+        return ""
+    return etree.QName(element).localname
+
+
+def _child_text(element: etree._Element, names: Iterable[str]) -> str:
+    """Return the text of the first child with one of the names."""
+    children = {_local_name(child): child for child in element}
+    for name in names:
+        if (child := children.get(name)) is not None and child.text:
+            return child.text.strip()
+    return ""
+
+
+def _feed_item(item: etree._Element) -> str:
+    """Return the title, link, date and summary of a feed item."""
+    link = _child_text(item, ("link",))
+    for child in item:
+        # Atom links are attributes
+        if (
+            _local_name(child) == "link"
+            and child.get("rel", "alternate") == "alternate"
+        ):
+            link = child.get("href", link)
+            break
+    summary = _child_text(item, _FEED_SUMMARIES)
+    if "<" in summary:
+        summary = lxml_html.fragment_fromstring(
+            summary, create_parent="div"
+        ).text_content()
+    lines = (
+        _child_text(item, ("title",)),
+        " ".join(filter(None, (link, _child_text(item, _FEED_DATES)))),
+        summary.strip(),
+    )
+    return "\n".join(line for line in lines if line)
+
+
+def _extract_feed(content_type: str, body: bytes, max_length: int) -> dict[str, Any]:
+    """Return the items of an RSS or Atom feed.
+
+    The feed is parsed incrementally, and parsing stops once enough items
+    are read.
+    """
+    parser = etree.XMLPullParser(
+        events=("end",), resolve_entities=False, no_network=True, recover=True
+    )
+    title = ""
+    items_found = False
+
+    def _items() -> Iterable[str]:
+        nonlocal title, items_found
+        for start in range(0, len(body), _FEED_CHUNK_SIZE):
+            parser.feed(body[start : start + _FEED_CHUNK_SIZE])
+            for _, element in parser.read_events():
+                name = _local_name(element)
+                if name in _FEED_ITEMS:
+                    items_found = True
+                    yield _feed_item(element)
+                    element.clear()
+                elif name == "title" and not title and not items_found:
+                    title = (element.text or "").strip()
+
+    document = _join_until(_items(), max_length, "\n\n")
+    if not items_found:
+        # Other XML documents are read as text
+        return _extract_text(content_type, body, max_length)
+    return {"title": title, **document}
+
+
+def _extract_pdf(content_type: str, body: bytes, max_length: int) -> dict[str, Any]:
+    """Return the text of the pages of a PDF, up to the page with enough text."""
+    # pypdf is only imported when a PDF is read
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(body))
+    if reader.is_encrypted:
+        # Many PDFs are encrypted with an empty password to restrict editing
+        reader.decrypt("")
+    title = (reader.metadata.title if reader.metadata else None) or ""
+    pages = (page.extract_text() for page in reader.pages)
+    return {
+        "title": title,
+        **_join_until(pages, max_length, "\n\n"),
+        "pages": len(reader.pages),
+    }
+
+
+_EXTRACTORS: dict[str, Callable[[str, bytes, int], dict[str, Any]]] = {
+    DOCUMENT_PDF: _extract_pdf,
+    DOCUMENT_FEED: _extract_feed,
+    DOCUMENT_XML: _extract_feed,
+    DOCUMENT_CSV: _extract_csv,
+    DOCUMENT_JSON: _extract_json,
+    DOCUMENT_TEXT: _extract_text,
+}
@@ -0,0 +1,89 @@
+"""Search of previously fetched pages for AI Toolset."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import llm
+from voluptuous import All, Optional, Range, Required, Schema
+
+from ..const import (
+    DEFAULT_PAGE_SEARCH_RESULTS,
+    DEFAULT_PASSAGES_PER_PAGE,
+    MAX_PAGE_SEARCH_RESULTS,
+    TOOL_SEARCH_FETCHED_PAGES,
+)
+from .page_index import PageIndex
+from .ranking import rank_passages, split_passages
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _page_results(query: str, pages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the found pages with their passages most relevant to the query.
+
+    Runs in the executor since splitting and ranking long pages takes a while.
+    """
+    return [
+        {
+            "title": page["title"],
+            "url": page["url"],
+            "fetched": page["fetched"],
+            "passages": rank_passages(
+                query, split_passages(page["text"]), DEFAULT_PASSAGES_PER_PAGE
+            ),
+        }
+        for page in pages
+    ]
+
+
+class SearchFetchedPagesTool(llm.Tool):
+    """Tool for searching the pages fetched earlier, without network access."""
+
+    name = TOOL_SEARCH_FETCHED_PAGES
+    description = (
+        "Search the text of web pages that were fetched before with url_fetch "
+        "or search_and_read. Returns the matching pages with their passages "
+        "most relevant to the query. "
+        "Try this first when the question is about something read recently, "
+        "such as documentation, since it answers instantly without searching "
+        "the web."
+    )
+    parameters = Schema(
+        {
+            Required("query"): str,
+            Optional("max_results", default=DEFAULT_PAGE_SEARCH_RESULTS): All(
+                int, Range(min=1, max=MAX_PAGE_SEARCH_RESULTS)
+            ),
+        }
+    )
+
+    def __init__(self, page_index: PageIndex) -> None:
+        """Initialize the fetched pages search tool."""
+        self.page_index = page_index
+
+    async def async_call(
+        self,
+        hass: HomeAssistant,
+        tool_input: llm.ToolInput,
+        llm_context: llm.LLMContext,
+    ) -> dict[str, Any]:
+        """Search the fetched pages."""
+        query = tool_input.tool_args["query"]
+        max_results = tool_input.tool_args.get(
+            "max_results", DEFAULT_PAGE_SEARCH_RESULTS
+        )
+
+        try:
+            pages = await self.page_index.async_search(hass, query, max_results)
+        except Exception as err:
+            _LOGGER.exception("Error searching fetched pages")
+            return {"success": False, "error": str(err)}
+
+        return {
+            "success": True,
+            "query": query,
+            "results": await hass.async_add_executor_job(_page_results, query, pages),
+        }
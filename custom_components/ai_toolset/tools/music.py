@@ -9,13 +9,15 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
 from voluptuous import Optional, Required, Schema
 
+from ..const import TOOL_MUSIC_FIND, TOOL_MUSIC_PLAY
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class MusicFindTool(llm.Tool):
     """Tool for finding music in the media library."""
 
-    name = "music_find"
+    name = TOOL_MUSIC_FIND
     description = (
         "Search for music in the Home Assistant media library. "
         "Search by artist, album, track name, or genre. "
@@ -154,7 +156,7 @@ class MusicFindTool(llm.Tool):
 class MusicPlayTool(llm.Tool):
     """Tool for playing music on a media player."""
 
-    name = "music_play"
+    name = TOOL_MUSIC_PLAY
     description = (
         "Play music on a specific Home Assistant media player. "
         "Provide the media player entity ID and the media content to play. "
@@ -0,0 +1,160 @@
+"""Local full-text index of fetched pages for AI Toolset."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from ..const import (
+    DOMAIN,
+    PAGE_INDEX_MAX_AGE,
+    PAGE_INDEX_MAX_PAGES,
+    RANKED_TEXT_LENGTH,
+)
+from .ranking import terms
+
+_LOGGER = logging.getLogger(__name__)
+
+_CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+    "url UNINDEXED, title, text, fetched UNINDEXED, "
+    "tokenize = 'porter unicode61')"
+)
+
+
+def _match_expression(query: str) -> str | None:
+    """Return an FTS5 query matching pages with any word of a query.
+
+    Each word is quoted, so the query cannot use FTS5 syntax.
+    """
+    if not (words := terms(query)):
+        return None
+    return " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+class PageIndex:
+    """Full-text index of the text of fetched pages, in SQLite FTS5.
+
+    Pages are kept for a limited time and up to a maximum count, and a page
+    fetched again replaces its previous text. The database is only used
+    from the executor, one job at a time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_pages: int = PAGE_INDEX_MAX_PAGES,
+        max_age: float = PAGE_INDEX_MAX_AGE,
+    ) -> None:
+        """Initialize the page index."""
+        self.path = path
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the index if needed."""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(_CREATE_TABLE)
+            self._connection = connection
+        return self._connection
+
+    def add(self, url: str, title: str, text: str, fetched: float) -> None:
+        """Store the text of a page and drop pages past the retention."""
+        with self._lock:
+            if self._closed:
+                return
+            self._store(self._connect(), url, title, text, fetched)
+
+    def _store(
+        self,
+        connection: sqlite3.Connection,
+        url: str,
+        title: str,
+        text: str,
+        fetched: float,
+    ) -> None:
+        """Replace the text of a page in a transaction."""
+        with connection:
+            connection.execute("DELETE FROM pages WHERE url = ?", (url,))
+            connection.execute(
+                "INSERT INTO pages (url, title, text, fetched) VALUES (?, ?, ?, ?)",
+                (url, title, text[:RANKED_TEXT_LENGTH], fetched),
+            )
+            connection.execute(
+                "DELETE FROM pages WHERE fetched < ?", (fetched - self.max_age,)
+            )
+            connection.execute(
+                "DELETE FROM pages WHERE rowid IN (SELECT rowid FROM pages "
+                "ORDER BY fetched DESC LIMIT -1 OFFSET ?)",
+                (self.max_pages,),
+            )
+
+    def search(self, query: str, limit: int) -> list[dict[str, Any]]:
+        """Return the pages best matching a query, best first."""
+        if (expression := _match_expression(query)) is None:
+            return []
+        with self._lock:
+            if self._closed:
+                return []
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT url, title, text, fetched FROM pages "
+                    "WHERE pages MATCH ? ORDER BY rank LIMIT ?",
+                    (expression, limit),
+                )
+                .fetchall()
+            )
+        return [
+            {
+                "url": url,
+                "title": title,
+                "text": text,
+                "fetched": dt_util.utc_from_timestamp(fetched).isoformat(),
+            }
+            for url, title, text, fetched in rows
+        ]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._closed = True
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @callback
+    def async_add(self, hass: HomeAssistant, url: str, title: str, text: str) -> None:
+        """Store the text of a page in the background."""
+        hass.async_create_background_task(
+            self._async_add(hass, url, title, text), f"{DOMAIN} index page {url}"
+        )
+
+    async def _async_add(
+        self, hass: HomeAssistant, url: str, title: str, text: str
+    ) -> None:
+        """Store the text of a page, logging failures."""
+        try:
+            await hass.async_add_executor_job(self.add, url, title, text, time.time())
+        except sqlite3.Error:
+            _LOGGER.exception("Error indexing page %s", url)
+
+    async def async_search(
+        self, hass: HomeAssistant, query: str, limit: int
+    ) -> list[dict[str, Any]]:
+        """Return the pages best matching a query, best first."""
+        return await hass.async_add_executor_job(self.search, query, limit)
+
+    async def async_close(self, hass: HomeAssistant) -> None:
+        """Close the database."""
+        await hass.async_add_executor_job(self.close)
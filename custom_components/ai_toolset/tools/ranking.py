@@ -0,0 +1,137 @@
+"""Selection of the passages of a page that are relevant to a query."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+from ..const import PASSAGE_LENGTH
+
+_TERM_PATTERN = re.compile(r"\w+")
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s")
+
+# Okapi BM25 parameters: term frequency saturation and length normalization
+_K1 = 1.2
+_B = 0.75
+
+
+def terms(text: str) -> list[str]:
+    """Return the lowercased words of a text."""
+    return _TERM_PATTERN.findall(text.casefold())
+
+
+def _split_line(line: str, length: int) -> list[str]:
+    """Split a line into pieces of at most length characters.
+
+    Pieces end at the last sentence end in the second half of the length,
+    else at the last space, and only words longer than the length are cut.
+    """
+    pieces: list[str] = []
+    while len(line) > length:
+        # One more character, for the space after a sentence end
+        window = line[: length + 1]
+        if sentence_ends := list(SENTENCE_END.finditer(window, length // 2)):
+            cut = sentence_ends[-1].end()
+        elif (cut := window.rfind(" ")) <= 0:
+            cut = length
+        pieces.append(line[:cut].rstrip())
+        line = line[cut:].lstrip()
+    if line:
+        pieces.append(line)
+    return pieces
+
+
+def split_passages(text: str, length: int = PASSAGE_LENGTH) -> list[str]:
+    """Split extracted page text into passages of about length characters.
+
+    Lines are joined until a passage reaches the length, so paragraphs and
+    list items are not cut in the middle. Lines longer than the length, as
+    on pages without line breaks, are split between sentences or words.
+    """
+    passages: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in text.splitlines():
+        for piece in _split_line(line.strip(), length):
+            if current and size + len(piece) > length:
+                passages.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+def bm25_scores(query: str, passages: list[str]) -> list[float]:
+    """Return the BM25 score of each passage for a query.
+
+    The passages of the page are the collection, so terms found in every
+    passage count for little and rare terms for a lot.
+    """
+    query_terms = set(terms(query))
+    lengths: list[int] = []
+    frequencies: list[Counter[str]] = []
+    for passage in passages:
+        passage_terms = terms(passage)
+        lengths.append(len(passage_terms))
+        # Only the frequencies of the query terms are needed
+        frequencies.append(
+            Counter(term for term in passage_terms if term in query_terms)
+        )
+    if not query_terms or not passages:
+        return [0.0] * len(passages)
+
+    count = len(passages)
+    average_length = sum(lengths) / count or 1
+    document_frequency = Counter(term for counts in frequencies for term in counts)
+    idf = {
+        term: math.log(1 + (count - found + 0.5) / (found + 0.5))
+        for term, found in document_frequency.items()
+    }
+    return [
+        sum(
+            idf[term]
+            * frequency
+            * (_K1 + 1)
+            / (frequency + _K1 * (1 - _B + _B * length / average_length))
+            for term, frequency in counts.items()
+        )
+        for counts, length in zip(frequencies, lengths, strict=True)
+    ]
+
+
+def _best_first(query: str, passages: list[str]) -> list[int]:
+    """Return the indexes of the passages matching a query, best first."""
+    scores = bm25_scores(query, passages)
+    return sorted(
+        (index for index, score in enumerate(scores) if score > 0),
+        key=lambda index: (-scores[index], index),
+    )
+
+
+def rank_passages(query: str, passages: list[str], limit: int) -> list[str]:
+    """Return the passages most relevant to a query.
+
+    The best ones are returned in the order they appear on the page, and
+    passages without any query term are left out.
+    """
+    best = _best_first(query, passages)[:limit]
+    return [passages[index] for index in sorted(best)]
+
+
+def select_passages(query: str, passages: list[str], max_length: int) -> list[str]:
+    """Return the passages most relevant to a query that fit in max_length.
+
+    Passages are picked best first, skipping those that no longer fit, and
+    returned in the order they appear on the page.
+    """
+    selected: list[int] = []
+    size = 0
+    for index in _best_first(query, passages):
+        if size + len(passages[index]) <= max_length:
+            selected.append(index)
+            # Passages are joined with a blank line
+            size += len(passages[index]) + 2
+    return [passages[index] for index in sorted(selected)]
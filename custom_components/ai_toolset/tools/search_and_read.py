@@ -0,0 +1,128 @@
+"""Search and read tool for AI Toolset."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import llm
+from voluptuous import Optional, Required, Schema
+
+from ..const import (
+    DEFAULT_PASSAGES_PER_PAGE,
+    DEFAULT_SEARCH_AND_READ_PAGES,
+    MAX_SEARCH_AND_READ_PAGES,
+    RANKED_TEXT_LENGTH,
+    SEARCH_AND_READ_DEADLINE,
+    TOOL_SEARCH_AND_READ,
+    TOOL_WEB_SEARCH,
+)
+from ..tracing import span
+from .ranking import rank_passages, split_passages
+
+if TYPE_CHECKING:
+    from .url_fetch import URLFetchTool
+    from .web_search import WebSearchTool
+
+
+class SearchAndReadTool(llm.Tool):
+    """Tool that searches the web and reads the top results in one call."""
+
+    name = TOOL_SEARCH_AND_READ
+    description = (
+        "Search the web and read the top results in a single call. "
+        "Returns, for each of the top pages, its title, URL and the passages "
+        "most relevant to the query. "
+        "Prefer this over web_search followed by url_fetch for research "
+        "questions whose answer is in the text of web pages."
+    )
+    parameters = Schema(
+        {
+            Required("query"): str,
+            Optional("engine"): str,
+            Optional("pages", default=DEFAULT_SEARCH_AND_READ_PAGES): int,
+            Optional("passages_per_page", default=DEFAULT_PASSAGES_PER_PAGE): int,
+        }
+    )
+
+    def __init__(self, web_search: WebSearchTool, url_fetch: URLFetchTool) -> None:
+        """Initialize the search and read tool.
+
+        The web search and URL fetch tools are shared with the API, so their
+        caches, quotas and in-flight requests are shared too.
+        """
+        self.web_search = web_search
+        self.url_fetch = url_fetch
+
+    async def async_call(
+        self,
+        hass: HomeAssistant,
+        tool_input: llm.ToolInput,
+        llm_context: llm.LLMContext,
+    ) -> dict[str, Any]:
+        """Search the web and return the relevant passages of the top results."""
+        args = tool_input.tool_args
+        query = args["query"]
+        requested = args.get("pages", DEFAULT_SEARCH_AND_READ_PAGES)
+        pages = min(max(requested, 1), MAX_SEARCH_AND_READ_PAGES)
+        passages_per_page = args.get("passages_per_page", DEFAULT_PASSAGES_PER_PAGE)
+
+        search_args: dict[str, Any] = {"query": query, "max_results": pages}
+        if args.get("engine"):
+            search_args["engine"] = args["engine"]
+        search = await self.web_search.async_call(
+            hass,
+            llm.ToolInput(tool_name=TOOL_WEB_SEARCH, tool_args=search_args),
+            llm_context,
+        )
+        if "error" in search:
+            return {"success": False, "error": search["error"]}
+
+        results = [result for result in search["results"] if result.get("url")][:pages]
+        if not results:
+            return {
+                "success": True,
+                "query": query,
+                "engine": search["engine"],
+                "pages": [],
+                "message": "The search returned no results",
+            }
+
+        fetched = await self.url_fetch.async_fetch_pages(
+            hass,
+            [result["url"] for result in results],
+            timeout=SEARCH_AND_READ_DEADLINE,
+        )
+
+        # Ranking the text of every page would hold up the event loop
+        with span("rank_passages", **{"page.count": len(fetched)}):
+            read = await hass.async_add_executor_job(
+                lambda: [
+                    _read_page(query, result, page, passages_per_page)
+                    for result, page in zip(results, fetched, strict=True)
+                ]
+            )
+        return {
+            "success": any("error" not in page for page in read),
+            "query": query,
+            "engine": search["engine"],
+            "pages": read,
+        }
+
+
+def _read_page(
+    query: str, result: dict[str, Any], page: dict[str, Any], limit: int
+) -> dict[str, Any]:
+    """Return a search result with the passages of its page relevant to a query."""
+    read = {"title": result.get("title", ""), "url": result["url"]}
+    if "error" in page:
+        # The snippet is better than nothing
+        return {**read, "snippet": result.get("snippet", ""), "error": page["error"]}
+
+    text = page["text"][:RANKED_TEXT_LENGTH]
+    passages = rank_passages(query, split_passages(text), limit)
+    return {
+        **read,
+        # The snippet often holds the answer when no passage matches
+        "passages": passages or [result.get("snippet", "")],
+    }
@@ -2,35 +2,189 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 from bs4 import BeautifulSoup
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
-from voluptuous import Optional, Required, Schema
+from voluptuous import Optional, Schema
+from yarl import URL
+
+from ..coalesce import RequestCoalescer
+from ..const import (
+    MAX_DOCUMENT_TEXT_LENGTH,
+    MAX_PAGE_BYTES,
+    MAX_PAGE_CACHE_ENTRIES,
+    MAX_PDF_BYTES,
+    MAX_URL_FETCH_BATCH,
+    MAX_URL_FETCH_CONCURRENCY,
+    MAX_URL_FETCH_PER_HOST,
+    PAGE_CACHE_MAX_AGE,
+    RANKED_TEXT_LENGTH,
+    TOOL_URL_FETCH,
+)
+from ..http_client import async_get_clientsession, async_read_body
+from ..instrumentation import record_cache_lookup
+from ..tracing import span
+from .extractors import (
+    DOCUMENT_HTML,
+    DOCUMENT_PDF,
+    decode_body,
+    document_kind,
+    extract_document,
+)
+from .ranking import SENTENCE_END, select_passages, split_passages
+
+if TYPE_CHECKING:
+    from .page_index import PageIndex
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _parse_html(html: str) -> dict[str, str]:
+    """Extract the title, description and readable text of a page.
+
+    Runs in the executor since parsing a large page takes a while.
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    # Remove script and style elements
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+
+    # Extract text
+    text = soup.get_text(separator="\n", strip=True)
+    # Clean up whitespace
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = "\n".join(chunk for chunk in chunks if chunk)
+
+    # Extract metadata
+    title = ""
+    if soup.title:
+        title = soup.title.string or ""
+
+    description = ""
+    meta_desc = soup.find("meta", attrs={"name": "description"})
+    if meta_desc and meta_desc.get("content"):
+        description = meta_desc["content"]
+
+    return {"title": title, "description": description, "text": text}
+
+
+def _url_host(url: str) -> str | None:
+    """Return the host of an HTTP or HTTPS URL, or None if it is invalid."""
+    try:
+        parsed = URL(url)
+    except ValueError:
+        return None
+    if parsed.scheme not in ("http", "https") or not parsed.host:
+        return None
+    return parsed.host
+
+
+def _chunk(text: str, offset: int, max_length: int) -> tuple[str, int | None]:
+    """Return up to max_length characters of text from offset, and the next offset.
+
+    A chunk that does not reach the end of the text ends at the last line
+    break in its second half, else at the last sentence end there, so reading
+    a page chunk by chunk does not cut paragraphs or sentences in two. The
+    next offset is None at the end of the text.
+    """
+    end = offset + max_length
+    if end >= len(text):
+        return text[offset:], None
+
+    window = text[offset:end]
+    half = max_length // 2
+    if (cut := window.rfind("\n", half)) == -1:
+        sentence_ends = list(SENTENCE_END.finditer(window, half))
+        cut = sentence_ends[-1].end() if sentence_ends else max_length
+    cut = max(cut, 1)
+
+    next_offset = offset + cut
+    # The next chunk starts at the next word
+    while next_offset < len(text) and text[next_offset].isspace():
+        next_offset += 1
+    return window[:cut].rstrip(), next_offset
+
+
+def _read(page: dict[str, Any], offset: int, max_length: int) -> dict[str, Any]:
+    """Return the chunk of a fetched page starting at offset."""
+    if "error" in page:
+        return page
+
+    text, next_offset = _chunk(page["text"], offset, max_length)
+    result = {**page, "text": text, "offset": offset}
+    if next_offset is not None:
+        result["next_offset"] = next_offset
+    if "html" in page:
+        result["html"] = page["html"][:max_length]
+    return result
+
+
+def _focus(page: dict[str, Any], query: str, max_length: int) -> dict[str, Any]:
+    """Keep the passages of a fetched page most relevant to a query.
+
+    Called in the executor, as ranking up to RANKED_TEXT_LENGTH characters of
+    text is too slow for the event loop.
+    """
+    if "error" in page:
+        return page
+
+    text = page["text"][:RANKED_TEXT_LENGTH]
+    passages = select_passages(query, split_passages(text), max_length)
+    if not passages:
+        # Without a matching passage, the start of the page is the best guess
+        return {**_read(page, 0, max_length), "passages": 0}
+
+    focused = {**page, "text": "\n\n".join(passages), "passages": len(passages)}
+    if "html" in page:
+        focused["html"] = page["html"][:max_length]
+    return focused
+
+
 class URLFetchTool(llm.Tool):
     """Tool for fetching and parsing web page content."""
 
-    name = "url_fetch"
+    name = TOOL_URL_FETCH
     description = (
         "Fetch and extract content from a web page URL. "
         "Returns the page title, text content, and metadata. "
-        "Useful for reading articles, documentation, or any web content."
+        "Also reads PDF, plain text, JSON, CSV and RSS/Atom documents. "
+        "Useful for reading articles, documentation, or any web content. "
+        "To read several pages at once, e.g. the results of a web search, pass "
+        "them as a list in 'urls' instead. "
+        "Pass a 'query' to get the passages of the page most relevant to it "
+        "instead of the start of the page. "
+        "When a page is longer than max_length, the result has a "
+        "'next_offset'; pass it as 'offset' with the same URL to read on."
     )
     parameters = Schema(
         {
-            Required("url"): str,
+            Optional("url"): str,
+            Optional("urls"): [str],
             Optional("include_html", default=False): bool,
             Optional("max_length", default=10000): int,
+            Optional("offset", default=0): int,
+            Optional("query"): str,
         }
     )
 
+    def __init__(self, page_index: PageIndex | None = None) -> None:
+        """Initialize the URL fetch tool."""
+        self.page_index = page_index
+        self._requests: RequestCoalescer[dict[str, Any]] = RequestCoalescer(
+            TOOL_URL_FETCH
+        )
+        # Extracted pages by URL and whether they include the HTML, so the
+        # rest of a long page is read without fetching it again
+        self._pages: dict[tuple[str, bool], tuple[float, dict[str, Any]]] = {}
+
     async def async_call(
         self,
         hass: HomeAssistant,
@@ -38,71 +192,193 @@ class URLFetchTool(llm.Tool):
         llm_context: llm.LLMContext,
     ) -> dict[str, Any]:
         """Fetch URL content."""
-        url = tool_input.tool_args["url"]
-        include_html = tool_input.tool_args.get("include_html", False)
-        max_length = tool_input.tool_args.get("max_length", 10000)
+        args = tool_input.tool_args
+        urls = [url.strip() for url in args.get("urls") or []]
+        if args.get("url"):
+            urls.insert(0, args["url"].strip())
+        include_html = args.get("include_html", False)
+        max_length = max(args.get("max_length", 10000), 1)
+        offset = max(args.get("offset", 0), 0)
+        query = args.get("query")
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (compatible; HomeAssistant/1.0)"
-                    },
-                ) as response:
-                    response.raise_for_status()
-                    content_type = response.headers.get("Content-Type", "")
-
-                    if (
-                        "text/html" not in content_type
-                        and "application/xhtml" not in content_type
-                    ):
-                        # For non-HTML content, return as-is
-                        text = await response.text()
-                        return {
-                            "url": url,
-                            "content_type": content_type,
-                            "text": text[:max_length],
-                            "length": len(text),
-                        }
-
-                    html = await response.text()
+        if not urls:
+            return {"error": "A url or a list of urls is required"}
+        if len(urls) > MAX_URL_FETCH_BATCH:
+            return {
+                "error": (
+                    f"Too many URLs requested ({len(urls)}); "
+                    f"the maximum is {MAX_URL_FETCH_BATCH}"
+                )
+            }
 
-            # Parse HTML content
-            soup = BeautifulSoup(html, "lxml")
+        if len(urls) == 1:
+            pages = [await self._async_get_page(hass, urls[0], include_html)]
+        else:
+            pages = await self.async_fetch_pages(hass, urls, include_html)
+        if query:
+            with span("rank_passages", **{"page.count": len(pages)}):
+                results = await hass.async_add_executor_job(
+                    lambda: [_focus(page, query, max_length) for page in pages]
+                )
+        else:
+            results = [_read(page, offset, max_length) for page in pages]
+        if len(urls) == 1:
+            return results[0]
+        return {
+            "success": any("error" not in result for result in results),
+            "url_count": len(results),
+            "results": results,
+        }
+
+    async def async_fetch_pages(
+        self,
+        hass: HomeAssistant,
+        urls: list[str],
+        include_html: bool = False,
+        timeout: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Fetch several URLs in parallel and return their whole pages in order.
+
+        Invalid URLs and pages not fetched within the timeout are reported
+        as errors.
+        """
+        # Limit how many pages are fetched at the same time, overall and from
+        # a single host
+        semaphore = asyncio.Semaphore(MAX_URL_FETCH_CONCURRENCY)
+        host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+        async def _async_limited(url: str, host: str) -> dict[str, Any]:
+            host_semaphore = host_semaphores.setdefault(
+                host, asyncio.Semaphore(MAX_URL_FETCH_PER_HOST)
+            )
+            async with host_semaphore, semaphore:
+                return await self._async_get_page(hass, url, include_html)
 
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
+        results: list[dict[str, Any]] = []
+        tasks: dict[int, asyncio.Task[dict[str, Any]]] = {}
+        for position, url in enumerate(urls):
+            if (host := _url_host(url)) is None:
+                results.append({"url": url, "error": "Invalid URL"})
+                continue
+            results.append({})
+            tasks[position] = hass.async_create_task(_async_limited(url, host))
 
-            # Extract text
-            text = soup.get_text(separator="\n", strip=True)
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = "\n".join(chunk for chunk in chunks if chunk)
+        pending: set[asyncio.Task[dict[str, Any]]] = set()
+        if tasks:
+            try:
+                _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+            finally:
+                # Stop the fetches still running on a timeout or cancellation
+                for task in tasks.values():
+                    task.cancel()
 
-            # Extract metadata
-            title = ""
-            if soup.title:
-                title = soup.title.string or ""
+        for position, task in tasks.items():
+            if task in pending:
+                result = {"error": f"Timed out after {timeout} seconds"}
+            else:
+                result = task.result()
+            if "error" in result:
+                result = {"url": urls[position], **result}
+            results[position] = result
+        return results
 
-            description = ""
-            meta_desc = soup.find("meta", attrs={"name": "description"})
-            if meta_desc and meta_desc.get("content"):
-                description = meta_desc["content"]
+    async def _async_get_page(
+        self, hass: HomeAssistant, url: str, include_html: bool
+    ) -> dict[str, Any]:
+        """Return a recently fetched page, or fetch it.
+
+        The request is shared with identical fetches in flight.
+        """
+        key = (url, include_html)
+        page = self._cached_page(key)
+        record_cache_lookup(hit=page is not None)
+        if page is not None:
+            return page
+
+        page = await self._requests.async_request(
+            hass, key, lambda: self._async_fetch(hass, url, include_html)
+        )
+        if "error" not in page:
+            self._cache_page(key, page)
+        return page
+
+    def _cached_page(self, key: tuple[str, bool]) -> dict[str, Any] | None:
+        """Return a recently fetched page."""
+        if (entry := self._pages.pop(key, None)) is None:
+            return None
+        fetched, page = entry
+        if time.monotonic() - fetched > PAGE_CACHE_MAX_AGE:
+            return None
+        # Move the page to the end, as the most recently used
+        self._pages[key] = entry
+        return page
+
+    def _cache_page(self, key: tuple[str, bool], page: dict[str, Any]) -> None:
+        """Keep a fetched page, dropping the least recently used ones."""
+        self._pages.pop(key, None)
+        self._pages[key] = (time.monotonic(), page)
+        while len(self._pages) > MAX_PAGE_CACHE_ENTRIES:
+            del self._pages[next(iter(self._pages))]
+
+    def _index_page(self, hass: HomeAssistant, url: str, title: str, text: str) -> None:
+        """Add the full text of a fetched page to the page index, if any."""
+        if self.page_index is not None and text.strip():
+            self.page_index.async_add(hass, url, title, text)
+
+    async def _async_fetch(
+        self, hass: HomeAssistant, url: str, include_html: bool
+    ) -> dict[str, Any]:
+        """Fetch and parse a URL and return its whole content or an error."""
+        try:
+            session = async_get_clientsession(hass)
+            async with session.get(
+                url,
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; HomeAssistant/1.0)"},
+            ) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "")
+                if (kind := document_kind(content_type)) is None:
+                    # Do not download images, videos and the like
+                    return {"error": f"Cannot read text from {content_type} content"}
+
+                limit = MAX_PDF_BYTES if kind == DOCUMENT_PDF else MAX_PAGE_BYTES
+                with span("http.read_body") as body_span:
+                    body, truncated = await async_read_body(response, limit)
+                    if body_span is not None:
+                        body_span.attributes["body.length"] = len(body)
+                        body_span.attributes["body.received_length"] = (
+                            response.content.total_raw_bytes
+                        )
+                        body_span.attributes["http.content_encoding"] = (
+                            response.headers.get("Content-Encoding", "identity")
+                        )
+
+            if kind != DOCUMENT_HTML:
+                return await self._async_extract_document(
+                    hass, url, kind, content_type, body, truncated
+                )
+
+            html = decode_body(content_type, body)
+            # Parse HTML content
+            with span("html.parse", **{"html.length": len(html)}):
+                page = await hass.async_add_executor_job(_parse_html, html)
+            text = page["text"]
+            self._index_page(hass, url, page["title"], text)
 
             result = {
                 "url": url,
-                "title": title,
-                "description": description,
-                "text": text[:max_length],
+                "title": page["title"],
+                "description": page["description"],
+                "text": text,
                 "length": len(text),
             }
 
             if include_html:
-                result["html"] = html[:max_length]
+                result["html"] = html
+            if truncated:
+                # Pages over MAX_PAGE_BYTES are only read up to it
+                result["truncated"] = True
 
             return result
 
@@ -112,3 +388,36 @@ class URLFetchTool(llm.Tool):
         except Exception as err:
             _LOGGER.exception("Error processing URL content")
             return {"error": str(err)}
+
+    async def _async_extract_document(
+        self,
+        hass: HomeAssistant,
+        url: str,
+        kind: str,
+        content_type: str,
+        body: bytes,
+        truncated: bool,
+    ) -> dict[str, Any]:
+        """Extract the text of a document other than an HTML page."""
+        if truncated and kind == DOCUMENT_PDF:
+            return {"error": f"The PDF is larger than {MAX_PDF_BYTES // 2**20} MB"}
+
+        with span("document.extract", **{"document.kind": kind}):
+            document = await hass.async_add_executor_job(
+                extract_document, kind, content_type, body, MAX_DOCUMENT_TEXT_LENGTH
+            )
+        text = document["text"]
+        self._index_page(hass, url, document["title"], text)
+
+        result = {
+            "url": url,
+            "content_type": content_type,
+            "title": document["title"],
+            "text": text,
+            "length": len(text),
+        }
+        if "pages" in document:
+            result["pages"] = document["pages"]
+        if truncated or document["truncated"]:
+            result["truncated"] = True
+        return result
@@ -2,33 +2,353 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
+import time
 from typing import Any
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
-from voluptuous import Required, Schema
+from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.helpers.location import find_coordinates
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+from voluptuous import In, Optional, Required, Schema
+
+from ..const import (
+    CONF_WAZE_AVOID_TOLLS,
+    CONF_WAZE_REGION,
+    CONF_WAZE_UNITS,
+    CONF_WAZE_VEHICLE_TYPE,
+    DEFAULT_ROUTE_CACHE_TTL,
+    DEFAULT_WAZE_AVOID_TOLLS,
+    DEFAULT_WAZE_REGION,
+    DEFAULT_WAZE_UNITS,
+    DEFAULT_WAZE_VEHICLE_TYPE,
+    GEOCODE_SAVE_DELAY,
+    GEOCODE_STORAGE_KEY,
+    GEOCODE_STORAGE_VERSION,
+    MAX_GEOCODE_CACHE_ENTRIES,
+    MAX_TRAVEL_MATRIX_ROUTES,
+    MAX_WAZE_CONCURRENCY,
+    TOOL_GET_TRAVEL_DISTANCE,
+    TOOL_GET_TRAVEL_INFO,
+    TOOL_GET_TRAVEL_TIME,
+    WAZE_DOMAIN,
+    WAZE_REGIONS,
+    WAZE_SERVICE_GET_TRAVEL_TIME,
+    WAZE_UNITS,
+    WAZE_VEHICLE_TYPES,
+)
+from ..instrumentation import record_cache_lookup
+from ..tracing import span
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_ROUTE_OPTIONS: dict[str, Any] = {
+    "region": DEFAULT_WAZE_REGION,
+    "units": DEFAULT_WAZE_UNITS,
+    "vehicle_type": DEFAULT_WAZE_VEHICLE_TYPE,
+    "avoid_tolls": DEFAULT_WAZE_AVOID_TOLLS,
+}
+
+# Per-call overrides of the configured route options
+ROUTE_OPTION_PARAMETERS = {
+    Optional("region"): In(WAZE_REGIONS),
+    Optional("units"): In(WAZE_UNITS),
+    Optional("vehicle_type"): In(WAZE_VEHICLE_TYPES),
+    Optional("avoid_tolls"): bool,
+}
+
+COORDINATES_PATTERN = re.compile(
+    r"^\s*[-+]?\d{1,2}(\.\d+)?\s*,\s*[-+]?\d{1,3}(\.\d+)?\s*$"
+)
+
+
+def _normalize_location(location: str) -> str:
+    """Normalize a location so equivalent spellings share a cache entry."""
+    return " ".join(location.split()).casefold()
+
+
+def route_options_from_config(config: dict[str, Any]) -> dict[str, Any]:
+    """Return the default route options for a config entry."""
+    return {
+        "region": config.get(CONF_WAZE_REGION, DEFAULT_WAZE_REGION),
+        "units": config.get(CONF_WAZE_UNITS, DEFAULT_WAZE_UNITS),
+        "vehicle_type": config.get(CONF_WAZE_VEHICLE_TYPE, DEFAULT_WAZE_VEHICLE_TYPE),
+        "avoid_tolls": config.get(CONF_WAZE_AVOID_TOLLS, DEFAULT_WAZE_AVOID_TOLLS),
+    }
+
+
+def _route_options(tool_args: dict[str, Any]) -> dict[str, Any]:
+    """Return the route options overridden in the tool arguments."""
+    return {
+        key.schema: tool_args[key.schema]
+        for key in ROUTE_OPTION_PARAMETERS
+        if key.schema in tool_args
+    }
+
+
+def _distance_unit(units: str) -> tuple[str, str]:
+    """Return the result key and unit name for distances in the given units."""
+    if units == "metric":
+        return "distance_km", "kilometers"
+    return "distance_miles", "miles"
+
+
+def _extract_route(result: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Extract the duration and distance from a Waze service response."""
+    if not result:
+        return None
+    # Newer versions of the service return a list of candidate routes
+    if routes := result.get("routes"):
+        result = routes[0]
+    if "duration" not in result and "distance" not in result:
+        return None
+    return {
+        "duration": result.get("duration"),
+        "distance": result.get("distance"),
+    }
+
+
+class WazeLocationResolver:
+    """Resolve locations to coordinates before they are sent to Waze.
+
+    Zones, persons, device trackers and other entities with a location are
+    resolved from their current state. Free-text addresses are geocoded once
+    and the coordinates are persisted, so Waze does not have to geocode the
+    same address on every lookup.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the location resolver."""
+        self._geocodes: dict[str, str] = {}
+        self._store: Store[dict[str, str]] | None = None
+        self._load_task: asyncio.Task[None] | None = None
+
+    async def async_resolve(
+        self, hass: HomeAssistant, location: str, region: str
+    ) -> str:
+        """Return coordinates for a location, or the location itself."""
+        location = location.strip()
+        if COORDINATES_PATTERN.match(location):
+            return location
+
+        # Zone names ("home", "Work"), entity ids and entities pointing at them
+        for candidate in (location, f"zone.{slugify(location)}"):
+            coordinates = find_coordinates(hass, candidate)
+            if coordinates and COORDINATES_PATTERN.match(coordinates):
+                return coordinates.replace(" ", "")
+
+        await self._async_load(hass)
+        key = f"{region.lower()}:{_normalize_location(location)}"
+        if (coordinates := self._geocodes.get(key)) is not None:
+            return coordinates
+
+        if (coordinates := await self._async_geocode(hass, location, region)) is None:
+            # Let Waze geocode the address itself
+            return location
+
+        self._geocodes[key] = coordinates
+        while len(self._geocodes) > MAX_GEOCODE_CACHE_ENTRIES:
+            del self._geocodes[next(iter(self._geocodes))]
+        if self._store is not None:
+            self._store.async_delay_save(
+                lambda: dict(self._geocodes), GEOCODE_SAVE_DELAY
+            )
+        return coordinates
+
+    async def _async_load(self, hass: HomeAssistant) -> None:
+        """Load the persisted geocode cache on first use."""
+        if self._load_task is None:
+            self._store = Store(hass, GEOCODE_STORAGE_VERSION, GEOCODE_STORAGE_KEY)
+            self._load_task = hass.async_create_task(self._async_load_store())
+        await asyncio.shield(self._load_task)
+
+    async def _async_load_store(self) -> None:
+        """Read the geocode cache from storage."""
+        assert self._store is not None
+        if stored := await self._store.async_load():
+            self._geocodes = {**stored, **self._geocodes}
+
+    async def _async_geocode(
+        self, hass: HomeAssistant, address: str, region: str
+    ) -> str | None:
+        """Geocode an address using the Waze autocomplete API."""
+        try:
+            # Installed alongside the Waze Travel Time integration
+            from pywaze.route_calculator import WazeRouteCalculator
+        except ImportError:
+            return None
+
+        client = WazeRouteCalculator(
+            region=region.upper(), client=get_async_client(hass)
+        )
+        try:
+            coords = await client.address_to_coords(address)
+        except Exception as err:
+            _LOGGER.debug("Unable to geocode '%s': %s", address, err)
+            return None
+        return f"{coords['lat']},{coords['lon']}"
+
+
+class WazeRouteCache:
+    """Short-lived cache of Waze routes shared by the travel tools.
+
+    Lookups for the same origin, destination and options within the TTL are
+    served from memory, and concurrent lookups for the same route share a
+    single in-flight service call. Service calls made by all the tools and
+    conversations using the cache are limited to a few at a time.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_ROUTE_CACHE_TTL,
+        resolver: WazeLocationResolver | None = None,
+        default_options: dict[str, Any] | None = None,
+    ) -> None:
+        """Initialize the route cache."""
+        self.ttl = ttl
+        self.resolver = resolver or WazeLocationResolver()
+        self.default_options = {**DEFAULT_ROUTE_OPTIONS, **(default_options or {})}
+        self._routes: dict[tuple, tuple[float, dict[str, Any]]] = {}
+        self._pending: dict[tuple, asyncio.Task[dict[str, Any] | None]] = {}
+        self._service_calls = asyncio.Semaphore(MAX_WAZE_CONCURRENCY)
+
+    @staticmethod
+    def route_key(origin: str, destination: str, options: dict[str, Any]) -> tuple:
+        """Return the cache key for a route."""
+        return (
+            _normalize_location(origin),
+            _normalize_location(destination),
+            tuple(sorted(options.items())),
+        )
+
+    def get(self, key: tuple) -> dict[str, Any] | None:
+        """Return a cached route if it has not expired."""
+        if (entry := self._routes.get(key)) is None:
+            return None
+        expires, route = entry
+        if expires < time.monotonic():
+            del self._routes[key]
+            return None
+        return route
+
+    def set(self, key: tuple, route: dict[str, Any], ttl: float | None = None) -> None:
+        """Store a route in the cache."""
+        self._routes[key] = (time.monotonic() + (ttl or self.ttl), route)
+
+    async def async_get_route(
+        self,
+        hass: HomeAssistant,
+        origin: str,
+        destination: str,
+        options: dict[str, Any] | None = None,
+        *,
+        refresh: bool = False,
+        ttl: float | None = None,
+    ) -> dict[str, Any] | None:
+        """Return the route between two locations, calling Waze if needed.
+
+        With refresh, the route is always fetched from Waze and cached for ttl
+        seconds, which is used to keep frequent routes warm.
+        """
+        options = {**self.default_options, **(options or {})}
+        with span("waze.resolve_locations"):
+            origin, destination = await asyncio.gather(
+                self.resolver.async_resolve(hass, origin, options["region"]),
+                self.resolver.async_resolve(hass, destination, options["region"]),
+            )
+        key = self.route_key(origin, destination, options)
+
+        with span("cache_lookup", **{"cache.name": "waze_route"}) as lookup_span:
+            route = None if refresh else self.get(key)
+            if lookup_span is not None:
+                lookup_span.attributes["cache.hit"] = route is not None
+        if route is not None:
+            record_cache_lookup(hit=True)
+            return route
+
+        coalesced = False
+        if refresh or (task := self._pending.get(key)) is None:
+            record_cache_lookup(hit=False)
+            task = hass.async_create_task(
+                self._async_fetch_route(hass, key, origin, destination, options, ttl)
+            )
+            self._pending[key] = task
+
+            def _async_discard(done: asyncio.Task[dict[str, Any] | None]) -> None:
+                if self._pending.get(key) is done:
+                    del self._pending[key]
+
+            task.add_done_callback(_async_discard)
+        else:
+            # Answered by the lookup already in flight
+            record_cache_lookup(hit=True)
+            coalesced = True
+
+        with span(
+            "service_call",
+            **{
+                "service": f"{WAZE_DOMAIN}.{WAZE_SERVICE_GET_TRAVEL_TIME}",
+                "coalesced": coalesced,
+            },
+        ):
+            return await asyncio.shield(task)
+
+    async def _async_fetch_route(
+        self,
+        hass: HomeAssistant,
+        key: tuple,
+        origin: str,
+        destination: str,
+        options: dict[str, Any],
+        ttl: float | None,
+    ) -> dict[str, Any] | None:
+        """Call the Waze service and cache a successful result."""
+        async with self._service_calls:
+            result = await hass.services.async_call(
+                WAZE_DOMAIN,
+                WAZE_SERVICE_GET_TRAVEL_TIME,
+                {
+                    "origin": origin,
+                    "destination": destination,
+                    **options,
+                },
+                blocking=True,
+                return_response=True,
+            )
+        if (route := _extract_route(result)) is not None:
+            route["units"] = options["units"]
+            self.set(key, route, ttl)
+        return route
+
 
 class GetTravelTimeTool(llm.Tool):
     """Tool for getting travel time using Waze."""
 
-    name = "get_travel_time"
+    name = TOOL_GET_TRAVEL_TIME
     description = (
         "Get estimated travel time between two locations using Waze navigation data. "
-        "Provide origin and destination as addresses or GPS coordinates. "
+        "Provide origin and destination as addresses, GPS coordinates, zone names, "
+        "or zone, person or device_tracker entity IDs. "
         "Returns travel time in minutes based on current traffic conditions. "
+        "Optionally override the region, units, vehicle type or toll avoidance. "
         "Useful for planning trips, checking commute times, or estimating arrival times."
     )
     parameters = Schema(
         {
             Required("origin"): str,
             Required("destination"): str,
+            **ROUTE_OPTION_PARAMETERS,
         }
     )
 
+    def __init__(self, route_cache: WazeRouteCache | None = None) -> None:
+        """Initialize the travel time tool."""
+        self.route_cache = route_cache or WazeRouteCache()
+
     async def async_call(
         self,
         hass: HomeAssistant,
@@ -40,25 +360,13 @@ class GetTravelTimeTool(llm.Tool):
         destination = tool_input.tool_args["destination"]
 
         try:
-            # Call the Waze travel time service
-            result = await hass.services.async_call(
-                "waze_travel_time",
-                "get_travel_time",
-                {
-                    "origin": origin,
-                    "destination": destination,
-                    "region": "us",
-                    "units": "imperial",
-                    "vehicle_type": "car",
-                    "avoid_tolls": False,
-                },
-                blocking=True,
-                return_response=True,
+            route = await self.route_cache.async_get_route(
+                hass, origin, destination, _route_options(tool_input.tool_args)
             )
 
             # Extract travel time from result
-            if result and "duration" in result:
-                travel_time = result["duration"]
+            if route and route["duration"] is not None:
+                travel_time = route["duration"]
                 return {
                     "success": True,
                     "origin": origin,
@@ -83,20 +391,28 @@ class GetTravelTimeTool(llm.Tool):
 class GetTravelDistanceTool(llm.Tool):
     """Tool for getting travel distance using Waze."""
 
-    name = "get_travel_distance"
+    name = TOOL_GET_TRAVEL_DISTANCE
     description = (
         "Get estimated travel distance between two locations using Waze navigation data. "
-        "Provide origin and destination as addresses or GPS coordinates. "
-        "Returns distance in miles based on recommended route. "
+        "Provide origin and destination as addresses, GPS coordinates, zone names, "
+        "or zone, person or device_tracker entity IDs. "
+        "Returns distance in miles (or kilometers with metric units) based on "
+        "recommended route. "
+        "Optionally override the region, units, vehicle type or toll avoidance. "
         "Useful for planning trips, checking route lengths, or estimating fuel needs."
     )
     parameters = Schema(
         {
             Required("origin"): str,
             Required("destination"): str,
+            **ROUTE_OPTION_PARAMETERS,
         }
     )
 
+    def __init__(self, route_cache: WazeRouteCache | None = None) -> None:
+        """Initialize the travel distance tool."""
+        self.route_cache = route_cache or WazeRouteCache()
+
     async def async_call(
         self,
         hass: HomeAssistant,
@@ -108,31 +424,20 @@ class GetTravelDistanceTool(llm.Tool):
         destination = tool_input.tool_args["destination"]
 
         try:
-            # Call the Waze travel time service
-            result = await hass.services.async_call(
-                "waze_travel_time",
-                "get_travel_time",
-                {
-                    "origin": origin,
-                    "destination": destination,
-                    "region": "us",
-                    "units": "imperial",
-                    "vehicle_type": "car",
-                    "avoid_tolls": False,
-                },
-                blocking=True,
-                return_response=True,
+            route = await self.route_cache.async_get_route(
+                hass, origin, destination, _route_options(tool_input.tool_args)
             )
 
             # Extract distance from result
-            if result and "distance" in result:
-                distance = result["distance"]
+            if route and route["distance"] is not None:
+                distance = route["distance"]
+                distance_key, unit = _distance_unit(route["units"])
                 return {
                     "success": True,
                     "origin": origin,
                     "destination": destination,
-                    "distance_miles": distance,
-                    "message": f"Distance from '{origin}' to '{destination}' is {distance} miles",
+                    distance_key: distance,
+                    "message": f"Distance from '{origin}' to '{destination}' is {distance} {unit}",
                 }
             else:
                 return {
@@ -146,3 +451,128 @@ class GetTravelDistanceTool(llm.Tool):
                 "success": False,
                 "error": str(err),
             }
+
+
+class GetTravelInfoTool(llm.Tool):
+    """Tool for getting travel time and distance for one or many routes."""
+
+    name = TOOL_GET_TRAVEL_INFO
+    description = (
+        "Get both estimated travel time (minutes) and distance (miles, or "
+        "kilometers with metric units) using Waze "
+        "navigation data in a single call. "
+        "Provide origin and destination for a single route, or lists of origins "
+        "and destinations to get every origin/destination combination at once, "
+        "e.g. commute times for everyone in the household. "
+        "Locations can be addresses, GPS coordinates, zone names, or zone, person "
+        "or device_tracker entity IDs. "
+        "Optionally override the region, units, vehicle type or toll avoidance. "
+        "Prefer this over separate travel time and distance lookups."
+    )
+    parameters = Schema(
+        {
+            Optional("origin"): str,
+            Optional("destination"): str,
+            Optional("origins"): [str],
+            Optional("destinations"): [str],
+            **ROUTE_OPTION_PARAMETERS,
+        }
+    )
+
+    def __init__(self, route_cache: WazeRouteCache | None = None) -> None:
+        """Initialize the travel info tool."""
+        self.route_cache = route_cache or WazeRouteCache()
+
+    async def async_call(
+        self,
+        hass: HomeAssistant,
+        tool_input: llm.ToolInput,
+        llm_context: llm.LLMContext,
+    ) -> dict[str, Any]:
+        """Get travel time and distance from Waze."""
+        args = tool_input.tool_args
+        origins = list(args.get("origins") or [])
+        destinations = list(args.get("destinations") or [])
+        if args.get("origin"):
+            origins.insert(0, args["origin"])
+        if args.get("destination"):
+            destinations.insert(0, args["destination"])
+
+        if not origins or not destinations:
+            return {
+                "success": False,
+                "error": "At least one origin and one destination are required",
+            }
+
+        pairs = [
+            (origin, destination) for origin in origins for destination in destinations
+        ]
+        if len(pairs) > MAX_TRAVEL_MATRIX_ROUTES:
+            return {
+                "success": False,
+                "error": (
+                    f"Too many routes requested ({len(pairs)}); "
+                    f"the maximum is {MAX_TRAVEL_MATRIX_ROUTES}"
+                ),
+            }
+
+        options = _route_options(args)
+        if len(pairs) == 1:
+            route = await self._async_get_route(hass, *pairs[0], options)
+            if "error" in route:
+                return {"success": False, **route}
+            distance_key, unit = _distance_unit(
+                options.get("units", self.route_cache.default_options["units"])
+            )
+            return {
+                "success": True,
+                **route,
+                "message": (
+                    f"Travel from '{route['origin']}' to '{route['destination']}' "
+                    f"takes {route['travel_time_minutes']} minutes "
+                    f"over {route[distance_key]} {unit}"
+                ),
+            }
+
+        # The route cache limits how many routes are requested at the same time
+        routes = await asyncio.gather(
+            *(
+                self._async_get_route(hass, origin, destination, options)
+                for origin, destination in pairs
+            )
+        )
+        return {
+            "success": any("error" not in route for route in routes),
+            "route_count": len(routes),
+            "routes": routes,
+        }
+
+    async def _async_get_route(
+        self,
+        hass: HomeAssistant,
+        origin: str,
+        destination: str,
+        options: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Look up a single route, reporting errors in the result."""
+        try:
+            route = await self.route_cache.async_get_route(
+                hass, origin, destination, options
+            )
+        except Exception as err:
+            _LOGGER.exception("Error getting travel info from Waze")
+            return {"origin": origin, "destination": destination, "error": str(err)}
+
+        if route is None:
+            return {
+                "origin": origin,
+                "destination": destination,
+                "error": "Unable to retrieve travel info from Waze service",
+            }
+        distance_key, _ = _distance_unit(route["units"])
+        return {
+            "origin": origin,
+            "destination": destination,
+            "travel_time_minutes": route["duration"],
+            distance_key: route["distance"],
+        }
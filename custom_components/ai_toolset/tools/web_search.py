@@ -2,32 +2,60 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+import time
 from typing import Any
 
-import aiohttp
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
 from voluptuous import Optional, Required, Schema
 
+from ..coalesce import RequestCoalescer
 from ..const import (
     CONF_BING_API_KEY,
     CONF_GOOGLE_API_KEY,
     CONF_GOOGLE_CX,
     CONF_KAGI_API_KEY,
     DEFAULT_MAX_RESULTS,
-    SEARCH_ENGINE_BING,
+    MAX_SEARCH_CACHE_ENTRIES,
+    MAX_SEARCH_RATE_WAIT,
+    MAX_SEARCH_RESPONSE_BYTES,
+    SEARCH_CACHE_MAX_AGE,
     SEARCH_ENGINE_GOOGLE,
     SEARCH_ENGINE_KAGI,
+    SEARCH_ENGINES,
+    SEARCH_QUOTA_LOW_FRACTION,
+    TOOL_WEB_SEARCH,
 )
+from ..http_client import async_get_clientsession, async_read_json
+from ..instrumentation import record_cache_lookup
+from ..quota import (
+    SearchQuota,
+    async_get_search_quota,
+    configured_engines,
+    daily_quota,
+)
+from ..tracing import span
 
 _LOGGER = logging.getLogger(__name__)
 
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+KAGI_SEARCH_URL = "https://kagi.com/api/v0/search"
+BING_WEB_SEARCH_URL = "https://api.bing.microsoft.com/v7.0/search"
+BING_IMAGE_SEARCH_URL = "https://api.bing.microsoft.com/v7.0/images/search"
+
+
+def _normalize_query(query: str) -> str:
+    """Return a query with case and spacing normalized for coalescing."""
+    return " ".join(query.split()).casefold()
+
 
 class WebSearchTool(llm.Tool):
     """Tool for performing web searches with multiple engines."""
 
-    name = "web_search"
+    name = TOOL_WEB_SEARCH
     description = (
         "Search the web using Google, Kagi, or Bing. "
         "Returns both text results and image results if available. "
@@ -42,9 +70,21 @@ class WebSearchTool(llm.Tool):
         }
     )
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any]) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        quota: SearchQuota | None = None,
+    ) -> None:
         """Initialize the web search tool."""
+        self.hass = hass
         self.config = config
+        self.quota = quota or async_get_search_quota(hass)
+        # Results of recent searches, served when the quota runs low
+        self._cache: dict[tuple, tuple[float, dict[str, Any]]] = {}
+        self._requests: RequestCoalescer[dict[str, Any]] = RequestCoalescer(
+            TOOL_WEB_SEARCH
+        )
 
     async def async_call(
         self,
@@ -58,37 +98,128 @@ class WebSearchTool(llm.Tool):
         engine = tool_input.tool_args.get("engine")
         max_results = tool_input.tool_args.get("max_results", DEFAULT_MAX_RESULTS)
 
-        # Determine which engine to use
-        if not engine:
-            if CONF_GOOGLE_API_KEY in self.config:
-                engine = SEARCH_ENGINE_GOOGLE
-            elif CONF_KAGI_API_KEY in self.config:
-                engine = SEARCH_ENGINE_KAGI
-            elif CONF_BING_API_KEY in self.config:
-                engine = SEARCH_ENGINE_BING
-            else:
-                return {"error": "No search engine configured"}
+        # Determine which engines to use, in order of preference
+        engines = configured_engines(self.config)
+        if engine:
+            if engine not in SEARCH_ENGINES:
+                return {"error": f"Unknown search engine: {engine}"}
+            # Other engines take over when its quota runs out
+            engines = [engine, *(name for name in engines if name != engine)]
+        elif not engines:
+            return {"error": "No search engine configured"}
+
+        # Identical searches made at the same time share one upstream request
+        key = (_normalize_query(query), search_type, max_results)
+        return await self._requests.async_request(
+            hass,
+            (tuple(engines), *key),
+            lambda: self._async_search(engines, key, query, search_type, max_results),
+        )
+
+    def _remaining(self, engine: str) -> int | None:
+        """Return the searches left today with an engine, None for no limit."""
+        return self.quota.remaining(engine, daily_quota(self.config, engine))
+
+    def _quota_low(self, engine: str) -> bool:
+        """Return if little of the daily quota of an engine is left."""
+        remaining = self._remaining(engine)
+        return remaining is not None and remaining <= (
+            daily_quota(self.config, engine) * SEARCH_QUOTA_LOW_FRACTION
+        )
+
+    async def _async_pick_engine(
+        self, engines: list[str], key: tuple
+    ) -> str | dict[str, Any]:
+        """Return the engine to search with, or cached results or an error.
+
+        The first engine with quota to spare that is not rate limited is used.
+        Otherwise recent results are served, and only without them is the
+        rest of a quota spent or a rate limit waited for.
+        """
+        await self.quota.async_load()
+        if engine := next(
+            (
+                name
+                for name in engines
+                if not self._quota_low(name) and self.quota.bucket(name).try_acquire()
+            ),
+            None,
+        ):
+            return engine
+
+        with span("cache_lookup", **{"cache.name": TOOL_WEB_SEARCH}) as lookup_span:
+            cached = self._cached(key)
+            if lookup_span is not None:
+                lookup_span.attributes["cache.hit"] = cached is not None
+        record_cache_lookup(hit=cached is not None)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        if (
+            engine := next((name for name in engines if self._remaining(name)), None)
+        ) is None:
+            return {"error": "The daily search quota is used up for today"}
+        bucket = self.quota.bucket(engine)
+        if (delay := bucket.delay()) > MAX_SEARCH_RATE_WAIT:
+            return {
+                "error": "Search rate limit reached",
+                "retry_after": math.ceil(delay),
+            }
+        with span("rate_limit.wait", **{"search.engine": engine}):
+            await asyncio.sleep(bucket.reserve())
+        return engine
+
+    def _cached(self, key: tuple) -> dict[str, Any] | None:
+        """Return the recent results of a search."""
+        if (entry := self._cache.get(key)) is None:
+            return None
+        searched, result = entry
+        if time.monotonic() - searched > SEARCH_CACHE_MAX_AGE:
+            del self._cache[key]
+            return None
+        return result
+
+    def _cache_result(self, key: tuple, result: dict[str, Any]) -> None:
+        """Keep the results of a search."""
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic(), result)
+        while len(self._cache) > MAX_SEARCH_CACHE_ENTRIES:
+            del self._cache[next(iter(self._cache))]
+
+    async def _async_search(
+        self,
+        engines: list[str],
+        key: tuple,
+        query: str,
+        search_type: str,
+        max_results: int,
+    ) -> dict[str, Any]:
+        """Search with the first usable engine and return the results or an error."""
+        engine = await self._async_pick_engine(engines, key)
+        if isinstance(engine, dict):
+            return engine
 
+        self.quota.async_record(engine)
         try:
             if engine == SEARCH_ENGINE_GOOGLE:
                 results = await self._search_google(query, search_type, max_results)
             elif engine == SEARCH_ENGINE_KAGI:
                 results = await self._search_kagi(query, search_type, max_results)
-            elif engine == SEARCH_ENGINE_BING:
-                results = await self._search_bing(query, search_type, max_results)
             else:
-                return {"error": f"Unknown search engine: {engine}"}
-
-            return {
-                "query": query,
-                "engine": engine,
-                "search_type": search_type,
-                "results": results,
-            }
+                results = await self._search_bing(query, search_type, max_results)
         except Exception as err:
             _LOGGER.exception("Error performing web search")
             return {"error": str(err)}
 
+        result = {
+            "query": query,
+            "engine": engine,
+            "search_type": search_type,
+            "results": results,
+        }
+        self._cache_result(key, result)
+        return result
+
     async def _search_google(
         self, query: str, search_type: str, max_results: int
     ) -> list[dict[str, Any]]:
@@ -99,7 +230,7 @@ class WebSearchTool(llm.Tool):
         if not api_key or not cx:
             raise ValueError("Google API key and CX are required")
 
-        url = "https://www.googleapis.com/customsearch/v1"
+        url = GOOGLE_SEARCH_URL
         params = {
             "key": api_key,
             "cx": cx,
@@ -110,26 +241,26 @@ class WebSearchTool(llm.Tool):
         if search_type == "image":
             params["searchType"] = "image"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-
-                results = []
-                for item in data.get("items", []):
-                    result = {
-                        "title": item.get("title", ""),
-                        "url": item.get("link", ""),
-                        "snippet": item.get("snippet", ""),
-                    }
-                    if search_type == "image":
-                        result["image_url"] = item.get("link", "")
-                        result["thumbnail_url"] = item.get("image", {}).get(
-                            "thumbnailLink", ""
-                        )
-                    results.append(result)
-
-                return results
+        session = async_get_clientsession(self.hass)
+        async with session.get(url, params=params) as response:
+            response.raise_for_status()
+            data = await async_read_json(response, MAX_SEARCH_RESPONSE_BYTES)
+
+            results = []
+            for item in data.get("items", []):
+                result = {
+                    "title": item.get("title", ""),
+                    "url": item.get("link", ""),
+                    "snippet": item.get("snippet", ""),
+                }
+                if search_type == "image":
+                    result["image_url"] = item.get("link", "")
+                    result["thumbnail_url"] = item.get("image", {}).get(
+                        "thumbnailLink", ""
+                    )
+                results.append(result)
+
+            return results
 
     async def _search_kagi(
         self, query: str, search_type: str, max_results: int
@@ -140,28 +271,28 @@ class WebSearchTool(llm.Tool):
         if not api_key:
             raise ValueError("Kagi API key is required")
 
-        url = "https://kagi.com/api/v0/search"
+        url = KAGI_SEARCH_URL
         headers = {"Authorization": f"Bot {api_key}"}
         params = {"q": query, "limit": max_results}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-
-                results = []
-                for item in data.get("data", []):
-                    result = {
-                        "title": item.get("title", ""),
-                        "url": item.get("url", ""),
-                        "snippet": item.get("snippet", ""),
-                    }
-                    if search_type == "image" and "thumbnail" in item:
-                        result["image_url"] = item.get("url", "")
-                        result["thumbnail_url"] = item.get("thumbnail", "")
-                    results.append(result)
-
-                return results
+        session = async_get_clientsession(self.hass)
+        async with session.get(url, headers=headers, params=params) as response:
+            response.raise_for_status()
+            data = await async_read_json(response, MAX_SEARCH_RESPONSE_BYTES)
+
+            results = []
+            for item in data.get("data", []):
+                result = {
+                    "title": item.get("title", ""),
+                    "url": item.get("url", ""),
+                    "snippet": item.get("snippet", ""),
+                }
+                if search_type == "image" and "thumbnail" in item:
+                    result["image_url"] = item.get("url", "")
+                    result["thumbnail_url"] = item.get("thumbnail", "")
+                results.append(result)
+
+            return results
 
     async def _search_bing(
         self, query: str, search_type: str, max_results: int
@@ -172,39 +303,36 @@ class WebSearchTool(llm.Tool):
         if not api_key:
             raise ValueError("Bing API key is required")
 
-        if search_type == "image":
-            url = "https://api.bing.microsoft.com/v7.0/images/search"
-        else:
-            url = "https://api.bing.microsoft.com/v7.0/search"
+        url = BING_IMAGE_SEARCH_URL if search_type == "image" else BING_WEB_SEARCH_URL
 
         headers = {"Ocp-Apim-Subscription-Key": api_key}
         params = {"q": query, "count": max_results}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-
-                results = []
-                if search_type == "image":
-                    for item in data.get("value", []):
-                        results.append(
-                            {
-                                "title": item.get("name", ""),
-                                "url": item.get("contentUrl", ""),
-                                "image_url": item.get("contentUrl", ""),
-                                "thumbnail_url": item.get("thumbnailUrl", ""),
-                                "snippet": item.get("name", ""),
-                            }
-                        )
-                else:
-                    for item in data.get("webPages", {}).get("value", []):
-                        results.append(
-                            {
-                                "title": item.get("name", ""),
-                                "url": item.get("url", ""),
-                                "snippet": item.get("snippet", ""),
-                            }
-                        )
-
-                return results
+        session = async_get_clientsession(self.hass)
+        async with session.get(url, headers=headers, params=params) as response:
+            response.raise_for_status()
+            data = await async_read_json(response, MAX_SEARCH_RESPONSE_BYTES)
+
+            results = []
+            if search_type == "image":
+                for item in data.get("value", []):
+                    results.append(
+                        {
+                            "title": item.get("name", ""),
+                            "url": item.get("contentUrl", ""),
+                            "image_url": item.get("contentUrl", ""),
+                            "thumbnail_url": item.get("thumbnailUrl", ""),
+                            "snippet": item.get("name", ""),
+                        }
+                    )
+            else:
+                for item in data.get("webPages", {}).get("value", []):
+                    results.append(
+                        {
+                            "title": item.get("name", ""),
+                            "url": item.get("url", ""),
+                            "snippet": item.get("snippet", ""),
+                        }
+                    )
+
+            return results
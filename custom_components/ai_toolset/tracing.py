@@ -0,0 +1,454 @@
+"""Tracing of tool calls for AI Toolset.
+
+A trace records one tool call as a tree of spans: the call itself, and the
+phases it spent its time in, such as cache lookups, HTTP requests with their
+DNS resolution and connection setup, HTML parsing and service calls.
+Finished traces are kept in a ring buffer shown in diagnostics and can be
+appended to a file in the OpenTelemetry (OTLP) JSON format.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import secrets
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    MAX_SPANS_PER_TRACE,
+    TRACE_BUFFER_SIZE,
+    TRACE_EXPORT_MAX_BYTES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# OpenTelemetry span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+@dataclass(slots=True)
+class Span:
+    """A timed phase of a tool call."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        """Return the duration of the span, None while it is running."""
+        if self.end_ns is None:
+            return None
+        return round((self.end_ns - self.start_ns) / 1e6, 3)
+
+    def as_dict(self, trace_start_ns: int) -> dict[str, Any]:
+        """Return the span for diagnostics, timed from the start of the trace."""
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self.start_ns - trace_start_ns) / 1e6, 3),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def as_otlp(self) -> dict[str, Any]:
+        """Return the span in the OTLP JSON format."""
+        span: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": STATUS_CODE_ERROR, "message": self.error}
+                if self.error is not None
+                else {"code": STATUS_CODE_OK}
+            ),
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Return an attribute value in the OTLP JSON format."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64 bit integers are encoded as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Trace:
+    """The spans of one tool call."""
+
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        """Start a trace with its root span."""
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self.dropped_spans = 0
+        self.root = self.start_span(name, None, attributes)
+
+    def start_span(
+        self,
+        name: str,
+        parent: Span | None,
+        attributes: dict[str, Any],
+        kind: int = SPAN_KIND_INTERNAL,
+    ) -> Span:
+        """Start a span.
+
+        Spans beyond the limit of a trace are timed but not kept, so a call
+        making many requests cannot grow a trace without bound.
+        """
+        span = Span(
+            name=name,
+            trace_id=self.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent is not None else None,
+            start_ns=time.time_ns(),
+            kind=kind,
+            attributes=attributes,
+        )
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+        return span
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace for diagnostics."""
+        start_ns = self.root.start_ns
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start": dt_util.utc_from_timestamp(start_ns / 1e9).isoformat(),
+            "duration_ms": self.root.duration_ms,
+            "error": self.root.error,
+            "dropped_spans": self.dropped_spans,
+            "spans": [span.as_dict(start_ns) for span in self.spans],
+        }
+
+    def as_otlp(self) -> dict[str, Any]:
+        """Return the trace as an OTLP JSON export request."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": DOMAIN}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [span.as_otlp() for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+# The trace of the tool call being run and its innermost open span
+_current_span: ContextVar[tuple[Trace, Span] | None] = ContextVar(
+    "ai_toolset_current_span", default=None
+)
+
+
+def _end_span(span: Span, error: str | None = None, **attributes: Any) -> None:
+    """End a span."""
+    span.attributes.update(attributes)
+    if error is not None:
+        span.error = error
+    span.end_ns = time.time_ns()
+
+
+@contextmanager
+def _activate(trace: Trace, span: Span) -> Iterator[Span]:
+    """Make a span the parent of the spans started in a block, then end it."""
+    token = _current_span.set((trace, span))
+    try:
+        yield span
+    except BaseException as err:
+        span.error = f"{type(err).__name__}: {err}"
+        raise
+    finally:
+        _end_span(span)
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Record a span around a block.
+
+    Outside of a traced tool call nothing is recorded and None is yielded.
+    """
+    if (current := _current_span.get()) is None:
+        yield None
+        return
+    trace, parent = current
+    with _activate(trace, trace.start_span(name, parent, attributes)) as child:
+        yield child
+
+
+def start_span(
+    name: str,
+    parent: Span | None = None,
+    kind: int = SPAN_KIND_INTERNAL,
+    **attributes: Any,
+) -> Span | None:
+    """Start a span that is ended with end_span.
+
+    Used where a phase does not map to a block, such as between two aiohttp
+    trace signals. The span is not made current. Returns None outside of a
+    traced tool call.
+    """
+    if (current := _current_span.get()) is None:
+        return None
+    trace, current_span = current
+    return trace.start_span(name, parent or current_span, attributes, kind)
+
+
+def end_span(span: Span | None, error: str | None = None, **attributes: Any) -> None:
+    """End a span started with start_span."""
+    if span is not None:
+        _end_span(span, error, **attributes)
+
+
+def _write_lines(path: str, lines: list[str]) -> None:
+    """Append lines to the export file, rotating it when it grows too big."""
+    try:
+        if os.path.getsize(path) > TRACE_EXPORT_MAX_BYTES:
+            os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        pass
+    with open(path, "a", encoding="utf-8") as file:
+        file.writelines(f"{line}\n" for line in lines)
+
+
+class Tracer:
+    """Trace tool calls into a ring buffer, optionally exported to a file."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        export_path: str | None = None,
+        buffer_size: int = TRACE_BUFFER_SIZE,
+    ) -> None:
+        """Initialize the tracer."""
+        self.hass = hass
+        self.export_path = export_path
+        self.traces: deque[Trace] = deque(maxlen=buffer_size)
+        self._export_queue: list[str] = []
+        self._exporting = False
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Record a trace around a block, yielding its root span."""
+        trace = Trace(name, attributes)
+        try:
+            with _activate(trace, trace.root) as root:
+                yield root
+        finally:
+            self.traces.append(trace)
+            if self.export_path is not None:
+                self._async_export(trace)
+
+    @callback
+    def _async_export(self, trace: Trace) -> None:
+        """Queue a finished trace for export."""
+        self._export_queue.append(json_dumps(trace.as_otlp()))
+        if not self._exporting:
+            self._exporting = True
+            self.hass.async_create_background_task(
+                self._async_flush(), f"{DOMAIN} trace export"
+            )
+
+    async def _async_flush(self) -> None:
+        """Write queued traces to the export file, one write at a time."""
+        assert self.export_path is not None
+        try:
+            while self._export_queue:
+                lines, self._export_queue = self._export_queue, []
+                await self.hass.async_add_executor_job(
+                    _write_lines, self.export_path, lines
+                )
+        except OSError as err:
+            _LOGGER.warning("Error exporting traces to %s: %s", self.export_path, err)
+            self._export_queue.clear()
+        finally:
+            self._exporting = False
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the buffered traces, most recent first."""
+        return [trace.as_dict() for trace in reversed(self.traces)]
+
+
+def _url_attributes(url: Any) -> dict[str, Any]:
+    """Return the attributes of a request URL.
+
+    The query is left out as it may carry API keys.
+    """
+    return {
+        "url.full": str(url.with_query(None).with_fragment(None)),
+        "server.address": url.host or "",
+    }
+
+
+async def _on_request_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestStartParams,
+) -> None:
+    context.request_span = start_span(
+        "http.request",
+        kind=SPAN_KIND_CLIENT,
+        **{"http.request.method": params.method, **_url_attributes(params.url)},
+    )
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestEndParams,
+) -> None:
+    end_span(
+        context.request_span,
+        **{"http.response.status_code": params.response.status},
+    )
+
+
+async def _on_request_exception(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestExceptionParams,
+) -> None:
+    end_span(
+        context.request_span,
+        error=f"{type(params.exception).__name__}: {params.exception}",
+    )
+
+
+async def _on_dns_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceDnsResolveHostStartParams,
+) -> None:
+    context.dns_span = start_span(
+        "dns", context.request_span, **{"server.address": params.host}
+    )
+
+
+async def _on_dns_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceDnsResolveHostEndParams,
+) -> None:
+    end_span(context.dns_span)
+
+
+async def _on_dns_cache_hit(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceDnsCacheHitParams,
+) -> None:
+    if context.request_span is not None:
+        context.request_span.attributes["dns.cache_hit"] = True
+
+
+async def _on_connection_queued_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionQueuedStartParams,
+) -> None:
+    context.queued_span = start_span("connection.queued", context.request_span)
+
+
+async def _on_connection_queued_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionQueuedEndParams,
+) -> None:
+    end_span(context.queued_span)
+
+
+async def _on_connection_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionCreateStartParams,
+) -> None:
+    context.connect_span = start_span("connect", context.request_span)
+
+
+async def _on_connection_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionCreateEndParams,
+) -> None:
+    end_span(context.connect_span)
+
+
+async def _on_connection_reused(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionReuseconnParams,
+) -> None:
+    if context.request_span is not None:
+        context.request_span.attributes["connection.reused"] = True
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Return an aiohttp trace config recording the phases of requests.
+
+    Requests are recorded as client spans from start until the response
+    headers arrive, the time to first byte, with child spans for DNS
+    resolution, waiting for a free connection in the pool and opening the
+    connection. aiohttp has no separate
+    signal for the TLS handshake, so it is part of the connection span.
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_dns_cache_hit.append(_on_dns_cache_hit)
+    trace_config.on_connection_queued_start.append(_on_connection_queued_start)
+    trace_config.on_connection_queued_end.append(_on_connection_queued_end)
+    trace_config.on_connection_create_start.append(_on_connection_start)
+    trace_config.on_connection_create_end.append(_on_connection_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reused)
+    return trace_config
@@ -0,0 +1,140 @@
+"""Detection of tool calls that block the event loop.
+
+A heartbeat scheduled on the event loop records when the loop last ran a
+callback. A watchdog thread checks the heartbeat, and when the loop has not
+run for longer than the threshold it captures the stack of the loop thread.
+The block is blamed on the tool call the running task works for, which also
+covers tasks a tool call started, such as coalesced requests. Once the loop
+runs again, the block is logged and recorded with its full duration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    LOOP_BLOCK_HISTORY,
+    LOOP_BLOCK_STACK_LIMIT,
+    LOOP_BLOCK_THRESHOLD,
+    LOOP_WATCHDOG_INTERVAL,
+)
+from .instrumentation import MetricsRegistry, task_tool_name
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _PendingBlock:
+    """A block seen by the watchdog thread, reported when the loop runs again."""
+
+    tool_name: str
+    stack: str
+
+
+class LoopWatchdog:
+    """Detect and record tool calls that block the event loop."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        metrics: MetricsRegistry,
+        threshold: float = LOOP_BLOCK_THRESHOLD,
+        interval: float = LOOP_WATCHDOG_INTERVAL,
+    ) -> None:
+        """Initialize the watchdog."""
+        self.hass = hass
+        self.threshold = threshold
+        self.interval = interval
+        self.blocks: deque[dict[str, Any]] = deque(maxlen=LOOP_BLOCK_HISTORY)
+        self._metrics = metrics
+        self._last_beat = time.monotonic()
+        self._pending: _PendingBlock | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat: asyncio.TimerHandle | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start the heartbeat and the watchdog thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._async_beat()
+        self._thread = threading.Thread(
+            target=self._watch, name="ai_toolset loop watchdog", daemon=True
+        )
+        self._thread.start()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the heartbeat and the watchdog thread."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        self._stop.set()
+        if self._thread is not None:
+            # The thread wakes up as soon as the stop event is set
+            self._thread.join()
+            self._thread = None
+
+    @callback
+    def _async_beat(self) -> None:
+        """Record that the loop is running and report a block that ended."""
+        now = time.monotonic()
+        if (pending := self._pending) is not None:
+            self._pending = None
+            # The loop may have resumed while the stack was being captured
+            if (lag := now - self._last_beat - self.interval) >= self.threshold:
+                self._async_report(pending, lag)
+        self._last_beat = now
+        self._heartbeat = self.hass.loop.call_later(self.interval, self._async_beat)
+
+    @callback
+    def _async_report(self, block: _PendingBlock, duration: float) -> None:
+        """Log and record a block of the loop by a tool call."""
+        _LOGGER.warning(
+            "Tool %s blocked the event loop for %.0f ms at:\n%s",
+            block.tool_name,
+            duration * 1000,
+            block.stack,
+        )
+        self.blocks.append(
+            {
+                "tool": block.tool_name,
+                "duration_ms": round(duration * 1000, 1),
+                "time": dt_util.utcnow().isoformat(),
+                "stack": block.stack,
+            }
+        )
+        self._metrics.async_record_loop_block(block.tool_name, duration)
+
+    def _watch(self) -> None:
+        """Check the heartbeat until stopped, in the watchdog thread."""
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self._last_beat - self.interval
+            if lag < self.threshold or self._pending is not None:
+                continue
+            # The loop is blocked, so its current task cannot change meanwhile
+            task = asyncio.current_task(self.hass.loop)
+            if task is None or (tool_name := task_tool_name(task)) is None:
+                # Not blocked by a tool call
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            self._pending = _PendingBlock(
+                tool_name=tool_name,
+                stack="".join(traceback.format_stack(frame, LOOP_BLOCK_STACK_LIMIT)),
+            )
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the recorded blocks, most recent first."""
+        return list(reversed(self.blocks))
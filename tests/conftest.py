@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator, Callable
+from unittest.mock import AsyncMock, Mock
+
 import pytest
 from homeassistant.helpers import llm
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -48,3 +51,25 @@ def llm_context():
         assistant="test_assistant",
         device_id=None,
     )
+
+
+@pytest.fixture
+def mock_http_response() -> Callable[..., AsyncMock]:
+    """Return a factory of mock aiohttp responses streaming a body."""
+
+    def _mock_response(body: bytes | str, content_type: str) -> AsyncMock:
+        if isinstance(body, str):
+            body = body.encode()
+
+        async def _iter_chunked(size: int) -> AsyncIterator[bytes]:
+            for start in range(0, len(body), size):
+                yield body[start : start + size]
+
+        response = AsyncMock()
+        response.headers = {"Content-Type": content_type}
+        response.content.iter_chunked = _iter_chunked
+        response.content.total_raw_bytes = response.content.total_bytes = len(body)
+        response.raise_for_status = Mock()
+        return response
+
+    return _mock_response
@@ -1,16 +1,22 @@
 """Test the AI Toolset config flow."""
 
+import pytest
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.core import HomeAssistant
 
 from custom_components.ai_toolset.const import (
     CONF_BING_API_KEY,
+    CONF_COMMUTE_ROUTES,
     CONF_DEFAULT_SEARCH_ENGINE,
     CONF_ENABLE_CODE_EXECUTOR,
+    CONF_ENABLED_TOOLS,
     CONF_GOOGLE_API_KEY,
     CONF_GOOGLE_CX,
     CONF_KAGI_API_KEY,
     CONF_MAX_RESULTS,
+    CONF_TOOL_PROFILES,
+    CONF_WAZE_REGION,
+    CONF_WAZE_UNITS,
     DEFAULT_ENABLE_CODE_EXECUTOR,
     DEFAULT_MAX_RESULTS,
     DOMAIN,
@@ -234,3 +240,64 @@ async def test_kagi_with_defaults(hass: HomeAssistant) -> None:
     assert result3["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
     assert result3["data"][CONF_MAX_RESULTS] == DEFAULT_MAX_RESULTS
     assert result3["data"][CONF_ENABLE_CODE_EXECUTOR] == DEFAULT_ENABLE_CODE_EXECUTOR
+
+
+async def test_options_flow(hass: HomeAssistant, mock_config_entry) -> None:
+    """Test configuring the Waze options."""
+    mock_config_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_config_entry.entry_id)
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_WAZE_REGION: "eu",
+            CONF_WAZE_UNITS: "metric",
+            CONF_COMMUTE_ROUTES: ["zone.home -> Office"],
+            CONF_ENABLED_TOOLS: ["web_search", "get_travel_time"],
+        },
+    )
+    assert result2["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert mock_config_entry.options[CONF_WAZE_REGION] == "eu"
+    assert mock_config_entry.options[CONF_ENABLED_TOOLS] == [
+        "web_search",
+        "get_travel_time",
+    ]
+    assert mock_config_entry.options[CONF_COMMUTE_ROUTES] == ["zone.home -> Office"]
+
+
+async def test_options_flow_invalid_commute_route(
+    hass: HomeAssistant, mock_config_entry
+) -> None:
+    """Test that malformed commute routes are rejected."""
+    mock_config_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_config_entry.entry_id)
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_COMMUTE_ROUTES: ["just an address"]}
+    )
+    assert result2["type"] == data_entry_flow.FlowResultType.FORM
+    assert result2["errors"] == {CONF_COMMUTE_ROUTES: "invalid_commute_route"}
+
+
+async def test_options_flow_tool_profiles(
+    hass: HomeAssistant, mock_config_entry
+) -> None:
+    """Test configuring tool profiles and rejecting unknown tools."""
+    mock_config_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_config_entry.entry_id)
+    with pytest.raises(data_entry_flow.InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {CONF_TOOL_PROFILES: [{"name": "Satellite", "tools": ["music_dance"]}]},
+        )
+
+    profiles = [{"name": "Satellite", "tools": ["music_find", "music_play"]}]
+    result3 = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_TOOL_PROFILES: profiles}
+    )
+    assert result3["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert mock_config_entry.options[CONF_TOOL_PROFILES] == profiles
@@ -0,0 +1,69 @@
+"""Test the AI Toolset diagnostics."""
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import llm
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ai_toolset.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+
+async def test_diagnostics(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, llm_context
+):
+    """Test diagnostics redact API keys and include tool metrics."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    api = mock_config_entry.runtime_data.api
+    tool = next(
+        tool for tool in await api.async_get_tools() if tool.name == "music_find"
+    )
+    await tool.async_call(
+        hass,
+        llm.ToolInput(tool_name="music_find", tool_args={"query": "jazz"}),
+        llm_context,
+    )
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_config_entry)
+
+    assert diagnostics["config"]["google_api_key"] == "**REDACTED**"
+    assert diagnostics["tools_loaded"] is True
+    metrics = diagnostics["tool_metrics"]["music_find"]
+    assert metrics["calls"] == 1
+    assert metrics["latency_p50_ms"] is not None
+    assert metrics["response_tokens"] == metrics["response_bytes"] // 4
+    assert diagnostics["tracing"] is False
+    assert diagnostics["traces"] == []
+
+
+async def test_diagnostics_traces(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, llm_context
+):
+    """Test diagnostics include recent traces when tracing is enabled."""
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(mock_config_entry, options={"tracing": True})
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    api = mock_config_entry.runtime_data.api
+    tool = next(
+        tool for tool in await api.async_get_tools() if tool.name == "music_find"
+    )
+    await tool.async_call(
+        hass,
+        llm.ToolInput(tool_name="music_find", tool_args={"query": "jazz"}),
+        llm_context,
+    )
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_config_entry)
+
+    assert diagnostics["tracing"] is True
+    (trace,) = diagnostics["traces"]
+    assert trace["name"] == "tool music_find"
+    assert trace["spans"][0]["attributes"] == {
+        "tool.name": "music_find",
+        "llm.platform": "test_platform",
+    }
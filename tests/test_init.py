@@ -7,7 +7,11 @@ from homeassistant.helpers import llm
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.ai_toolset import AIToolsetAPI, async_setup, async_setup_entry
-from custom_components.ai_toolset.const import DOMAIN
+from custom_components.ai_toolset.const import (
+    CONF_ENABLED_TOOLS,
+    CONF_TOOL_PROFILES,
+    DOMAIN,
+)
 
 
 async def test_async_setup(hass: HomeAssistant):
@@ -23,7 +27,10 @@ async def test_async_setup_entry(
     mock_config_entry.add_to_hass(hass)
     hass.data[DOMAIN] = {}
 
-    with patch("custom_components.ai_toolset.llm.async_register_api"):
+    with (
+        patch("custom_components.ai_toolset.llm.async_register_api"),
+        patch.object(hass.config_entries, "async_forward_entry_setups"),
+    ):
         assert await async_setup_entry(hass, mock_config_entry)
         assert mock_config_entry.entry_id in hass.data[DOMAIN]
 
@@ -66,5 +73,117 @@ async def test_async_get_api_instance(
     assert api_instance.api.name == "AI Toolset"
     assert api_instance.llm_context == llm_context
     assert (
-        len(api_instance.tools) == 11
-    )  # web_search, url_fetch, create_automation, code_executor, calendar_get_events, calendar_add_event, calendar_update_event, music_find, music_play, get_travel_time, get_travel_distance
+        len(api_instance.tools) == 13
+    )  # web_search, url_fetch, create_automation, code_executor, calendar_get_events, calendar_add_event, calendar_update_event, music_find, music_play, get_travel_time, get_travel_distance, get_travel_info, search_and_read
+
+
+async def test_api_loads_only_enabled_tools(hass: HomeAssistant):
+    """Test tools are created on first use and can be disabled."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={CONF_ENABLED_TOOLS: ["music_find", "get_travel_time"]},
+    )
+    api = AIToolsetAPI(hass, entry)
+
+    assert api.tools is None
+    assert api.route_cache is None
+
+    tools = await api.async_get_tools()
+
+    assert [tool.name for tool in tools] == ["music_find", "get_travel_time"]
+    assert api.route_cache is not None
+    assert api.automation_index is None
+    assert await api.async_get_tools() is tools
+
+
+async def test_search_and_read_shares_tools(hass: HomeAssistant):
+    """Test search and read uses the API's web search and URL fetch tools."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={CONF_ENABLED_TOOLS: ["web_search", "search_and_read"]},
+    )
+    api = AIToolsetAPI(hass, entry)
+
+    web_search, search_and_read = await api.async_get_tools()
+
+    assert search_and_read.name == "search_and_read"
+    assert search_and_read.tool.web_search is web_search.tool
+    # URL fetch is created for search and read without being offered
+    assert search_and_read.tool.url_fetch.name == "url_fetch"
+
+
+async def test_api_instance_uses_matching_tool_profile(hass: HomeAssistant):
+    """Test a tool profile trims the tools and prompt for matching contexts."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_TOOL_PROFILES: [
+                {
+                    "name": "Kitchen satellite",
+                    "device_id": ["kitchen_satellite"],
+                    "tools": ["music_find", "music_play"],
+                },
+                {
+                    "name": "Chat",
+                    "platform": "openai_conversation",
+                    "tools": ["web_search", "url_fetch", "get_travel_time"],
+                },
+            ]
+        },
+    )
+    api = AIToolsetAPI(hass, entry)
+
+    def _context(platform: str, device_id: str | None = None) -> llm.LLMContext:
+        return llm.LLMContext(
+            platform=platform,
+            context=None,
+            language="en",
+            assistant="conversation",
+            device_id=device_id,
+        )
+
+    satellite = await api.async_get_api_instance(
+        _context("openai_conversation", "kitchen_satellite")
+    )
+    assert [tool.name for tool in satellite.tools] == ["music_find", "music_play"]
+    assert satellite.api_prompt == (
+        "You have access to AI Toolset tools for music playback."
+    )
+
+    chat = await api.async_get_api_instance(_context("openai_conversation"))
+    assert [tool.name for tool in chat.tools] == [
+        "web_search",
+        "url_fetch",
+        "get_travel_time",
+    ]
+    assert chat.api_prompt == (
+        "You have access to AI Toolset tools for web search, URL fetching, "
+        "and Waze travel time/distance."
+    )
+
+    other = await api.async_get_api_instance(_context("ollama"))
+    assert len(other.tools) == 13
+
+
+async def test_api_instance_reuses_tools(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+):
+    """Test tools and prompts are built once per profile."""
+    api = AIToolsetAPI(hass, mock_config_entry)
+    llm_context = llm.LLMContext(
+        platform="test_platform",
+        context=None,
+        language="en",
+        assistant=None,
+        device_id=None,
+    )
+
+    first = await api.async_get_api_instance(llm_context)
+    second = await api.async_get_api_instance(llm_context)
+
+    assert second is not first
+    assert second.tools is first.tools
+    assert second.api_prompt == first.api_prompt
@@ -0,0 +1,56 @@
+"""Test the search engine quotas and rate limits."""
+
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+
+from custom_components.ai_toolset.const import SEARCH_QUOTA_STORAGE_KEY
+from custom_components.ai_toolset.quota import SearchQuota, TokenBucket
+
+
+def test_token_bucket() -> None:
+    """Test the bucket allows a burst and then refills at its rate."""
+    with patch("custom_components.ai_toolset.quota.time.monotonic") as monotonic:
+        monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=2.0, capacity=3)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        assert bucket.delay() == 0.5
+
+        # A reserved token is taken ahead of time
+        assert bucket.reserve() == 0.5
+        assert bucket.delay() == 1.0
+
+        monotonic.return_value = 101.0
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+
+async def test_search_quota_persisted(
+    hass: HomeAssistant, hass_storage, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test the counts survive a restart and start over the next day."""
+    freezer.move_to("2026-01-10 12:00:00")
+    hass_storage[SEARCH_QUOTA_STORAGE_KEY] = {
+        "version": 1,
+        "data": {"day": "2026-01-10", "used": {"google": 97}},
+    }
+    quota = SearchQuota(hass)
+    await quota.async_load()
+    updates = []
+    quota.async_add_listener(lambda: updates.append(True))
+
+    quota.async_record("google")
+    assert quota.used("google") == 98
+    assert quota.remaining("google", 100) == 2
+    assert quota.remaining("kagi", 0) is None
+    assert updates == [True]
+
+    await quota._store._async_handle_write_data()
+    assert hass_storage[SEARCH_QUOTA_STORAGE_KEY]["data"] == {
+        "day": "2026-01-10",
+        "used": {"google": 98},
+    }
+
+    freezer.move_to("2026-01-11 08:00:00")
+    assert quota.remaining("google", 100) == 100
@@ -0,0 +1,161 @@
+"""Test the AI Toolset tool call scheduler."""
+
+import asyncio
+
+import pytest
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import llm
+from voluptuous import Schema
+
+from custom_components.ai_toolset.instrumentation import (
+    InstrumentedTool,
+    MetricsRegistry,
+)
+from custom_components.ai_toolset.scheduler import ToolScheduler, ToolSchedulerFull
+
+
+async def _hold(
+    scheduler: ToolScheduler,
+    tool_name: str,
+    conversation: str,
+    started: list[str],
+    release: asyncio.Event,
+) -> None:
+    """Hold a slot until released, recording the start."""
+    async with scheduler.async_slot(tool_name, conversation):
+        started.append(f"{conversation}:{tool_name}")
+        await release.wait()
+
+
+async def test_tool_limits(hass: HomeAssistant) -> None:
+    """Test calls beyond a tool's limit wait without blocking other tools."""
+    scheduler = ToolScheduler(max_concurrent=3, tool_limits={"code_executor": 1})
+    started: list[str] = []
+    release = asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(_hold(scheduler, name, "a", started, release))
+        for name in ("code_executor", "code_executor", "web_search")
+    ]
+    await asyncio.sleep(0)
+    assert started == ["a:code_executor", "a:web_search"]
+    assert scheduler.as_dict()["queued"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["a:code_executor", "a:web_search", "a:code_executor"]
+    assert scheduler.as_dict()["running"] == {}
+
+
+async def test_conversations_take_turns(hass: HomeAssistant) -> None:
+    """Test free slots are shared between waiting conversations."""
+    scheduler = ToolScheduler(max_concurrent=1)
+    started: list[str] = []
+    releases = [asyncio.Event() for _ in range(5)]
+
+    calls = [("a", 0), ("a", 1), ("a", 2), ("a", 3), ("b", 4)]
+    tasks = []
+    for conversation, index in calls:
+        tasks.append(
+            asyncio.create_task(
+                _hold(scheduler, "url_fetch", conversation, started, releases[index])
+            )
+        )
+        await asyncio.sleep(0)
+
+    for release in releases:
+        release.set()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert started == [
+        "a:url_fetch",
+        "a:url_fetch",
+        "b:url_fetch",
+        "a:url_fetch",
+        "a:url_fetch",
+    ]
+
+
+async def test_queue_full_and_timeout(hass: HomeAssistant) -> None:
+    """Test calls are rejected with a retry hint when the queue is full."""
+    scheduler = ToolScheduler(max_concurrent=1, max_queued=1, max_wait=0.05)
+    started: list[str] = []
+    release = asyncio.Event()
+
+    running = asyncio.create_task(_hold(scheduler, "web_search", "a", started, release))
+    queued = asyncio.create_task(_hold(scheduler, "web_search", "a", started, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ToolSchedulerFull) as err:
+        async with scheduler.async_slot("web_search", "b"):
+            pass
+    assert err.value.retry_after >= 1
+
+    # The queued call gives up waiting
+    with pytest.raises(ToolSchedulerFull):
+        await queued
+    assert scheduler.as_dict()["queued"] == 0
+    assert scheduler.rejected == 2
+
+    release.set()
+    await running
+
+
+async def test_cancelled_call_leaves_queue(hass: HomeAssistant) -> None:
+    """Test a cancelled waiting call does not take a slot."""
+    scheduler = ToolScheduler(max_concurrent=1)
+    started: list[str] = []
+    release = asyncio.Event()
+
+    running = asyncio.create_task(_hold(scheduler, "web_search", "a", started, release))
+    waiting = asyncio.create_task(_hold(scheduler, "web_search", "b", started, release))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    release.set()
+    await running
+    assert started == ["a:web_search"]
+    assert scheduler.as_dict() == {
+        "max_concurrent": 1,
+        "running": {},
+        "queued": 0,
+        "conversations_waiting": 0,
+        "rejected": 0,
+        "average_call_duration_s": pytest.approx(0.8, abs=0.1),
+    }
+
+
+class SlowTool(llm.Tool):
+    """Tool that waits before answering."""
+
+    name = "web_search"
+    description = "Waits."
+    parameters = Schema({})
+
+    async def async_call(self, hass, tool_input, llm_context):
+        """Wait for a while."""
+        await asyncio.sleep(0.05)
+        return {"success": True}
+
+
+async def test_instrumented_tool_rejection(hass: HomeAssistant, llm_context) -> None:
+    """Test a rejected call returns a retry hint to the LLM."""
+    scheduler = ToolScheduler(max_concurrent=1, max_queued=0)
+    metrics = MetricsRegistry()
+    tool = InstrumentedTool(SlowTool(), metrics, scheduler=scheduler)
+    llm_context.context = Context()
+    tool_input = llm.ToolInput(tool_name=tool.name, tool_args={})
+
+    first, second = await asyncio.gather(
+        tool.async_call(hass, tool_input, llm_context),
+        tool.async_call(hass, tool_input, llm_context),
+    )
+
+    assert first == {"success": True}
+    assert second["success"] is False
+    assert second["error"] == "Too many tool calls in progress"
+    assert second["retry_after"] >= 1
+    assert metrics.get("web_search").as_dict()["errors"] == 1
@@ -0,0 +1,161 @@
+"""Test the AI Toolset sensors."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import llm
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ai_toolset.const import (
+    CONF_COMMUTE_ROUTES,
+    CONF_WAZE_UNITS,
+    DOMAIN,
+)
+from custom_components.ai_toolset.tools.waze_travel_time import WazeLocationResolver
+
+
+@pytest.fixture
+def waze_calls(hass: HomeAssistant):
+    """Register a fake Waze service and return the list of calls it receives."""
+    calls: list[ServiceCall] = []
+
+    async def _get_travel_time(call: ServiceCall):
+        calls.append(call)
+        return {"duration": 18.0, "distance": 9.5}
+
+    hass.services.async_register(
+        "waze_travel_time",
+        "get_travel_time",
+        _get_travel_time,
+        supports_response=SupportsResponse.ONLY,
+    )
+    with patch.object(
+        WazeLocationResolver, "_async_geocode", AsyncMock(return_value=None)
+    ):
+        yield calls
+
+
+async def test_commute_sensor(
+    hass: HomeAssistant, waze_calls, llm_context: llm.LLMContext
+):
+    """Test that commute routes are precomputed and served from the cache."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"default_search_engine": "google"},
+        options={
+            CONF_COMMUTE_ROUTES: ["Home -> Work"],
+            CONF_WAZE_UNITS: "metric",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.commute_home_to_work")
+    assert state is not None
+    assert state.state == "18.0"
+    assert state.attributes["distance"] == 9.5
+    assert state.attributes["units"] == "metric"
+    assert waze_calls[0].data["units"] == "metric"
+
+    # The travel tools answer from the warm cache
+    tool = next(
+        tool
+        for tool in await entry.runtime_data.api.async_get_tools()
+        if tool.name == "get_travel_distance"
+    )
+    result = await tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="get_travel_distance",
+            tool_args={"origin": "home", "destination": "work"},
+        ),
+        llm_context,
+    )
+    assert result["distance_km"] == 9.5
+    assert len(waze_calls) == 1
+
+    # The call shows up in the tool's metrics sensor
+    state = hass.states.get("sensor.get_travel_distance_latency")
+    assert state is not None
+    assert float(state.state) >= 0
+    assert state.attributes["calls"] == 1
+    assert state.attributes["errors"] == 0
+    assert state.attributes["cache_hit_rate"] == 1.0
+    assert state.attributes["response_bytes"] > 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_commute_sensor_unique_ids(hass: HomeAssistant, waze_calls):
+    """Test that routes which slugify alike get their own sensors."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"default_search_engine": "google"},
+        options={CONF_COMMUTE_ROUTES: ["Home -> Work", "home -> work!"]},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    entries = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+    unique_ids = {
+        registry_entry.unique_id
+        for registry_entry in entries
+        if "_commute_" in registry_entry.unique_id
+    }
+    assert len(unique_ids) == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_no_commute_sensors(hass: HomeAssistant, mock_config_entry):
+    """Test that no commute sensors are created without commute routes."""
+    mock_config_entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert not [
+        entity_id
+        for entity_id in hass.states.async_entity_ids("sensor")
+        if entity_id.startswith("sensor.commute_")
+    ]
+    assert hass.states.get("sensor.web_search_latency").state == "unknown"
+    assert mock_config_entry.runtime_data.commute_coordinator is None
+
+
+async def test_search_quota_sensor(
+    hass: HomeAssistant, mock_config_entry, llm_context: llm.LLMContext
+):
+    """Test the remaining search quota is updated after each search."""
+    mock_config_entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.google_search_quota")
+    assert state.state == "100"
+    assert state.attributes["used_today"] == 0
+    assert state.attributes["daily_quota"] == 100
+    assert hass.states.get("sensor.bing_search_quota") is None
+
+    tool = next(
+        tool
+        for tool in await mock_config_entry.runtime_data.api.async_get_tools()
+        if tool.name == "web_search"
+    )
+    with patch.object(tool.tool, "_search_google", AsyncMock(return_value=[])):
+        await tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="web_search", tool_args={"query": "test"}),
+            llm_context,
+        )
+
+    state = hass.states.get("sensor.google_search_quota")
+    assert state.state == "99"
+    assert state.attributes["used_today"] == 1
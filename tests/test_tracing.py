@@ -0,0 +1,85 @@
+"""Test the AI Toolset tool call tracing."""
+
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.core import HomeAssistant
+
+from custom_components.ai_toolset.tracing import (
+    Tracer,
+    create_trace_config,
+    span,
+)
+
+
+async def test_spans(hass: HomeAssistant, tmp_path) -> None:
+    """Test spans nest within a trace and are exported in the OTLP format."""
+    with span("outside") as outside:
+        assert outside is None
+
+    export_path = tmp_path / "traces.jsonl"
+    tracer = Tracer(hass, export_path=str(export_path))
+    with pytest.raises(ValueError), tracer.trace("tool test", **{"tool.name": "test"}):
+        with span("cache_lookup", **{"cache.hit": False}):
+            pass
+        with span("service_call"):
+            raise ValueError("boom")
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    (trace,) = tracer.as_dict()
+    root, lookup, service = trace["spans"]
+    assert trace["name"] == "tool test"
+    assert trace["error"] == "ValueError: boom"
+    assert lookup["parent_id"] == service["parent_id"] == root["span_id"]
+    assert lookup["attributes"] == {"cache.hit": False}
+    assert lookup["error"] is None
+    assert service["error"] == "ValueError: boom"
+
+    (line,) = export_path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [exported["name"] for exported in spans] == [
+        "tool test",
+        "cache_lookup",
+        "service_call",
+    ]
+    assert "parentSpanId" not in spans[0]
+    assert spans[1]["attributes"] == [
+        {"key": "cache.hit", "value": {"boolValue": False}}
+    ]
+    assert spans[2]["status"] == {"code": 2, "message": "ValueError: boom"}
+
+
+async def test_trace_config(hass: HomeAssistant, socket_enabled) -> None:
+    """Test HTTP requests are recorded with their connection phase."""
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/search", handler)
+    tracer = Tracer(hass)
+
+    async with (
+        TestServer(app) as server,
+        aiohttp.ClientSession(trace_configs=[create_trace_config()]) as session,
+    ):
+        url = server.make_url("/search")
+        with tracer.trace("tool web_search"):
+            for _ in range(2):
+                async with session.get(url.with_query(key="secret")) as response:
+                    await response.text()
+
+    (trace,) = tracer.as_dict()
+    requests = [item for item in trace["spans"] if item["name"] == "http.request"]
+    assert len(requests) == 2
+    first, second = requests
+    assert first["attributes"]["http.response.status_code"] == 200
+    assert first["attributes"]["url.full"] == str(url)
+    (connect,) = [item for item in trace["spans"] if item["name"] == "connect"]
+    assert connect["parent_id"] == first["span_id"]
+    assert connect["duration_ms"] is not None
+    assert second["attributes"]["connection.reused"] is True
@@ -0,0 +1,97 @@
+"""Test the AI Toolset event loop watchdog."""
+
+import asyncio
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import llm
+from voluptuous import Schema
+
+from custom_components.ai_toolset.coalesce import RequestCoalescer
+from custom_components.ai_toolset.instrumentation import (
+    InstrumentedTool,
+    MetricsRegistry,
+)
+from custom_components.ai_toolset.watchdog import LoopWatchdog
+
+
+class BlockingTool(llm.Tool):
+    """Tool that does synchronous work on the event loop."""
+
+    name = "blocking_tool"
+    description = "Blocks the event loop."
+    parameters = Schema({})
+
+    async def async_call(self, hass, tool_input, llm_context):
+        """Block the event loop."""
+        time.sleep(0.3)
+        return {"success": True}
+
+
+class CoalescedBlockingTool(llm.Tool):
+    """Tool whose shared request blocks the event loop after an await."""
+
+    name = "coalesced_blocking_tool"
+    description = "Blocks the event loop in a coalesced request."
+    parameters = Schema({})
+
+    def __init__(self) -> None:
+        """Initialize the tool."""
+        self.requests: RequestCoalescer[dict] = RequestCoalescer(self.name)
+
+    async def async_call(self, hass, tool_input, llm_context):
+        """Block the event loop in the task of a coalesced request."""
+
+        async def _request() -> dict:
+            await asyncio.sleep(0.01)
+            time.sleep(0.3)
+            return {"success": True}
+
+        return await self.requests.async_request(hass, "key", _request)
+
+
+async def test_watchdog_reports_blocking_tool(hass: HomeAssistant, llm_context):
+    """Test a tool call blocking the loop is recorded with its stack."""
+    metrics = MetricsRegistry()
+    watchdog = LoopWatchdog(hass, metrics, threshold=0.1, interval=0.02)
+    watchdog.async_start()
+    try:
+        tool = InstrumentedTool(BlockingTool(), metrics)
+        await tool.async_call(
+            hass, llm.ToolInput(tool_name=tool.name, tool_args={}), llm_context
+        )
+        # Let the heartbeat notice the loop is running again
+        await asyncio.sleep(0.1)
+
+        # Work outside of tool calls is not reported
+        time.sleep(0.3)
+        await asyncio.sleep(0.1)
+    finally:
+        watchdog.async_stop()
+
+    (block,) = watchdog.as_dict()
+    assert block["tool"] == "blocking_tool"
+    assert block["duration_ms"] >= 200
+    assert "time.sleep(0.3)" in block["stack"]
+    tool_metrics = metrics.get("blocking_tool").as_dict()
+    assert tool_metrics["loop_blocks"] == 1
+    assert tool_metrics["max_loop_block_ms"] == block["duration_ms"]
+
+
+async def test_watchdog_reports_block_in_tool_task(hass: HomeAssistant, llm_context):
+    """Test a block in a task started by a tool call is blamed on the tool."""
+    metrics = MetricsRegistry()
+    watchdog = LoopWatchdog(hass, metrics, threshold=0.1, interval=0.02)
+    watchdog.async_start()
+    try:
+        tool = InstrumentedTool(CoalescedBlockingTool(), metrics)
+        await tool.async_call(
+            hass, llm.ToolInput(tool_name=tool.name, tool_args={}), llm_context
+        )
+        await asyncio.sleep(0.1)
+    finally:
+        watchdog.async_stop()
+
+    (block,) = watchdog.as_dict()
+    assert block["tool"] == "coalesced_blocking_tool"
+    assert "time.sleep(0.3)" in block["stack"]
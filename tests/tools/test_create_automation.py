@@ -1,9 +1,23 @@
 """Test create automation tool."""
 
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
 import pytest
-from homeassistant.core import HomeAssistant
+from homeassistant.components.automation import (
+    DATA_COMPONENT as AUTOMATION_DATA_COMPONENT,
+)
+from homeassistant.components.automation import EVENT_AUTOMATION_RELOADED
+from homeassistant.config import AUTOMATION_CONFIG_PATH
+from homeassistant.core import HomeAssistant, ServiceCall, State
+from homeassistant.helpers import condition as condition_helper
 from homeassistant.helpers import llm
+from homeassistant.util import dt as dt_util
+from homeassistant.util.yaml import load_yaml
 
+from custom_components.ai_toolset.tools.automation_index import AutomationIndex
 from custom_components.ai_toolset.tools.create_automation import CreateAutomationTool
 
 
@@ -13,6 +27,20 @@ def create_automation_tool(hass: HomeAssistant):
     return CreateAutomationTool()
 
 
+@pytest.fixture
+def automation_reloads(hass: HomeAssistant, tmp_path):
+    """Use a temporary config dir and record automation reloads."""
+    hass.config.config_dir = str(tmp_path)
+    hass.config.components.add("automation")
+    calls: list[ServiceCall] = []
+
+    async def _reload(call: ServiceCall) -> None:
+        calls.append(call)
+
+    hass.services.async_register("automation", "reload", _reload)
+    return calls
+
+
 async def test_create_simple_automation(
     hass: HomeAssistant, create_automation_tool: CreateAutomationTool, llm_context
 ):
@@ -69,3 +97,451 @@ async def test_create_automation_with_conditions(
 
     assert isinstance(result, dict)
     assert "automation_id" in result or "error" in result or "success" in result
+
+
+async def test_create_automation_persists_and_reloads_one(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test that the automation is saved and only it is reloaded."""
+    tool_input = llm.ToolInput(
+        tool_name="create_automation",
+        tool_args={
+            "automation_id": "porch_light",
+            "alias": "Porch light at sunset",
+            "trigger": [{"platform": "sun", "event": "sunset"}],
+            "action": [
+                {"service": "light.turn_on", "target": {"entity_id": "light.porch"}}
+            ],
+        },
+    )
+
+    result = await create_automation_tool.async_call(hass, tool_input, llm_context)
+
+    assert result["success"] is True
+    automations = load_yaml(hass.config.path("automations.yaml"))
+    assert [automation["id"] for automation in automations] == ["porch_light"]
+    assert automations[0]["alias"] == "Porch light at sunset"
+    assert len(automation_reloads) == 1
+    assert automation_reloads[0].data == {"id": "porch_light"}
+
+
+async def test_create_automation_existing_id(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test that existing automations are not overwritten."""
+    with open(hass.config.path("automations.yaml"), "w", encoding="utf-8") as file:
+        file.write(
+            "- id: porch_light\n"
+            "  alias: Existing\n"
+            "  trigger: []\n"
+            "  action: []\n"
+        )
+
+    tool_input = llm.ToolInput(
+        tool_name="create_automation",
+        tool_args={
+            "automation_id": "porch_light",
+            "alias": "Porch light at sunset",
+            "trigger": [{"platform": "sun", "event": "sunset"}],
+            "action": [
+                {"service": "light.turn_on", "target": {"entity_id": "light.porch"}}
+            ],
+        },
+    )
+
+    result = await create_automation_tool.async_call(hass, tool_input, llm_context)
+
+    assert result["success"] is False
+    assert "already exists" in result["error"]
+    automations = load_yaml(hass.config.path("automations.yaml"))
+    assert automations[0]["alias"] == "Existing"
+    assert automation_reloads == []
+
+
+async def test_create_automations_batch(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test creating several automations with one write, reloading only them."""
+    tool_input = llm.ToolInput(
+        tool_name="create_automation",
+        tool_args={
+            "automations": [
+                {
+                    "automation_id": "morning_lights",
+                    "alias": "Morning lights",
+                    "trigger": [{"platform": "time", "at": "07:00:00"}],
+                    "action": [
+                        {
+                            "service": "light.turn_on",
+                            "target": {"entity_id": "light.kitchen"},
+                        }
+                    ],
+                },
+                {
+                    "automation_id": "broken",
+                    "alias": "Broken",
+                    "trigger": [{"platform": "not_a_trigger_platform"}],
+                    "action": [],
+                },
+                {
+                    "automation_id": "missing_fields",
+                    "alias": "Missing fields",
+                },
+                {
+                    "automation_id": "evening_lights",
+                    "alias": "Evening lights",
+                    "trigger": [{"platform": "sun", "event": "sunset"}],
+                    "action": [
+                        {
+                            "service": "light.turn_on",
+                            "target": {"entity_id": "light.porch"},
+                        }
+                    ],
+                },
+            ]
+        },
+    )
+
+    result = await create_automation_tool.async_call(hass, tool_input, llm_context)
+
+    assert result["success"] is True
+    assert [item["automation_id"] for item in result["created"]] == [
+        "morning_lights",
+        "evening_lights",
+    ]
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    automations = load_yaml(hass.config.path("automations.yaml"))
+    assert [automation["id"] for automation in automations] == [
+        "morning_lights",
+        "evening_lights",
+    ]
+    assert sorted(call.data["id"] for call in automation_reloads) == [
+        "evening_lights",
+        "morning_lights",
+    ]
+
+
+async def test_create_automations_batch_duplicate_ids(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test that repeated IDs within a batch are only created once."""
+    automation = {
+        "automation_id": "porch_light",
+        "alias": "Porch light",
+        "trigger": [{"platform": "sun", "event": "sunset"}],
+        "action": [
+            {"service": "light.turn_on", "target": {"entity_id": "light.porch"}}
+        ],
+    }
+    tool_input = llm.ToolInput(
+        tool_name="create_automation",
+        tool_args={"automations": [automation, automation]},
+    )
+
+    result = await create_automation_tool.async_call(hass, tool_input, llm_context)
+
+    assert [item["automation_id"] for item in result["created"]] == ["porch_light"]
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert automation_reloads[0].data == {"id": "porch_light"}
+
+
+async def test_dry_run_evaluates_current_states(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test a dry run evaluates the automation without creating it."""
+    hass.states.async_set("binary_sensor.motion", "on")
+    hass.states.async_set("sensor.lux", "12")
+    tool_input = llm.ToolInput(
+        tool_name="create_automation",
+        tool_args={
+            "automation_id": "dark_motion",
+            "alias": "Dark Motion",
+            "trigger": [
+                {"platform": "state", "entity_id": "binary_sensor.motion", "to": "on"},
+                {"platform": "time", "at": "07:00:00"},
+            ],
+            "condition": [
+                {"condition": "numeric_state", "entity_id": "sensor.lux", "below": 10},
+                "{{ is_state('binary_sensor.motion', 'on') }}",
+            ],
+            "action": [
+                {"service": "light.turn_on", "target": {"entity_id": "light.hallway"}}
+            ],
+            "dry_run": True,
+        },
+    )
+
+    result = await create_automation_tool.async_call(hass, tool_input, llm_context)
+
+    assert result["success"] is True
+    assert result["dry_run"] is True
+    assert [trigger["matches_now"] for trigger in result["triggers"]] == [True, None]
+    assert [cond["passes_now"] for cond in result["conditions"]] == [False, True]
+    assert result["conditions_pass_now"] is False
+    assert not automation_reloads
+    assert not os.path.exists(hass.config.path(AUTOMATION_CONFIG_PATH))
+
+
+async def test_dry_run_replays_history(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test a dry run reports when the automation would have fired."""
+    hass.config.components.add("recorder")
+    now = dt_util.utcnow()
+
+    def _state(entity_id: str, state: str, minutes_ago: int) -> State:
+        changed = now - timedelta(minutes=minutes_ago)
+        return State(entity_id, state, last_changed=changed, last_updated=changed)
+
+    history = {
+        "binary_sensor.motion": [
+            _state("binary_sensor.motion", "off", 120),
+            _state("binary_sensor.motion", "on", 90),
+            _state("binary_sensor.motion", "off", 80),
+            _state("binary_sensor.motion", "on", 30),
+        ],
+        "sun.sun": [
+            _state("sun.sun", "above_horizon", 120),
+            _state("sun.sun", "below_horizon", 60),
+        ],
+    }
+    recorder = MagicMock()
+    recorder.async_add_executor_job = hass.async_add_executor_job
+    tool_input = llm.ToolInput(
+        tool_name="create_automation",
+        tool_args={
+            "automation_id": "night_motion",
+            "alias": "Night Motion",
+            "trigger": [
+                {"platform": "state", "entity_id": "binary_sensor.motion", "to": "on"}
+            ],
+            "condition": [
+                {"condition": "state", "entity_id": "sun.sun", "state": "below_horizon"}
+            ],
+            "action": [
+                {"service": "light.turn_on", "target": {"entity_id": "light.hallway"}}
+            ],
+            "dry_run": True,
+            "history_hours": 3,
+        },
+    )
+
+    with (
+        patch("homeassistant.components.recorder.get_instance", return_value=recorder),
+        patch(
+            "homeassistant.components.recorder.history.get_significant_states",
+            return_value=history,
+        ) as get_states,
+    ):
+        result = await create_automation_tool.async_call(hass, tool_input, llm_context)
+
+    assert result["success"] is True
+    assert get_states.call_args.args[3] == ["binary_sensor.motion", "sun.sun"]
+    assert result["history"]["fire_count"] == 1
+    assert result["history"]["would_have_fired"] == [
+        (now - timedelta(minutes=30)).isoformat()
+    ]
+    assert "unsupported" not in result["history"]
+    assert not automation_reloads
+
+
+async def test_dry_run_unknown_results(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test a dry run reports what it could not evaluate or replay."""
+    hass.config.components.add("recorder")
+    hass.states.async_set("climate.living_room", "heat", {"current_temperature": 17})
+    recorder = MagicMock()
+    recorder.async_add_executor_job = hass.async_add_executor_job
+    tool_args = {
+        "automation_id": "cold_room",
+        "alias": "Cold room",
+        "trigger": [
+            {"platform": "template", "value_template": "{{ 1 / 0 }}"},
+            {
+                "platform": "numeric_state",
+                "entity_id": "climate.living_room",
+                "attribute": "current_temperature",
+                "below": 18,
+            },
+        ],
+        "condition": [
+            {
+                "condition": "state",
+                "entity_id": "climate.living_room",
+                "state": "heat",
+            },
+            "{{ states('climate.living_room') == 'heat' }}",
+        ],
+        "action": [
+            {"service": "light.turn_on", "target": {"entity_id": "light.hallway"}}
+        ],
+        "dry_run": True,
+        "history_hours": 3,
+    }
+
+    with (
+        patch("homeassistant.components.recorder.get_instance", return_value=recorder),
+        patch(
+            "homeassistant.components.recorder.history.get_significant_states",
+            return_value={},
+        ),
+        patch(
+            "homeassistant.helpers.condition.async_from_config",
+            wraps=condition_helper.async_from_config,
+        ) as from_config,
+    ):
+        result = await create_automation_tool.async_call(
+            hass, llm.ToolInput("create_automation", tool_args), llm_context
+        )
+        await create_automation_tool.async_call(
+            hass, llm.ToolInput("create_automation", tool_args), llm_context
+        )
+
+    assert result["success"] is True
+    assert [trigger["matches_now"] for trigger in result["triggers"]] == [None, True]
+    assert result["notes"][0].startswith("Trigger 0 could not be rendered")
+    assert result["conditions_pass_now"] is True
+    # Both triggers need templates or attributes, so nothing was replayed
+    assert result["history"]["partial"] is True
+    assert result["history"]["would_have_fired"] is None
+    # The condition was compiled once for both dry runs
+    assert from_config.call_count == 1
+    assert not automation_reloads
+
+
+def _automation_entity(automation_id: str, config: dict) -> SimpleNamespace:
+    """Return a stand-in for a loaded automation entity."""
+    return SimpleNamespace(
+        unique_id=automation_id,
+        entity_id=f"automation.{automation_id}",
+        raw_config={"id": automation_id, **config},
+    )
+
+
+MOTION_LIGHT = {
+    "alias": "Motion Light",
+    "trigger": [{"platform": "state", "entity_id": "binary_sensor.motion", "to": "on"}],
+    "action": [{"service": "light.turn_on", "target": {"entity_id": "light.hallway"}}],
+}
+
+
+async def test_create_automation_rejects_duplicate(
+    hass: HomeAssistant,
+    create_automation_tool: CreateAutomationTool,
+    automation_reloads,
+    llm_context,
+):
+    """Test an automation duplicating an existing one is not created."""
+    hass.data[AUTOMATION_DATA_COMPONENT] = SimpleNamespace(
+        entities=[_automation_entity("existing_motion_light", MOTION_LIGHT)]
+    )
+    tool_args = {
+        "automation_id": "motion_light_again",
+        "alias": "Hallway light on motion",
+        # Same trigger written with the new key names
+        "trigger": [
+            {"trigger": "state", "entity_id": ["binary_sensor.motion"], "to": "on"}
+        ],
+        "action": [
+            {"action": "light.turn_on", "target": {"entity_id": "light.hallway"}}
+        ],
+    }
+
+    result = await create_automation_tool.async_call(
+        hass, llm.ToolInput("create_automation", tool_args), llm_context
+    )
+
+    assert result["success"] is False
+    assert result["duplicate_of"] == ["existing_motion_light"]
+    assert not automation_reloads
+
+    result = await create_automation_tool.async_call(
+        hass,
+        llm.ToolInput("create_automation", {**tool_args, "allow_duplicate": True}),
+        llm_context,
+    )
+
+    assert result["success"] is True
+    assert result["duplicate_of"] == ["existing_motion_light"]
+    assert len(automation_reloads) == 1
+
+
+async def test_automation_index_updates_on_reload(hass: HomeAssistant):
+    """Test the automation index follows automation reloads."""
+    dimmer = {
+        **MOTION_LIGHT,
+        "action": [
+            {
+                "service": "light.turn_on",
+                "target": {"entity_id": "light.hallway"},
+                "data": {"brightness": 10},
+            }
+        ],
+    }
+    other = {**MOTION_LIGHT, "trigger": [{"platform": "time", "at": "07:00:00"}]}
+    templated = {
+        **MOTION_LIGHT,
+        "action": [{"service": "light.turn_on", "target": "{{ lights }}"}],
+    }
+    component = SimpleNamespace(
+        entities=[
+            _automation_entity("motion_light", MOTION_LIGHT),
+            _automation_entity("time_light", other),
+            _automation_entity("templated_light", templated),
+        ]
+    )
+    hass.data[AUTOMATION_DATA_COMPONENT] = component
+    index = AutomationIndex()
+    unsub = index.async_listen(hass)
+
+    assert index.async_find(hass, {"id": "new", **MOTION_LIGHT}) == (
+        ["motion_light"],
+        [],
+    )
+    # Different service data is not a duplicate
+    assert index.async_find(hass, {"id": "new", **dimmer}) == ([], ["motion_light"])
+    assert index.async_find(hass, {"id": "new", **templated}) == (
+        ["templated_light"],
+        [],
+    )
+
+    component.entities = [
+        component.entities[1],
+        _automation_entity(
+            "motion_scene",
+            {
+                **MOTION_LIGHT,
+                "action": [
+                    *MOTION_LIGHT["action"],
+                    {"service": "scene.turn_on", "entity_id": "scene.evening"},
+                ],
+            },
+        ),
+    ]
+    hass.bus.async_fire(EVENT_AUTOMATION_RELOADED)
+    await hass.async_block_till_done()
+
+    assert index.async_find(hass, {"id": "new", **dimmer}) == ([], ["motion_scene"])
+    unsub()
@@ -0,0 +1,150 @@
+"""Test the extraction of the text of fetched documents."""
+
+import json
+from unittest.mock import patch
+
+from custom_components.ai_toolset.tools.extractors import (
+    DOCUMENT_CSV,
+    DOCUMENT_FEED,
+    DOCUMENT_HTML,
+    DOCUMENT_JSON,
+    DOCUMENT_PDF,
+    DOCUMENT_TEXT,
+    DOCUMENT_XML,
+    document_kind,
+    extract_document,
+)
+
+
+def _pdf(pages: list[str], title: str = "") -> bytes:
+    """Return a PDF with a line of text on each page."""
+    count = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % (5 + 2 * index) for index in range(count))
+        + b"] /Count %d >>" % count,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Title (" + title.encode() + b") >>",
+    ]
+    for index, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode() + b") Tj ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (6 + 2 * index)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, content in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + content + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\n" % (len(objects) + 1)
+    return pdf + b"startxref\n%d\n%%%%EOF\n" % xref
+
+
+def test_document_kind():
+    """Test content types are mapped to their extractor."""
+    assert document_kind("text/html; charset=utf-8") == DOCUMENT_HTML
+    assert document_kind("application/pdf") == DOCUMENT_PDF
+    assert document_kind("application/rss+xml") == DOCUMENT_FEED
+    assert document_kind("text/xml") == DOCUMENT_XML
+    assert document_kind("text/csv") == DOCUMENT_CSV
+    assert document_kind("application/ld+json") == DOCUMENT_JSON
+    assert document_kind("text/markdown") == DOCUMENT_TEXT
+    assert document_kind("") == DOCUMENT_TEXT
+    assert document_kind("image/png") is None
+
+
+def test_extract_pdf_stops_early():
+    """Test only the pages needed for the requested text are extracted."""
+    body = _pdf(
+        [f"Section {number} of the manual" for number in range(1, 31)], "Manual"
+    )
+
+    with patch("pypdf.PageObject.extract_text", autospec=True) as mock_extract:
+        mock_extract.side_effect = lambda page: "x" * 40
+        extract_document(DOCUMENT_PDF, "application/pdf", body, 100)
+    assert mock_extract.call_count == 3
+
+    document = extract_document(DOCUMENT_PDF, "application/pdf", body, 60)
+    assert document["title"] == "Manual"
+    assert document["pages"] == 30
+    assert document["truncated"] is True
+    assert document["text"].startswith(
+        "Section 1 of the manual\n\nSection 2 of the manual"
+    )
+
+    document = extract_document(DOCUMENT_PDF, "application/pdf", body, 10000)
+    assert document["truncated"] is False
+    assert document["text"].endswith("Section 30 of the manual")
+
+
+def test_extract_json():
+    """Test JSON is indented and invalid JSON is read as text."""
+    body = json.dumps({"name": "Kitchen", "lights": [1, 2]}).encode()
+
+    document = extract_document(DOCUMENT_JSON, "application/json", body, 1000)
+    assert document["text"] == (
+        '{\n  "name": "Kitchen",\n  "lights": [\n    1,\n    2\n  ]\n}'
+    )
+    assert document["truncated"] is False
+
+    document = extract_document(DOCUMENT_JSON, "application/json", body[:-5], 1000)
+    assert document["text"] == body[:-5].decode()
+
+
+def test_extract_csv():
+    """Test table records are read as column: value pairs."""
+    body = b"date;high;low\n2026-01-01;3;-2\n2026-01-02;;-4\n2026-01-03;5;0\n"
+
+    document = extract_document(DOCUMENT_CSV, "text/csv", body, 60)
+
+    assert document["text"] == (
+        "date: 2026-01-01; high: 3; low: -2\ndate: 2026-01-02; low: -4"
+    )
+    assert document["truncated"] is True
+
+
+def test_extract_feeds():
+    """Test the items of RSS and Atom feeds are read."""
+    rss = b"""<?xml version="1.0"?>
+    <rss version="2.0"><channel><title>Town news</title>
+    <item><title>Road closed</title><link>https://town.example/road</link>
+    <pubDate>Mon, 05 Jan 2026 08:00:00 GMT</pubDate>
+    <description>&lt;p&gt;Main Street is &lt;b&gt;closed&lt;/b&gt;.&lt;/p&gt;</description>
+    </item>
+    <item><title>Market</title><description>Saturday market.</description></item>
+    </channel></rss>"""
+
+    document = extract_document(DOCUMENT_FEED, "application/rss+xml", rss, 1000)
+
+    assert document["title"] == "Town news"
+    assert document["text"] == (
+        "Road closed\n"
+        "https://town.example/road Mon, 05 Jan 2026 08:00:00 GMT\n"
+        "Main Street is closed.\n\n"
+        "Market\nSaturday market."
+    )
+
+    atom = b"""<feed xmlns="http://www.w3.org/2005/Atom"><title>Releases</title>
+    <entry><title>2026.2</title><link href="https://example.com/2026.2"/>
+    <updated>2026-02-04T00:00:00Z</updated><summary>New release.</summary></entry>
+    </feed>"""
+
+    document = extract_document(DOCUMENT_XML, "application/xml", atom, 1000)
+
+    assert document["title"] == "Releases"
+    assert document["text"] == (
+        "2026.2\nhttps://example.com/2026.2 2026-02-04T00:00:00Z\nNew release."
+    )
+
+    document = extract_document(DOCUMENT_XML, "text/xml", b"<note>Hi</note>", 1000)
+    assert document["text"] == "<note>Hi</note>"
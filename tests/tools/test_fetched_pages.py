@@ -0,0 +1,119 @@
+"""Test the index and search of fetched pages."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import voluptuous as vol
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import llm
+
+from custom_components.ai_toolset.tools.fetched_pages import SearchFetchedPagesTool
+from custom_components.ai_toolset.tools.page_index import PageIndex
+from custom_components.ai_toolset.tools.url_fetch import URLFetchTool
+
+
+@pytest.fixture
+def page_index(tmp_path):
+    """Return a page index in a temporary database."""
+    index = PageIndex(str(tmp_path / "pages.db"), max_pages=3, max_age=100)
+    yield index
+    index.close()
+
+
+def test_page_index_search(page_index: PageIndex):
+    """Test pages are found by their words and replaced when fetched again."""
+    page_index.add("https://a.example.com", "Zigbee", "Pairing a zigbee bulb", 10)
+    page_index.add("https://b.example.com", "Z-Wave", "Including z-wave locks", 10)
+    page_index.add("https://a.example.com", "Zigbee", "Resetting zigbee bulbs", 20)
+
+    pages = page_index.search("how do I reset a Zigbee bulb?", 5)
+
+    assert [page["url"] for page in pages] == ["https://a.example.com"]
+    assert pages[0]["text"] == "Resetting zigbee bulbs"
+    assert pages[0]["fetched"] == "1970-01-01T00:00:20+00:00"
+    # Quotes and FTS5 operators are searched as plain words
+    assert page_index.search('locks" OR NEAR(', 5)[0]["title"] == "Z-Wave"
+    assert page_index.search("?!", 5) == []
+
+
+def test_page_index_retention(page_index: PageIndex):
+    """Test old pages and pages past the maximum count are dropped."""
+    for fetched in range(5):
+        page_index.add(f"https://{fetched}.example.com", "", "thermostat", fetched)
+    page_index.add("https://new.example.com", "", "thermostat", 103)
+
+    urls = {page["url"] for page in page_index.search("thermostat", 10)}
+
+    # Fetched more than 100 seconds earlier, or past the 3 most recent pages
+    assert urls == {
+        "https://new.example.com",
+        "https://4.example.com",
+        "https://3.example.com",
+    }
+
+
+async def test_url_fetch_indexes_pages(
+    hass: HomeAssistant, page_index: PageIndex, llm_context, mock_http_response
+):
+    """Test fetched pages are indexed and found by the search tool."""
+    html = (
+        "<html><head><title>Matter setup</title></head>"
+        "<body><p>Commission the Matter device with its pairing code.</p>"
+        "<p>Unrelated footer.</p></body></html>"
+    )
+    response = mock_http_response(html, "text/html")
+
+    with patch(
+        "aiohttp.ClientSession.get",
+        return_value=AsyncMock(__aenter__=AsyncMock(return_value=response)),
+    ):
+        await URLFetchTool(page_index).async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"url": "https://m.io"}),
+            llm_context,
+        )
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    result = await SearchFetchedPagesTool(page_index).async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="search_fetched_pages",
+            tool_args={"query": "matter pairing code"},
+        ),
+        llm_context,
+    )
+
+    assert result["success"] is True
+    assert len(result["results"]) == 1
+    page = result["results"][0]
+    assert page["title"] == "Matter setup"
+    assert page["url"] == "https://m.io"
+    assert len(page["passages"]) == 1
+    assert "with its pairing code." in page["passages"][0]
+
+
+def test_search_fetched_pages_max_results():
+    """Test the number of results is bounded."""
+    schema = SearchFetchedPagesTool.parameters
+
+    assert schema({"query": "zigbee"})["max_results"] == 5
+    assert schema({"query": "zigbee", "max_results": 20})["max_results"] == 20
+    for max_results in (0, 21):
+        with pytest.raises(vol.Invalid):
+            schema({"query": "zigbee", "max_results": max_results})
+
+
+async def test_search_fetched_pages_error(
+    hass: HomeAssistant, page_index: PageIndex, llm_context
+):
+    """Test database errors are returned as errors."""
+    with patch.object(page_index, "search", side_effect=RuntimeError("locked")):
+        result = await SearchFetchedPagesTool(page_index).async_call(
+            hass,
+            llm.ToolInput(
+                tool_name="search_fetched_pages", tool_args={"query": "anything"}
+            ),
+            llm_context,
+        )
+
+    assert result == {"success": False, "error": "locked"}
@@ -0,0 +1,70 @@
+"""Test passage ranking."""
+
+from custom_components.ai_toolset.tools.ranking import (
+    bm25_scores,
+    rank_passages,
+    select_passages,
+    split_passages,
+)
+
+PASSAGES = [
+    "The school district serves the whole county.",
+    "School buses run on the normal schedule.",
+    "All schools are closed today because of the snow storm.",
+    "The school board meets on Tuesday.",
+]
+
+
+def test_split_passages() -> None:
+    """Test lines are joined into passages and only long words are cut."""
+    text = "\n".join(["a" * 30, "", "b" * 30, "c" * 30, "d" * 80])
+
+    assert split_passages(text, length=70) == [
+        f"{'a' * 30}\n{'b' * 30}",
+        "c" * 30,
+        "d" * 70,
+        "d" * 10,
+    ]
+
+
+def test_split_single_line_page() -> None:
+    """Test a page without line breaks is split between sentences and words."""
+    sentence = "The snow storm closed all schools in the county today. "
+    text = sentence * 20 + "word " * 40
+
+    passages = split_passages(text, length=200)
+
+    assert len(passages) > 1
+    assert all(len(passage) <= 200 for passage in passages)
+    assert passages[0] == (sentence * 3).strip()
+    assert " ".join(passages).split() == text.split()
+    # A long line is no longer one passage too long to ever be selected
+    assert select_passages("snow storm", passages, 500)
+
+
+def test_bm25_scores() -> None:
+    """Test rare query terms weigh more than terms found everywhere."""
+    scores = bm25_scores("is school closed because of snow", PASSAGES)
+
+    assert max(scores) == scores[2]
+    assert scores[0] > 0
+    assert bm25_scores("", PASSAGES) == [0.0] * 4
+    assert bm25_scores("school", []) == []
+
+
+def test_rank_passages() -> None:
+    """Test the best passages are returned in page order."""
+    assert rank_passages("snow storm board", PASSAGES, 2) == [
+        PASSAGES[2],
+        PASSAGES[3],
+    ]
+    assert rank_passages("weather", PASSAGES, 2) == []
+
+
+def test_select_passages() -> None:
+    """Test passages are picked best first until max_length is reached."""
+    selected = select_passages("snow storm board", PASSAGES, 100)
+    assert selected == [PASSAGES[2], PASSAGES[3]]
+    assert len("\n\n".join(selected)) <= 100
+
+    assert select_passages("snow storm board", PASSAGES, 60) == [PASSAGES[2]]
@@ -0,0 +1,117 @@
+"""Test search and read tool."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import llm
+
+from custom_components.ai_toolset.tools.ranking import rank_passages
+from custom_components.ai_toolset.tools.search_and_read import SearchAndReadTool
+from custom_components.ai_toolset.tools.url_fetch import URLFetchTool
+from custom_components.ai_toolset.tools.web_search import WebSearchTool
+
+PAGE_TEXT = "\n".join(
+    [
+        "Welcome to the district news page.",
+        "Lunch menus for the week are posted on Mondays.",
+        "All schools are closed today because of the snow storm.",
+        "Buses will run on the normal schedule tomorrow.",
+    ]
+    * 3
+)
+
+
+@pytest.fixture
+def search_and_read_tool(hass: HomeAssistant):
+    """Return a search and read tool instance."""
+    return SearchAndReadTool(
+        WebSearchTool(hass, {"google_api_key": "test_key", "google_cx": "test_cx"}),
+        URLFetchTool(),
+    )
+
+
+async def test_search_and_read(
+    hass: HomeAssistant, search_and_read_tool: SearchAndReadTool, llm_context
+):
+    """Test the top results are fetched and their relevant passages returned."""
+    search_results = [
+        {"title": f"Page {i}", "url": f"https://{i}.example.com", "snippet": f"{i}"}
+        for i in ("district", "missing", "slow", "extra")
+    ]
+
+    async def fetch(hass, url, include_html):
+        if url.startswith("https://missing"):
+            return {"error": "Failed to fetch URL: 404"}
+        if url.startswith("https://slow"):
+            await asyncio.sleep(1)
+        return {"url": url, "text": PAGE_TEXT}
+
+    rank_threads: list[int] = []
+
+    def rank(query, passages, limit):
+        rank_threads.append(threading.get_ident())
+        return rank_passages(query, passages, limit)
+
+    with (
+        patch.object(
+            search_and_read_tool.web_search,
+            "_search_google",
+            AsyncMock(return_value=search_results),
+        ) as mock_search,
+        patch.object(search_and_read_tool.url_fetch, "_async_fetch", side_effect=fetch),
+        patch(
+            "custom_components.ai_toolset.tools.search_and_read."
+            "SEARCH_AND_READ_DEADLINE",
+            0.05,
+        ),
+        patch("custom_components.ai_toolset.tools.search_and_read.rank_passages", rank),
+    ):
+        result = await search_and_read_tool.async_call(
+            hass,
+            llm.ToolInput(
+                tool_name="search_and_read",
+                tool_args={
+                    "query": "are schools closed today",
+                    "passages_per_page": 1,
+                },
+            ),
+            llm_context,
+        )
+
+    assert mock_search.call_args.args == ("are schools closed today", "text", 3)
+    # Pages are ranked off the event loop
+    assert rank_threads
+    assert threading.get_ident() not in rank_threads
+    assert result["success"] is True
+    assert result["engine"] == "google"
+    district, missing, slow = result["pages"]
+    assert district["title"] == "Page district"
+    assert len(district["passages"]) == 1
+    assert "closed today" in district["passages"][0]
+    assert missing["error"] == "Failed to fetch URL: 404"
+    assert missing["snippet"] == "missing"
+    assert slow["error"] == "Timed out after 0.05 seconds"
+
+
+async def test_search_and_read_search_error(
+    hass: HomeAssistant, search_and_read_tool: SearchAndReadTool, llm_context
+):
+    """Test a failed search is reported."""
+    with patch.object(
+        search_and_read_tool.web_search,
+        "_search_google",
+        AsyncMock(side_effect=ValueError("Google API key and CX are required")),
+    ):
+        result = await search_and_read_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="search_and_read", tool_args={"query": "test"}),
+            llm_context,
+        )
+
+    assert result == {
+        "success": False,
+        "error": "Google API key and CX are required",
+    }
@@ -1,13 +1,22 @@
 """Test URL fetch tool."""
 
+import asyncio
+import gzip
+import threading
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from aiohttp import ClientError
+from aiohttp import ClientError, web
+from aiohttp.test_utils import TestServer
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm
 
-from custom_components.ai_toolset.tools.url_fetch import URLFetchTool
+from custom_components.ai_toolset.instrumentation import (
+    InstrumentedTool,
+    MetricsRegistry,
+)
+from custom_components.ai_toolset.tools.ranking import select_passages
+from custom_components.ai_toolset.tools.url_fetch import URLFetchTool, _parse_html
 
 
 @pytest.fixture
@@ -17,7 +26,7 @@ def url_fetch_tool(hass: HomeAssistant):
 
 
 async def test_url_fetch_html_content(
-    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
 ):
     """Test fetching HTML content."""
     html_content = """
@@ -32,14 +41,19 @@ async def test_url_fetch_html_content(
     </html>
     """
 
-    mock_response = AsyncMock()
-    mock_response.headers = {"Content-Type": "text/html"}
-    mock_response.text = AsyncMock(return_value=html_content)
-    mock_response.raise_for_status = Mock()
+    mock_response = mock_http_response(html_content, "text/html")
+    parse_threads: list[int] = []
 
-    with patch(
-        "aiohttp.ClientSession.get",
-        return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+    def parse_html(html: str) -> dict[str, str]:
+        parse_threads.append(threading.get_ident())
+        return _parse_html(html)
+
+    with (
+        patch(
+            "aiohttp.ClientSession.get",
+            return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+        ),
+        patch("custom_components.ai_toolset.tools.url_fetch._parse_html", parse_html),
     ):
         tool_input = llm.ToolInput(
             tool_name="url_fetch", tool_args={"url": "https://example.com"}
@@ -52,18 +66,18 @@ async def test_url_fetch_html_content(
         assert "Test description" in result["description"]
         assert "Test Heading" in result["text"]
         assert "Test paragraph" in result["text"]
+    # The page is parsed off the event loop
+    assert parse_threads
+    assert threading.get_ident() not in parse_threads
 
 
 async def test_url_fetch_non_html_content(
-    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
 ):
     """Test fetching non-HTML content."""
     text_content = "Plain text content"
 
-    mock_response = AsyncMock()
-    mock_response.headers = {"Content-Type": "text/plain"}
-    mock_response.text = AsyncMock(return_value=text_content)
-    mock_response.raise_for_status = Mock()
+    mock_response = mock_http_response(text_content, "text/plain")
 
     with patch(
         "aiohttp.ClientSession.get",
@@ -80,15 +94,12 @@ async def test_url_fetch_non_html_content(
 
 
 async def test_url_fetch_with_max_length(
-    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
 ):
     """Test fetching content with max length limit."""
     html_content = "<html><body>" + ("x" * 20000) + "</body></html>"
 
-    mock_response = AsyncMock()
-    mock_response.headers = {"Content-Type": "text/html"}
-    mock_response.text = AsyncMock(return_value=html_content)
-    mock_response.raise_for_status = Mock()
+    mock_response = mock_http_response(html_content, "text/html")
 
     with patch(
         "aiohttp.ClientSession.get",
@@ -117,3 +128,380 @@ async def test_url_fetch_error_handling(
         result = await url_fetch_tool.async_call(hass, tool_input, llm_context)
 
         assert "error" in result
+
+
+async def test_url_fetch_concurrent_coalesced(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+):
+    """Test identical fetches made at the same time share one request."""
+    release = asyncio.Event()
+
+    async def iter_chunked(size):
+        await release.wait()
+        yield b"plain text"
+
+    mock_response = AsyncMock()
+    mock_response.headers = {"Content-Type": "text/plain"}
+    mock_response.content.iter_chunked = iter_chunked
+    mock_response.raise_for_status = Mock()
+
+    with patch(
+        "aiohttp.ClientSession.get",
+        return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+    ) as mock_get:
+        tasks = [
+            hass.async_create_task(
+                url_fetch_tool.async_call(
+                    hass,
+                    llm.ToolInput(tool_name="url_fetch", tool_args={"url": url}),
+                    llm_context,
+                )
+            )
+            for url in ("https://example.com", " https://example.com")
+        ]
+        await asyncio.sleep(0)
+        # A cancelled caller does not cancel the request for the others
+        tasks[0].cancel()
+        release.set()
+        result = await tasks[1]
+
+        assert mock_get.call_count == 1
+        assert result["text"] == "plain text"
+
+
+async def test_url_fetch_batch(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+):
+    """Test several URLs are fetched at once, at most two per host."""
+    running: dict[str, int] = {}
+    most_running: dict[str, int] = {}
+
+    async def fetch(hass, url, include_html):
+        host = url.split("/")[2]
+        running[host] = running.get(host, 0) + 1
+        most_running[host] = max(most_running.get(host, 0), running[host])
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+        if url.endswith("missing"):
+            return {"error": "Failed to fetch URL: 404"}
+        return {"url": url, "text": f"text of {url}"}
+
+    urls = [
+        "https://a.example.com/1",
+        "https://a.example.com/2",
+        "https://b.example.com/missing",
+        "https://a.example.com/3",
+        "https://a.example.com/4",
+    ]
+    with patch.object(url_fetch_tool, "_async_fetch", side_effect=fetch):
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"urls": urls}),
+            llm_context,
+        )
+
+    assert result["success"] is True
+    assert result["url_count"] == 5
+    assert [item["url"] for item in result["results"]] == urls
+    assert result["results"][2]["error"] == "Failed to fetch URL: 404"
+    assert result["results"][3]["text"] == "text of https://a.example.com/3"
+    assert most_running == {"a.example.com": 2, "b.example.com": 1}
+
+
+async def test_url_fetch_batch_invalid_url(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+):
+    """Test an invalid URL only fails its own entry of a batch."""
+    urls = ["https://a.example.com/1", "http://[::1", "ftp://files.example.com"]
+
+    with patch.object(
+        url_fetch_tool,
+        "_async_fetch",
+        side_effect=lambda hass, url, include_html: {"url": url, "text": "ok"},
+    ) as mock_fetch:
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"urls": urls}),
+            llm_context,
+        )
+
+    assert result["success"] is True
+    assert mock_fetch.call_count == 1
+    assert result["results"][0]["text"] == "ok"
+    assert result["results"][1] == {"url": "http://[::1", "error": "Invalid URL"}
+    assert result["results"][2]["error"] == "Invalid URL"
+
+
+async def test_url_fetch_batch_too_large(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context
+):
+    """Test a batch over the limit is rejected."""
+    result = await url_fetch_tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="url_fetch",
+            tool_args={"urls": [f"https://example.com/{i}" for i in range(11)]},
+        ),
+        llm_context,
+    )
+
+    assert result["error"] == "Too many URLs requested (11); the maximum is 10"
+
+
+async def test_url_fetch_query(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
+):
+    """Test a query returns the relevant passages instead of the page start."""
+    paragraphs = [f"<p>{'Filler text about nothing. ' * 30}</p>"] * 20
+    paragraphs.insert(15, "<p>Registration for the spring soccer league is open.</p>")
+    html_content = f"<html><body>{''.join(paragraphs)}</body></html>"
+
+    mock_response = mock_http_response(html_content, "text/html")
+    select_threads: list[int] = []
+
+    def select(query, passages, max_length):
+        select_threads.append(threading.get_ident())
+        return select_passages(query, passages, max_length)
+
+    with (
+        patch(
+            "aiohttp.ClientSession.get",
+            return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+        ),
+        patch("custom_components.ai_toolset.tools.url_fetch.select_passages", select),
+    ):
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(
+                tool_name="url_fetch",
+                tool_args={
+                    "url": "https://example.com",
+                    "query": "soccer registration",
+                    "max_length": 1000,
+                },
+            ),
+            llm_context,
+        )
+
+    assert result["passages"] == 1
+    # Long filler paragraphs are split, so their end shares the passage
+    assert result["text"].endswith(
+        "\nRegistration for the spring soccer league is open."
+    )
+    assert len(result["text"]) <= 1000
+    assert result["length"] > 10000
+    # Passages are ranked off the event loop
+    assert select_threads
+    assert threading.get_ident() not in select_threads
+
+
+async def test_url_fetch_offset(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
+):
+    """Test a long page is read in chunks from one download."""
+    sentences = " ".join(f"Sentence {i} of the article." for i in range(20))
+    html_content = f"<html><body>{'<p>Paragraph.</p>' * 5}<p>{sentences}</p></body>"
+
+    mock_response = mock_http_response(html_content, "text/html")
+
+    chunks = []
+    offset = 0
+    with patch(
+        "aiohttp.ClientSession.get",
+        return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+    ) as mock_get:
+        while offset is not None:
+            result = await url_fetch_tool.async_call(
+                hass,
+                llm.ToolInput(
+                    tool_name="url_fetch",
+                    tool_args={
+                        "url": "https://example.com",
+                        "max_length": 100,
+                        "offset": offset,
+                    },
+                ),
+                llm_context,
+            )
+            chunks.append(result["text"])
+            offset = result.get("next_offset")
+
+    assert mock_get.call_count == 1
+    # Chunks end at line breaks, else at sentence ends
+    assert chunks[0] == "\n".join(["Paragraph."] * 5)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks[1:]) == sentences
+
+
+@pytest.mark.parametrize(
+    ("body", "content_type"),
+    [
+        # Declared in the markup, not in the header
+        (
+            b'<html><head><meta charset="windows-1252"></head>'
+            b"<body><p>Caf\xe9 cr\xe8me</p></body></html>",
+            "text/html",
+        ),
+        (
+            b'<html><head><meta http-equiv="Content-Type" '
+            b'content="text/html; charset=ISO-8859-1"></head>'
+            b"<body><p>Caf\xe9 cr\xe8me</p></body></html>",
+            "text/html",
+        ),
+        # The header wins over the markup
+        (
+            '<html><head><meta charset="windows-1252"></head>'
+            "<body><p>Café crème</p></body></html>".encode(),
+            "text/html; charset=utf-8",
+        ),
+        # A byte order mark wins over the header
+        (
+            "\ufeff<html><body><p>Café crème</p></body></html>".encode("utf-16-le"),
+            "text/html; charset=iso-8859-1",
+        ),
+        # Undeclared
+        ("Café crème".encode(), "text/plain"),
+        (b"Caf\xe9 cr\xe8me", "text/plain"),
+    ],
+)
+async def test_url_fetch_charset(
+    hass: HomeAssistant,
+    url_fetch_tool: URLFetchTool,
+    llm_context,
+    mock_http_response,
+    body: bytes,
+    content_type: str,
+):
+    """Test the body is decoded with the charset declared by the page."""
+    with patch(
+        "aiohttp.ClientSession.get",
+        return_value=AsyncMock(
+            __aenter__=AsyncMock(return_value=mock_http_response(body, content_type))
+        ),
+    ):
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"url": "https://a.io"}),
+            llm_context,
+        )
+
+    assert result["text"] == "Café crème"
+
+
+async def test_url_fetch_body_limit(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
+):
+    """Test only the start of a very large body is downloaded."""
+    mock_response = mock_http_response("x" * 200_000, "text/plain")
+
+    with (
+        patch(
+            "aiohttp.ClientSession.get",
+            return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+        ),
+        patch("custom_components.ai_toolset.tools.url_fetch.MAX_PAGE_BYTES", 100_000),
+    ):
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"url": "https://a.io"}),
+            llm_context,
+        )
+
+    assert result["length"] == 100_000
+    assert result["truncated"] is True
+
+
+def _compressor(encoding: str):
+    """Return the function compressing a body with a content encoding."""
+    if encoding == "br":
+        return pytest.importorskip("brotli").compress
+    if encoding == "zstd":
+        return pytest.importorskip("compression.zstd").compress
+    return gzip.compress
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+async def test_url_fetch_compressed(
+    hass: HomeAssistant,
+    url_fetch_tool: URLFetchTool,
+    llm_context,
+    socket_enabled,
+    encoding,
+):
+    """Test compressed pages are decompressed and their transfer is recorded."""
+    compress = _compressor(encoding)
+    html = f"<html><body>{'<p>Compressible paragraph.</p>' * 1000}</body></html>"
+
+    async def handler(request: web.Request) -> web.Response:
+        assert encoding in request.headers["Accept-Encoding"]
+        return web.Response(
+            body=compress(html.encode()),
+            headers={
+                "Content-Type": "text/html; charset=utf-8",
+                "Content-Encoding": encoding,
+            },
+        )
+
+    app = web.Application()
+    app.router.add_get("/page", handler)
+    metrics = MetricsRegistry()
+    tool = InstrumentedTool(url_fetch_tool, metrics)
+
+    async with TestServer(app) as server:
+        result = await tool.async_call(
+            hass,
+            llm.ToolInput(
+                tool_name="url_fetch",
+                tool_args={"url": str(server.make_url("/page")), "max_length": 100},
+            ),
+            llm_context,
+        )
+
+    assert result["text"].startswith("Compressible paragraph.")
+    recorded = metrics.get("url_fetch").as_dict()
+    assert recorded["decompressed_bytes"] == len(html)
+    assert recorded["received_bytes"] < len(html) / 10
+    assert recorded["compression_ratio"] > 10
+
+
+async def test_url_fetch_document(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
+):
+    """Test documents are read by the extractor of their content type."""
+    mock_response = mock_http_response("city,aqi\nDenver,42\n", "text/csv")
+
+    with patch(
+        "aiohttp.ClientSession.get",
+        return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+    ):
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"url": "https://a.io"}),
+            llm_context,
+        )
+
+    assert result["content_type"] == "text/csv"
+    assert result["text"] == "city: Denver; aqi: 42"
+    assert "truncated" not in result
+
+
+async def test_url_fetch_unreadable_content(
+    hass: HomeAssistant, url_fetch_tool: URLFetchTool, llm_context, mock_http_response
+):
+    """Test content without text is not downloaded."""
+    mock_response = mock_http_response(b"\x89PNG", "image/png")
+    mock_response.content.iter_chunked = Mock()
+
+    with patch(
+        "aiohttp.ClientSession.get",
+        return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)),
+    ):
+        result = await url_fetch_tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="url_fetch", tool_args={"url": "https://a.io"}),
+            llm_context,
+        )
+
+    assert result == {"error": "Cannot read text from image/png content"}
+    mock_response.content.iter_chunked.assert_not_called()
@@ -1,15 +1,30 @@
 """Test Waze travel time tools."""
 
+import asyncio
+from unittest.mock import AsyncMock, patch
+
 import pytest
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
 from homeassistant.helpers import llm
 
 from custom_components.ai_toolset.tools.waze_travel_time import (
     GetTravelDistanceTool,
+    GetTravelInfoTool,
     GetTravelTimeTool,
+    WazeLocationResolver,
+    WazeRouteCache,
 )
 
 
+@pytest.fixture(autouse=True)
+def mock_geocode():
+    """Prevent tests from geocoding addresses over the network."""
+    with patch.object(
+        WazeLocationResolver, "_async_geocode", AsyncMock(return_value=None)
+    ) as mock:
+        yield mock
+
+
 @pytest.fixture
 def travel_time_tool():
     """Return a travel time tool instance."""
@@ -22,6 +37,24 @@ def travel_distance_tool():
     return GetTravelDistanceTool()
 
 
+@pytest.fixture
+def waze_calls(hass: HomeAssistant):
+    """Register a fake Waze service and return the list of calls it receives."""
+    calls: list[ServiceCall] = []
+
+    async def _get_travel_time(call: ServiceCall):
+        calls.append(call)
+        return {"duration": 25.0, "distance": 12.4}
+
+    hass.services.async_register(
+        "waze_travel_time",
+        "get_travel_time",
+        _get_travel_time,
+        supports_response=SupportsResponse.ONLY,
+    )
+    return calls
+
+
 async def test_get_travel_time_basic(
     hass: HomeAssistant,
     travel_time_tool: GetTravelTimeTool,
@@ -196,3 +229,199 @@ async def test_get_travel_distance_invalid_destination(
     # Verify response structure
     assert isinstance(result, dict)
     assert "success" in result or "error" in result
+
+
+async def test_travel_tools_share_route_cache(
+    hass: HomeAssistant,
+    waze_calls,
+    llm_context,
+):
+    """Test that time and distance lookups for the same route call Waze once."""
+    route_cache = WazeRouteCache()
+    time_tool = GetTravelTimeTool(route_cache)
+    distance_tool = GetTravelDistanceTool(route_cache)
+
+    time_result = await time_tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="get_travel_time",
+            tool_args={"origin": "123 Main St", "destination": "456 Oak Ave"},
+        ),
+        llm_context,
+    )
+    distance_result = await distance_tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="get_travel_distance",
+            tool_args={"origin": "123  main st", "destination": "456 Oak Ave "},
+        ),
+        llm_context,
+    )
+
+    assert time_result["success"] is True
+    assert time_result["travel_time_minutes"] == 25.0
+    assert distance_result["success"] is True
+    assert distance_result["distance_miles"] == 12.4
+    assert len(waze_calls) == 1
+    assert waze_calls[0].data["region"] == "us"
+
+
+async def test_get_travel_info_single_route(
+    hass: HomeAssistant,
+    waze_calls,
+    llm_context,
+):
+    """Test getting travel time and distance from one call."""
+    tool = GetTravelInfoTool()
+
+    result = await tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="get_travel_info",
+            tool_args={"origin": "Home", "destination": "Work"},
+        ),
+        llm_context,
+    )
+
+    assert result["success"] is True
+    assert result["travel_time_minutes"] == 25.0
+    assert result["distance_miles"] == 12.4
+    assert len(waze_calls) == 1
+
+
+async def test_get_travel_info_matrix(
+    hass: HomeAssistant,
+    waze_calls,
+    llm_context,
+):
+    """Test getting every origin/destination combination at once."""
+    tool = GetTravelInfoTool()
+
+    result = await tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="get_travel_info",
+            tool_args={
+                "origins": ["Home", "Gym"],
+                "destinations": ["Work", "School"],
+            },
+        ),
+        llm_context,
+    )
+
+    assert result["success"] is True
+    assert result["route_count"] == 4
+    assert [(route["origin"], route["destination"]) for route in result["routes"]] == [
+        ("Home", "Work"),
+        ("Home", "School"),
+        ("Gym", "Work"),
+        ("Gym", "School"),
+    ]
+    assert len(waze_calls) == 4
+
+
+async def test_get_travel_info_matrix_limited(hass: HomeAssistant, llm_context):
+    """Test matrix lookups of several conversations share one rate limit."""
+    running = most_running = 0
+
+    async def _get_travel_time(call: ServiceCall):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"duration": 25.0, "distance": 12.4}
+
+    hass.services.async_register(
+        "waze_travel_time",
+        "get_travel_time",
+        _get_travel_time,
+        supports_response=SupportsResponse.ONLY,
+    )
+    tool = GetTravelInfoTool(WazeRouteCache())
+
+    results = await asyncio.gather(
+        *(
+            tool.async_call(
+                hass,
+                llm.ToolInput(
+                    tool_name="get_travel_info",
+                    tool_args={
+                        "origins": [f"Home {conversation}", "Gym"],
+                        "destinations": ["Work", "School"],
+                    },
+                ),
+                llm_context,
+            )
+            for conversation in range(3)
+        )
+    )
+
+    assert all(result["success"] for result in results)
+    assert most_running == 3
+
+
+async def test_get_travel_info_requires_locations(
+    hass: HomeAssistant,
+    llm_context,
+):
+    """Test that an origin and destination are required."""
+    tool = GetTravelInfoTool()
+
+    result = await tool.async_call(
+        hass,
+        llm.ToolInput(tool_name="get_travel_info", tool_args={"origin": "Home"}),
+        llm_context,
+    )
+
+    assert result["success"] is False
+    assert "error" in result
+
+
+async def test_travel_time_resolves_entities(
+    hass: HomeAssistant,
+    waze_calls,
+    llm_context,
+):
+    """Test that zones and persons are resolved to coordinates locally."""
+    hass.states.async_set(
+        "zone.home", "0", {"latitude": 32.87, "longitude": -117.22, "radius": 100}
+    )
+    hass.states.async_set(
+        "person.jane", "not_home", {"latitude": 32.71, "longitude": -117.16}
+    )
+    tool = GetTravelTimeTool()
+
+    result = await tool.async_call(
+        hass,
+        llm.ToolInput(
+            tool_name="get_travel_time",
+            tool_args={"origin": "person.jane", "destination": "home"},
+        ),
+        llm_context,
+    )
+
+    assert result["success"] is True
+    assert waze_calls[0].data["origin"] == "32.71,-117.16"
+    assert waze_calls[0].data["destination"] == "32.87,-117.22"
+
+
+async def test_location_resolver_caches_geocodes(hass: HomeAssistant, mock_geocode):
+    """Test that addresses are only geocoded once."""
+    resolver = WazeLocationResolver()
+    mock_geocode.return_value = "40.7128,-74.006"
+
+    first = await resolver.async_resolve(hass, "1 Main St, Springfield", "us")
+    second = await resolver.async_resolve(hass, "1 main st,  Springfield", "us")
+
+    assert first == second == "40.7128,-74.006"
+    assert mock_geocode.call_count == 1
+
+
+async def test_location_resolver_falls_back_to_address(hass: HomeAssistant):
+    """Test that addresses that cannot be geocoded are passed through."""
+    resolver = WazeLocationResolver()
+
+    result = await resolver.async_resolve(hass, " 1 Main St ", "us")
+
+    assert result == "1 Main St"
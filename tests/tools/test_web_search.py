@@ -1,6 +1,8 @@
 """Test web search tool."""
 
-from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
@@ -20,7 +22,7 @@ def web_search_tool(hass: HomeAssistant):
 
 
 async def test_google_search(
-    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context
+    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context, mock_http_response
 ):
     """Test Google search."""
     mock_response_data = {
@@ -38,9 +40,9 @@ async def test_google_search(
         ]
     }
 
-    mock_response = AsyncMock()
-    mock_response.json = AsyncMock(return_value=mock_response_data)
-    mock_response.raise_for_status = Mock()
+    mock_response = mock_http_response(
+        json.dumps(mock_response_data), "application/json"
+    )
 
     with patch(
         "aiohttp.ClientSession.get",
@@ -60,7 +62,7 @@ async def test_google_search(
 
 
 async def test_google_image_search(
-    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context
+    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context, mock_http_response
 ):
     """Test Google image search."""
     mock_response_data = {
@@ -74,9 +76,9 @@ async def test_google_image_search(
         ]
     }
 
-    mock_response = AsyncMock()
-    mock_response.json = AsyncMock(return_value=mock_response_data)
-    mock_response.raise_for_status = Mock()
+    mock_response = mock_http_response(
+        json.dumps(mock_response_data), "application/json"
+    )
 
     with patch(
         "aiohttp.ClientSession.get",
@@ -112,7 +114,7 @@ async def test_search_no_engine_configured(hass: HomeAssistant, llm_context):
 
 
 async def test_search_max_results(
-    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context
+    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context, mock_http_response
 ):
     """Test search with max results parameter."""
     items = [
@@ -125,9 +127,9 @@ async def test_search_max_results(
     ]
     mock_response_data = {"items": items}
 
-    mock_response = AsyncMock()
-    mock_response.json = AsyncMock(return_value=mock_response_data)
-    mock_response.raise_for_status = Mock()
+    mock_response = mock_http_response(
+        json.dumps(mock_response_data), "application/json"
+    )
 
     with patch(
         "aiohttp.ClientSession.get",
@@ -141,3 +143,109 @@ async def test_search_max_results(
 
         assert "error" not in result
         assert len(result["results"]) == 10  # Mock returns all, but API would limit
+
+
+async def test_concurrent_searches_coalesced(
+    hass: HomeAssistant, web_search_tool: WebSearchTool, llm_context
+):
+    """Test identical searches made at the same time share one request."""
+    release = asyncio.Event()
+
+    async def search(*args):
+        await release.wait()
+        return [{"title": "Closed", "url": "https://example.com", "snippet": ""}]
+
+    with patch.object(
+        web_search_tool, "_search_google", side_effect=search
+    ) as mock_search:
+        calls = [
+            web_search_tool.async_call(
+                hass,
+                llm.ToolInput(
+                    tool_name="web_search",
+                    tool_args={"query": query, "engine": "google"},
+                ),
+                llm_context,
+            )
+            for query in (
+                "Is school closed today",
+                "is school  closed today ",
+                "is school closed today",
+            )
+        ]
+        tasks = [hass.async_create_task(call) for call in calls]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert mock_search.call_count == 1
+        assert all(result == results[0] for result in results)
+        assert results[0]["results"][0]["title"] == "Closed"
+
+        # Later searches are not coalesced with ones that finished
+        await web_search_tool.async_call(
+            hass,
+            llm.ToolInput(
+                tool_name="web_search",
+                tool_args={"query": "is school closed today", "engine": "google"},
+            ),
+            llm_context,
+        )
+        assert mock_search.call_count == 2
+
+
+async def test_search_quota_steering(hass: HomeAssistant, llm_context):
+    """Test searches reuse results and switch engines as a quota runs out."""
+    tool = WebSearchTool(
+        hass,
+        {
+            "google_api_key": "test_key",
+            "google_cx": "test_cx",
+            "bing_api_key": "test_key",
+            "google_daily_quota": 20,
+            "bing_daily_quota": 10,
+        },
+    )
+    await tool.quota.async_load()
+    for _ in range(18):
+        tool.quota.async_record("google")
+    for _ in range(8):
+        tool.quota.async_record("bing")
+
+    google = AsyncMock(return_value=[{"title": "Google", "url": "", "snippet": ""}])
+    bing = AsyncMock(return_value=[{"title": "Bing", "url": "", "snippet": ""}])
+
+    async def search(query: str) -> dict:
+        return await tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="web_search", tool_args={"query": query}),
+            llm_context,
+        )
+
+    with (
+        patch.object(tool, "_search_google", google),
+        patch.object(tool, "_search_bing", bing),
+    ):
+        # Google is low on quota, so Bing takes over
+        result = await search("first")
+        assert result["engine"] == "bing"
+        assert "cached" not in result
+
+        # Both are low, so recent results are reused
+        result = await search("First")
+        assert result["engine"] == "bing"
+        assert result["cached"] is True
+        assert bing.call_count == 1
+
+        # The rest of the quotas is spent on searches without results
+        for query, engine in (("second", "google"), ("third", "google")):
+            result = await search(query)
+            assert result["engine"] == engine
+        result = await search("fourth")
+        assert result["engine"] == "bing"
+
+        result = await search("fifth")
+        assert result["error"] == "The daily search quota is used up for today"
+
+    assert tool.quota.used("google") == 20
+    assert tool.quota.used("bing") == 10